@@ -12,7 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 # Import your models
 from app.database import Base
-from app.models import user, game, player_game_stats
+from app import models  # noqa: F401, registers every table on Base.metadata
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,144 @@
+"""add hot path indexes and unique player game stats
+
+Revision ID: 56a53c661467
+Revises: d9b72052351b
+Create Date: 2026-10-16 21:30:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '56a53c661467'
+down_revision: Union[str, Sequence[str], None] = 'd9b72052351b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic")
+
+# Stats rows that lost to another row of the same (player, game), kept for review
+DUPLICATES_TABLE = 'player_game_stats_duplicates'
+
+
+def upgrade() -> None:
+    """Add indexes for the hot read paths and enforce one stats row per player and game."""
+    # Revision 22a63f363efc never created ladder_entries, existing databases got it
+    # from create_all at startup
+    if not sa.inspect(op.get_bind()).has_table('ladder_entries'):
+        op.create_table(
+            'ladder_entries',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('team_name', sa.String(), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.Column('wins', sa.Integer(), nullable=True),
+            sa.Column('draws', sa.Integer(), nullable=True),
+            sa.Column('losses', sa.Integer(), nullable=True),
+            sa.Column('points_for', sa.Integer(), nullable=True),
+            sa.Column('points_against', sa.Integer(), nullable=True),
+            sa.Column('win_percentage', sa.Float(), nullable=True),
+            sa.Column('games_played', sa.Integer(), nullable=True),
+            sa.Column('season', sa.String(), nullable=True),
+            sa.Column('division', sa.String(), nullable=True),
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_ladder_entries_id'), 'ladder_entries', ['id'], unique=False)
+
+    move_duplicate_stats()
+
+    # Also serves lookups by player_id alone
+    op.create_unique_constraint(
+        'uq_player_game_stats_player_game', 'player_game_stats', ['player_id', 'game_id']
+    )
+    op.create_index('ix_player_game_stats_game_id', 'player_game_stats', ['game_id'])
+    # Review queue of scraped stats waiting for a manager, paged in id order
+    op.create_index(
+        'ix_player_game_stats_unverified_scraped', 'player_game_stats', ['id'],
+        postgresql_where=sa.text('is_scraped AND NOT is_verified')
+    )
+
+    op.create_index('ix_games_datetime', 'games', ['datetime'])
+    # Upcoming fixtures are games without a final score
+    op.create_index(
+        'ix_games_upcoming', 'games', ['datetime'],
+        postgresql_where=sa.text('final_score_skywalkers IS NULL AND final_score_opponent IS NULL')
+    )
+
+    # Finds the latest ladder update and reads it in position order
+    op.create_index(
+        'ix_ladder_entries_last_updated_position', 'ladder_entries',
+        [sa.text('last_updated DESC'), 'position']
+    )
+
+
+def downgrade() -> None:
+    """Drop the hot path indexes and the unique player game stats constraint."""
+    op.drop_index('ix_ladder_entries_last_updated_position', table_name='ladder_entries')
+    op.drop_index('ix_games_upcoming', table_name='games')
+    op.drop_index('ix_games_datetime', table_name='games')
+    op.drop_index('ix_player_game_stats_unverified_scraped', table_name='player_game_stats')
+    op.drop_index('ix_player_game_stats_game_id', table_name='player_game_stats')
+    op.drop_constraint('uq_player_game_stats_player_game', 'player_game_stats', type_='unique')
+    restore_duplicate_stats()
+
+
+def move_duplicate_stats() -> None:
+    """
+    Keep one row per (player, game) before adding the constraint, preferring
+    the verified row and then the most recent one. The other rows are moved
+    to player_game_stats_duplicates with the id of the row kept, and listed
+    in the migration log.
+    """
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text("""
+        SELECT count(*) FROM (
+            SELECT 1 FROM player_game_stats GROUP BY player_id, game_id HAVING count(*) > 1
+        ) duplicated
+    """)).scalar()
+    if not duplicates:
+        return
+
+    op.execute(f"""
+        CREATE TABLE {DUPLICATES_TABLE} AS
+        SELECT stats.*, ranked.kept_id, now() AS moved_at
+        FROM player_game_stats stats
+        JOIN (
+            SELECT id,
+                row_number() OVER duplicates AS duplicate_rank,
+                first_value(id) OVER duplicates AS kept_id
+            FROM player_game_stats
+            WINDOW duplicates AS (
+                PARTITION BY player_id, game_id
+                ORDER BY is_verified DESC NULLS LAST, id DESC
+            )
+        ) ranked ON ranked.id = stats.id
+        WHERE ranked.duplicate_rank > 1
+    """)
+    op.execute(f"DELETE FROM player_game_stats WHERE id IN (SELECT id FROM {DUPLICATES_TABLE})")
+
+    moved = bind.execute(sa.text(
+        f"SELECT id, player_id, game_id, kept_id FROM {DUPLICATES_TABLE} ORDER BY player_id, game_id, id"
+    )).all()
+    logger.warning(
+        f"Moved {len(moved)} duplicate player_game_stats rows of {duplicates} (player, game) pairs "
+        f"to {DUPLICATES_TABLE}, review and drop it once resolved:"
+    )
+    for row in moved:
+        logger.warning(f"  stats {row.id} of player {row.player_id}, game {row.game_id}, kept {row.kept_id}")
+
+
+def restore_duplicate_stats() -> None:
+    """Put the rows moved by move_duplicate_stats back, when the table is still there"""
+    if not sa.inspect(op.get_bind()).has_table(DUPLICATES_TABLE):
+        return
+    columns = ', '.join([
+        'id', 'player_id', 'game_id', 'points', 'fouls', 'is_verified', 'verified_at', 'verified_by',
+        'is_scraped', 'scrape_source'
+    ])
+    op.execute(f"INSERT INTO player_game_stats ({columns}) SELECT {columns} FROM {DUPLICATES_TABLE}")
+    op.drop_table(DUPLICATES_TABLE)
@@ -0,0 +1,110 @@
+"""add ladder snapshots
+
+Revision ID: 7c3f9a1d2b84
+Revises: 56a53c661467
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f9a1d2b84'
+down_revision: Union[str, Sequence[str], None] = '56a53c661467'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same columns and encoding as app.services.ladder_service.ladder_content_hash
+HASHED_COLUMNS = (
+    'team_name', 'wins', 'draws', 'losses', 'points_for', 'points_against', 'win_percentage', 'games_played'
+)
+
+
+def _content_hash(rows) -> str:
+    standings = [[row[column] for column in HASHED_COLUMNS] for row in rows]
+    return hashlib.sha256(json.dumps(standings, separators=(',', ':')).encode()).hexdigest()
+
+
+def upgrade() -> None:
+    """Group ladder entries into snapshots and point each division at its latest one."""
+    op.create_table(
+        'ladder_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('season', sa.String(), nullable=True),
+        sa.Column('division', sa.String(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_ladder_snapshots_division_fetched_at', 'ladder_snapshots',
+        ['division', sa.text('fetched_at DESC')]
+    )
+    op.create_table(
+        'ladder_current_snapshots',
+        sa.Column('division', sa.String(), nullable=False),
+        sa.Column('snapshot_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['snapshot_id'], ['ladder_snapshots.id']),
+        sa.PrimaryKeyConstraint('division')
+    )
+    op.add_column('ladder_entries', sa.Column('snapshot_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'ladder_entries_snapshot_id_fkey', 'ladder_entries', 'ladder_snapshots', ['snapshot_id'], ['id']
+    )
+    op.create_index('ix_ladder_entries_snapshot_position', 'ladder_entries', ['snapshot_id', 'position'])
+
+    # Every update so far wrote all of its rows with the same last_updated
+    bind = op.get_bind()
+    entries = bind.execute(sa.text(
+        "SELECT id, last_updated, season, division, " + ", ".join(HASHED_COLUMNS) +
+        " FROM ladder_entries WHERE last_updated IS NOT NULL ORDER BY last_updated, position"
+    )).mappings().all()
+    updates = {}
+    for entry in entries:
+        updates.setdefault(entry['last_updated'], []).append(entry)
+
+    current = {}
+    for last_updated, rows in updates.items():
+        snapshot_id = bind.execute(
+            sa.text(
+                "INSERT INTO ladder_snapshots (season, division, fetched_at, content_hash) "
+                "VALUES (:season, :division, :fetched_at, :content_hash) RETURNING id"
+            ),
+            {
+                'season': rows[0]['season'],
+                'division': rows[0]['division'],
+                'fetched_at': last_updated,
+                'content_hash': _content_hash(rows),
+            }
+        ).scalar_one()
+        bind.execute(
+            sa.text("UPDATE ladder_entries SET snapshot_id = :snapshot_id WHERE id = ANY(:ids)"),
+            {'snapshot_id': snapshot_id, 'ids': [row['id'] for row in rows]}
+        )
+        # Oldest first, so the last one seen per division is its latest
+        current[rows[0]['division'] or ''] = (snapshot_id, last_updated)
+
+    for division, (snapshot_id, last_updated) in current.items():
+        bind.execute(
+            sa.text(
+                "INSERT INTO ladder_current_snapshots (division, snapshot_id, updated_at) "
+                "VALUES (:division, :snapshot_id, :updated_at)"
+            ),
+            {'division': division, 'snapshot_id': snapshot_id, 'updated_at': last_updated}
+        )
+
+
+def downgrade() -> None:
+    """Drop ladder snapshots, the entries keep their last_updated grouping."""
+    op.drop_index('ix_ladder_entries_snapshot_position', table_name='ladder_entries')
+    op.drop_constraint('ladder_entries_snapshot_id_fkey', 'ladder_entries', type_='foreignkey')
+    op.drop_column('ladder_entries', 'snapshot_id')
+    op.drop_table('ladder_current_snapshots')
+    op.drop_index('ix_ladder_snapshots_division_fetched_at', table_name='ladder_snapshots')
+    op.drop_table('ladder_snapshots')
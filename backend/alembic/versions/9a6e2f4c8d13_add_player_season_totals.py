@@ -0,0 +1,62 @@
+"""add player season totals
+
+Revision ID: 9a6e2f4c8d13
+Revises: e4b8d2c61f05
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a6e2f4c8d13'
+down_revision: Union[str, Sequence[str], None] = 'e4b8d2c61f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create player_season_totals and fill it from the existing stats."""
+    op.create_table(
+        'player_season_totals',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('season', sa.String(), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=False),
+        sa.Column('total_points', sa.Integer(), nullable=False),
+        sa.Column('total_fouls', sa.Integer(), nullable=False),
+        sa.Column('high_points', sa.Integer(), nullable=False),
+        sa.Column('high_fouls', sa.Integer(), nullable=False),
+        sa.Column('last_played_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id']),
+        sa.PrimaryKeyConstraint('player_id', 'season')
+    )
+    op.create_index(
+        'ix_player_season_totals_season_points', 'player_season_totals',
+        ['season', sa.text('total_points DESC')]
+    )
+
+    # Same seasons as app.services.season_totals.season_of
+    op.execute("""
+        INSERT INTO player_season_totals (
+            player_id, season, games_played, total_points, total_fouls,
+            high_points, high_fouls, last_played_at, updated_at
+        )
+        SELECT s.player_id,
+               to_char(g.datetime, 'YYYY') || CASE WHEN extract(month FROM g.datetime) < 7
+                                                   THEN ' Winter' ELSE ' Spring' END,
+               count(s.id), coalesce(sum(s.points), 0), coalesce(sum(s.fouls), 0),
+               coalesce(max(s.points), 0), coalesce(max(s.fouls), 0), max(g.datetime), now()
+        FROM player_game_stats s
+        JOIN games g ON g.id = s.game_id
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    """Drop player_season_totals, it only holds numbers derived from player_game_stats."""
+    op.drop_index('ix_player_season_totals_season_points', table_name='player_season_totals')
+    op.drop_table('player_season_totals')
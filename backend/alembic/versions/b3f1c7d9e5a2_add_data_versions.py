@@ -0,0 +1,34 @@
+"""add data versions
+
+Revision ID: b3f1c7d9e5a2
+Revises: 9a6e2f4c8d13
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c7d9e5a2'
+down_revision: Union[str, Sequence[str], None] = '9a6e2f4c8d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create data_versions, resources get their row on their first write."""
+    op.create_table(
+        'data_versions',
+        sa.Column('resource', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('resource')
+    )
+
+
+def downgrade() -> None:
+    """Drop data_versions."""
+    op.drop_table('data_versions')
@@ -0,0 +1,97 @@
+"""compact ladder snapshots
+
+Revision ID: e4b8d2c61f05
+Revises: 7c3f9a1d2b84
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8d2c61f05'
+down_revision: Union[str, Sequence[str], None] = '7c3f9a1d2b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same as app.services.ladder_service.COMPARED_COLUMNS
+COMPARED_COLUMNS = (
+    'team_name', 'wins', 'draws', 'losses', 'points_for', 'points_against', 'win_percentage', 'games_played',
+    'position', 'season', 'division'
+)
+
+
+def upgrade() -> None:
+    """Keep only the rows that changed between consecutive snapshots of a division."""
+    op.add_column(
+        'ladder_snapshots',
+        sa.Column('is_full', sa.Boolean(), nullable=False, server_default=sa.text('true'))
+    )
+
+    # Pairs of consecutive snapshots with the same season and teams, the
+    # older one of each pair only has to keep its changed rows
+    op.execute("""
+        CREATE TEMPORARY TABLE ladder_compaction ON COMMIT DROP AS
+        WITH team_sets AS (
+            SELECT s.id, s.division, s.season, s.fetched_at,
+                   array_agg(e.team_name ORDER BY e.team_name) AS teams
+            FROM ladder_snapshots s
+            JOIN ladder_entries e ON e.snapshot_id = s.id
+            GROUP BY s.id
+        ), chain AS (
+            SELECT id, season, teams,
+                   lead(id) OVER w AS next_id,
+                   lead(season) OVER w AS next_season,
+                   lead(teams) OVER w AS next_teams
+            FROM team_sets
+            WINDOW w AS (PARTITION BY coalesce(division, '') ORDER BY fetched_at, id)
+        )
+        SELECT id, next_id FROM chain
+        WHERE next_id IS NOT NULL
+          AND season IS NOT DISTINCT FROM next_season
+          AND teams = next_teams
+    """)
+    # One statement, so every comparison sees the rows as they were before
+    unchanged = " AND ".join(f"n.{column} IS NOT DISTINCT FROM e.{column}" for column in COMPARED_COLUMNS)
+    op.execute(f"""
+        DELETE FROM ladder_entries e
+        USING ladder_compaction c
+        WHERE e.snapshot_id = c.id
+          AND EXISTS (SELECT 1 FROM ladder_entries n WHERE n.snapshot_id = c.next_id AND {unchanged})
+    """)
+    op.execute("UPDATE ladder_snapshots SET is_full = false WHERE id IN (SELECT id FROM ladder_compaction)")
+
+
+def downgrade() -> None:
+    """Write the dropped rows back so every snapshot is full again."""
+    # Each missing row is copied from the first later snapshot, up to the
+    # next full one, that stored it
+    op.execute("""
+        INSERT INTO ladder_entries (
+            snapshot_id, team_name, position, wins, draws, losses, points_for, points_against,
+            win_percentage, games_played, season, division, last_updated, created_at
+        )
+        SELECT DISTINCT ON (s.id, e.team_name)
+               s.id, e.team_name, e.position, e.wins, e.draws, e.losses, e.points_for, e.points_against,
+               e.win_percentage, e.games_played, e.season, e.division, s.fetched_at, s.fetched_at
+        FROM ladder_snapshots s
+        JOIN ladder_snapshots later
+          ON coalesce(later.division, '') = coalesce(s.division, '')
+         AND later.fetched_at > s.fetched_at
+        JOIN ladder_entries e ON e.snapshot_id = later.id
+        WHERE NOT s.is_full
+          AND later.fetched_at <= (
+              SELECT min(f.fetched_at) FROM ladder_snapshots f
+              WHERE coalesce(f.division, '') = coalesce(s.division, '')
+                AND f.is_full AND f.fetched_at > s.fetched_at
+          )
+          AND NOT EXISTS (
+              SELECT 1 FROM ladder_entries own
+              WHERE own.snapshot_id = s.id AND own.team_name = e.team_name
+          )
+        ORDER BY s.id, e.team_name, later.fetched_at
+    """)
+    op.drop_column('ladder_snapshots', 'is_full')
@@ -0,0 +1,76 @@
+"""
+Users resolved from bearer tokens, without a database lookup.
+
+ManagerAuthMiddleware and dependencies.get_current_user both go through
+``resolve_principal``. The Principal is built from the token's verified
+claims (see auth.user_claims), and a token seen before is answered from
+the ``principals`` cache without decoding it again. Every request then
+checks the claims against the in-memory TokenTable of app.auth.tokens,
+which is what rejects logged out tokens, tokens of a changed password and
+tokens of deleted users. The middleware leaves the principal on the
+request state, where get_current_user picks it up, so a request resolves
+its token at most once.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+
+from .. import cache
+from ..request_metrics import timed_auth
+from .auth import verify_token_claims
+from .tokens import token_table
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+# Entries only hold what the signed token says, this bounds how long unused ones stay
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+principal_cache = cache.named_cache(cache.PRINCIPALS, PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+# request.state attribute holding the principal, set by ManagerAuthMiddleware
+STATE_KEY = "current_manager"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user and the token it came with, safe to share between requests"""
+    id: int
+    email: str
+    name: str
+    token_version: int
+    token_id: str
+    expires_at: float
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _principal_from_token(token: str) -> Principal:
+    claims = verify_token_claims(token)
+    return Principal(
+        id=int(claims["sub"]),
+        email=claims["email"],
+        name=claims["name"],
+        token_version=claims["ver"],
+        token_id=claims["jti"],
+        expires_at=claims["exp"],
+    )
+
+
+async def resolve_principal(token: str) -> Principal:
+    """The user a bearer token belongs to, 401 when the token is invalid, expired or revoked"""
+    with timed_auth():
+        # Failures raise out of the load and are not cached
+        principal = principal_cache.get_or_load(token, lambda: _principal_from_token(token))
+        if principal.expires_at <= time.time():
+            raise _credentials_error()
+        if not await token_table.check(principal.id, principal.token_version, principal.token_id):
+            raise _credentials_error()
+    return principal
@@ -0,0 +1,131 @@
+"""
+Revocation of signed tokens without a database lookup per request.
+
+Tokens carry the user's id, name, email and ``token_version`` and a
+unique ``jti``. Each worker keeps a TokenTable of every user's current
+token version and the ids of the logged out tokens that have not expired
+yet. A token is accepted when its user is in the table, its version is
+the user's current one and its jti is not revoked:
+
+  - logout inserts the jti into revoked_tokens
+  - a password change bumps the user's token_version
+  - deleting a user removes it from the table
+
+Those writes bump the ``auth`` data version (see app.versions). The
+table checks that version every AUTH_REFRESH_INTERVAL seconds, one
+primary key lookup, and reloads only when it moved. The worker that made
+the write reloads right after its commit; other workers see revocations
+within the interval. A token newer than the table, the one returned by a
+password change or issued to a new user, makes the worker reload sooner.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from sqlalchemy import select
+
+from ..database import AsyncSessionLocal
+from ..models import RevokedToken, User
+from ..versions import AUTH, get_versions
+
+logger = logging.getLogger(__name__)
+
+# How long another worker can accept a revoked token
+AUTH_REFRESH_INTERVAL = float(os.getenv("AUTH_REFRESH_INTERVAL", "5"))
+# A token of a user the table does not know, or with a version newer than the table's,
+# triggers a check at most this often, so tokens issued by another worker do not wait
+# for the interval
+NEWER_TOKEN_RECHECK = 1.0
+
+
+class TokenTable:
+    """Current token version of every user and the revoked token ids, per worker"""
+
+    def __init__(self, interval: float = AUTH_REFRESH_INTERVAL):
+        self.interval = interval
+        self._versions: Dict[int, int] = {}
+        self._revoked: Set[str] = set()
+        self._version: Optional[int] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.reloads = 0
+        self.rejected = 0
+        self.last_checked: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._version is not None
+
+    def is_current(self, user_id: int, token_version: int, token_id: str) -> bool:
+        """Whether a token with these claims is still valid, no I/O"""
+        valid = self._versions.get(user_id) == token_version and token_id not in self._revoked
+        if not valid:
+            self.rejected += 1
+        return valid
+
+    async def check(self, user_id: int, token_version: int, token_id: str) -> bool:
+        """is_current, after loading the table if needed and rechecking it for a token newer than the table"""
+        if not self.loaded:
+            await self.refresh()
+        elif token_version > self._versions.get(user_id, -1) and time.monotonic() - self.last_checked > NEWER_TOKEN_RECHECK:
+            await self.refresh()
+        return self.is_current(user_id, token_version, token_id)
+
+    async def refresh(self):
+        """Reload the table when the auth version moved since the last load"""
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                # Read the version before the rows, see app.versions
+                (version,) = await get_versions(db, AUTH)
+                self.checks += 1
+                self.last_checked = time.monotonic()
+                if version == self._version:
+                    return
+                users = (await db.execute(select(User.id, User.token_version))).all()
+                revoked = (await db.scalars(
+                    select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+                )).all()
+            self._versions = dict(users)
+            self._revoked = set(revoked)
+            self._version = version
+            self.reloads += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep the last table, the next check retries
+                logger.error(f"Error refreshing token table: {e}")
+
+    async def start(self):
+        """Load the table and keep refreshing it on the running event loop"""
+        await self.refresh()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "version": self._version,
+            "users": len(self._versions),
+            "revoked_tokens": len(self._revoked),
+            "refresh_interval_seconds": self.interval,
+            "seconds_since_check": round(time.monotonic() - self.last_checked, 1) if self.last_checked else None,
+            "checks": self.checks,
+            "reloads": self.reloads,
+            "rejected": self.rejected,
+        }
+
+
+token_table = TokenTable()
@@ -0,0 +1,232 @@
+"""
+In-process caches for read-heavy service calls.
+
+Each cache is named after the data it holds and created once with
+``named_cache``. Writers call ``invalidate(name)`` after they commit, which
+drops every entry of that cache in this process. Other workers do not see
+the invalidation, so caches shared by several processes also take a
+``ttl`` that bounds how stale they can get. Caches keyed by a data version
+(see app.versions) need neither.
+
+Every cache is bounded by entries and by the approximate bytes its values
+hold, CACHE_MAX_BYTES by default, so a few large values (a 200 row page,
+a player's whole game log) cannot grow a worker without limit. The worst
+case per worker is the sum of the caches' byte limits, see
+GET /diagnostics/cache.
+
+CACHE_BACKEND picks the implementation: ``memory`` (the default) or
+``none``, which stores nothing and makes every read a miss.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+# Entries per cache and how long an entry invalidated elsewhere can be served
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+# Approximate size of the values per cache
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+MISSING = object()
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Bytes held by ``value`` and everything it contains, as sys.getsizeof counts them
+
+    Follows containers, and the attributes of objects such as pydantic
+    models and dataclasses. Shared objects are counted once.
+    """
+    seen = set()
+    pending = [value]
+    size = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, "__dict__"):
+            pending.extend(vars(item).values())
+    return size
+
+
+class LRUCache:
+    """
+    Bounded mapping that drops the least recently used entry when it holds
+    more than ``maxsize`` entries or ``max_bytes`` of values, and entries
+    older than ``ttl`` seconds when one is given. A value larger than
+    ``max_bytes`` on its own is not stored.
+
+    Safe to share between the event loop and the scheduler's threads.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> (value, stored at, approximate size)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Bumped by invalidate, a load that started before it is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                self._size -= entry[2]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        size = approximate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            self._entries[key] = (value, time.monotonic(), size)
+            self._size += size
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted[2]
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Cached value of ``key``, calling ``load`` on a miss; None results are cached too"""
+        generation = self._generation
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = load()
+            self.set(key, value, generation)
+        return value
+
+    async def aget_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_load for a coroutine function"""
+        generation = self._generation
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = await load()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self):
+        """Drop every entry, and any value being loaded right now"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size = 0
+            self.invalidations += 1
+
+    clear = invalidate
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.maxsize,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NullCache(LRUCache):
+    """Stores nothing, for running without caching"""
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        pass
+
+
+CACHE_BACKENDS = {
+    "memory": LRUCache,
+    "none": NullCache,
+}
+
+_caches: Dict[str, LRUCache] = {}
+_caches_lock = threading.Lock()
+
+
+def named_cache(
+    name: str,
+    maxsize: int = CACHE_MAX_ENTRIES,
+    ttl: Optional[float] = CACHE_TTL,
+    max_bytes: Optional[int] = CACHE_MAX_BYTES,
+) -> LRUCache:
+    """The cache called ``name``, created with the configured backend on first use"""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = CACHE_BACKENDS[CACHE_BACKEND](maxsize, ttl, max_bytes)
+        return _caches[name]
+
+
+def invalidate(*names: str):
+    """Drop the entries of the named caches, call after the write has committed"""
+    for name in names:
+        cache = _caches.get(name)
+        if cache is not None:
+            cache.invalidate()
+
+
+def get_cache_report() -> dict:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {"backend": CACHE_BACKEND, "caches": {name: cache.stats() for name, cache in sorted(caches.items())}}
+
+
+def reset_cache_stats():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.reset_stats()
+
+
+# Names of the service caches, one per set of tables their writers touch
+LADDER = "ladder"
+FIXTURES = "fixtures"
+GAMES = "games"
+ROSTER = "roster"
+PRINCIPALS = "principals"
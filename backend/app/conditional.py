@@ -0,0 +1,123 @@
+"""
+Conditional GETs for the public read routes.
+
+A route declared with ``dependencies=[conditional(resource, ...)]`` sends
+a strong ETag built from the versions of those resources (see
+app.versions) and a Last-Modified of their latest write. When the
+request's If-None-Match matches, or its If-Modified-Since is not older
+than the last write, the dependency raises NotModified before the route
+runs. The 304 then costs one primary key lookup: no query of the data
+and nothing serialized. Otherwise the encoded body may already be in
+app.response_cache, which is sent without running the route either.
+
+The route's body must be built from the data at its tag. The dependency
+starts the request's transaction as REPEATABLE READ, so the versions and
+every query of the route, including the ones in db.run_sync, read one
+snapshot. Routes that cache their data key it by ``request_versions``,
+the versions the dependency read, never by the request parameters alone:
+an entry loaded before a write, on this or another worker, would
+otherwise be sent under the tag of the write.
+"""
+
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_read_db
+from .response_cache import serve_cached
+from .versions import get_version_stamps
+
+
+# request.state attribute holding the versions read by conditional()
+STATE_KEY = "data_versions"
+
+# Postgres takes the snapshot at the first query and keeps it to the end of
+# the transaction; read-only transactions never fail to serialize
+SNAPSHOT_ISOLATION = "REPEATABLE READ"
+
+
+class NotModified(Exception):
+    """The client's copy is current, answered with an empty 304"""
+
+    def __init__(self, headers: dict):
+        self.headers = headers
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
+
+
+def _http_date(moment: datetime) -> str:
+    return format_datetime(moment.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _strip_encoding(tag: str) -> str:
+    # Compressed variants from app.response_cache carry the coding in their tag
+    for suffix in ('-gzip"', '-br"'):
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def _is_fresh(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    # If-None-Match wins over If-Modified-Since, and compares weakly
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(_strip_encoding(tag.removeprefix("W/")) == etag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional(*resources: str, daily: bool = False):
+    """
+    Dependency answering 304 when the client has the current representation
+
+    ``daily`` is for responses that also depend on the date, like the
+    fixtures' days_until: the tag changes at midnight as well.
+    """
+
+    async def check(request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+        # Same session as the route, and read before its data, see app.versions.
+        # Only a transaction begun here reads the versions and the data in one
+        # snapshot, a body read otherwise may be newer than its tag and is not stored
+        snapshot = not db.in_transaction()
+        if snapshot:
+            await db.connection(execution_options={"isolation_level": SNAPSHOT_ISOLATION})
+        stamps = await get_version_stamps(db, *resources)
+        setattr(request.state, STATE_KEY, tuple(version for version, _ in stamps))
+        tag = "-".join(f"{resource}.{version}" for resource, (version, _) in zip(resources, stamps))
+        written = [updated_at for _, updated_at in stamps if updated_at is not None]
+        last_modified = max(written) if written else None
+        if daily:
+            today = date.today()
+            tag += f"-{today.isoformat()}"
+            midnight = datetime.combine(today, time.min)
+            last_modified = max(last_modified, midnight) if last_modified else midnight
+
+        headers = {"ETag": f'"{tag}"', "Cache-Control": "no-cache"}
+        if last_modified is not None:
+            headers["Last-Modified"] = _http_date(last_modified)
+        if _is_fresh(request, headers["ETag"], last_modified):
+            raise NotModified(headers)
+        serve_cached(request, headers["ETag"], store=snapshot)
+        response.headers.update(headers)
+
+    return Depends(check)
+
+
+def request_versions(request: Request) -> Tuple[int, ...]:
+    """Versions of the resources of the route's conditional(), in its order, to key the route's caches by"""
+    return getattr(request.state, STATE_KEY)
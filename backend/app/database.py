@@ -1,29 +1,177 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 
+from .pool_metrics import MeteredAsyncQueuePool, MeteredQueuePool
+from .replica import ReplicaRouter
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Connection pool settings, size these against the number of workers and
+# the connection limit of the database
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+# Pre-ping costs a round trip per checkout; without it a dropped connection
+# fails one query and the pool is invalidated instead
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# The synchronous engine only serves the scheduler and background jobs
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", "2"))
+DB_SYNC_MAX_OVERFLOW = int(os.getenv("DB_SYNC_MAX_OVERFLOW", "3"))
+
+# Optional streaming replica for read-only routes
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# Reads go back to the primary while the replica is further behind than this
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "10"))
+# After a write in this process, reads stay on the primary for this long
+DB_REPLICA_READ_AFTER_WRITE = float(os.getenv("DB_REPLICA_READ_AFTER_WRITE", "5"))
+
+pool_settings = {
+    "async": {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    },
+    "sync": {
+        "pool_size": DB_SYNC_POOL_SIZE,
+        "max_overflow": DB_SYNC_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    },
+}
+# The replica serves the same request traffic as the async pool
+pool_settings["replica"] = dict(pool_settings["async"])
+
+APPLICATION_NAME = "skywalkers-backend"
+
 # Configure connection arguments based on database type
 connect_args = {
     "connect_timeout": 10,
-    "application_name": "skywalkers-backend"
+    "application_name": APPLICATION_NAME
 }
 
+# Synchronous engine, used by the scheduler, background jobs and CLI scripts
 engine = create_engine(
-    DATABASE_URL, 
+    DATABASE_URL,
     connect_args=connect_args,
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_recycle=300     # Recycle connections after 5 minutes
+    poolclass=MeteredQueuePool,
+    **pool_settings["sync"]
+)
+
+
+class PrimarySession(Session):
+    """Session bound to the primary"""
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=PrimarySession)
+
+
+def _async_database_url(url: str):
+    """Point the configured DATABASE_URL at the asyncpg driver"""
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    # asyncpg does not understand libpq's sslmode, it takes an ``ssl`` argument instead
+    sslmode = async_url.query.get("sslmode")
+    if sslmode:
+        async_url = async_url.difference_update_query(["sslmode"])
+    return async_url, sslmode
+
+
+def _async_connect_args(sslmode):
+    connect_args = {
+        "timeout": 10,
+        "server_settings": {"application_name": APPLICATION_NAME},
+    }
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = sslmode
+    return connect_args
+
+
+ASYNC_DATABASE_URL, _sslmode = _async_database_url(DATABASE_URL)
+
+# Asynchronous engine, used by every request handler so DB round trips
+# never block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=_async_connect_args(_sslmode),
+    poolclass=MeteredAsyncQueuePool,
+    **pool_settings["async"]
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    autoflush=False,
+    expire_on_commit=False  # Objects are serialized after commit, avoid implicit reloads
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+replica_engine = None
+ReplicaSessionLocal = None
+replica_router = None
+if DATABASE_REPLICA_URL:
+    _replica_url, _replica_sslmode = _async_database_url(DATABASE_REPLICA_URL)
+    replica_engine = create_async_engine(
+        _replica_url,
+        connect_args=_async_connect_args(_replica_sslmode),
+        poolclass=MeteredAsyncQueuePool,
+        **pool_settings["replica"]
+    )
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    replica_router = ReplicaRouter(
+        replica_engine,
+        max_lag=DB_REPLICA_MAX_LAG,
+        check_interval=DB_REPLICA_CHECK_INTERVAL,
+        read_after_write=DB_REPLICA_READ_AFTER_WRITE
+    )
+
+    # Every INSERT, UPDATE and DELETE on the primary, whether flushed by a
+    # session, executed as a Core statement or run in db.run_sync, marks its
+    # connection; committing a marked connection records the write
+    def _mark_connection_wrote(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+            conn.info["wrote"] = True
+
+    def _record_primary_write(conn):
+        if conn.info.pop("wrote", False):
+            replica_router.record_write()
+
+    def _forget_connection_wrote(conn):
+        conn.info.pop("wrote", None)
+
+    for _primary in (engine, async_engine.sync_engine):
+        event.listen(_primary, "after_cursor_execute", _mark_connection_wrote)
+        event.listen(_primary, "commit", _record_primary_write)
+        event.listen(_primary, "rollback", _forget_connection_wrote)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Session on the primary, used by every route that writes"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+async def get_read_db():
+    """Session for read-only routes, served by the replica when it is healthy"""
+    if replica_router is None or not await replica_router.use_replica():
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    async with ReplicaSessionLocal() as db:
+        try:
+            yield db
+        except (exc.OperationalError, exc.InterfaceError, OSError) as e:
+            replica_router.mark_unavailable(f"{type(e).__name__}: {e}")
+            raise
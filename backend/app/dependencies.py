@@ -1,25 +1,19 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import get_db
-from .models import User
-from .auth.auth import verify_token
+from .auth.principals import STATE_KEY, Principal, resolve_principal
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    email = verify_token(credentials.credentials)
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    # ManagerAuthMiddleware already resolved the token of /admin requests
+    principal = getattr(request.state, STATE_KEY, None)
+    if principal is None:
+        principal = await resolve_principal(credentials.credentials)
+    return principal
 
 # All users are now managers, so this is just an alias
-def get_current_manager(current_user: User = Depends(get_current_user)):
+def get_current_manager(current_user: Principal = Depends(get_current_user)):
     return current_user
\ No newline at end of file
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "false").lower() in ("1", "true", "yes")
+# A stall shorter than this is not reported
+LOOP_MONITOR_THRESHOLD_MS = float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "100"))
+# How often the heartbeat coroutine and the watchdog thread wake up
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "20"))
+
+NO_REQUEST = "(no request)"
+
+
+class LoopMonitor:
+    """
+    Event loop watchdog.
+
+    A heartbeat coroutine measures how late the loop wakes it up. A watchdog
+    thread notices when the heartbeat stops and samples the stack of the loop
+    thread, so every stall is attributed to the route and the code that was
+    running when the loop was blocked.
+    """
+
+    def __init__(self, threshold_ms: float = LOOP_MONITOR_THRESHOLD_MS, interval_ms: float = LOOP_MONITOR_INTERVAL_MS):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.started_at: Optional[datetime] = None
+
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+        # Sample taken by the watchdog for the stall in progress
+        self._current_sample: Optional[dict] = None
+
+        self.routes = {}
+        self.recent_stalls = deque(maxlen=50)
+        self.total_blocked = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    def start(self):
+        """Start monitoring the running event loop"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self.started_at = datetime.utcnow()
+
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+        logger.info(
+            f"Event loop monitor started (threshold {self.threshold * 1000:.0f}ms, "
+            f"interval {self.interval * 1000:.0f}ms)"
+        )
+
+    def stop(self):
+        """Stop the heartbeat and the watchdog thread"""
+        self._stopping.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+    def reset(self):
+        """Clear collected statistics"""
+        with self._lock:
+            self.routes = {}
+            self.recent_stalls.clear()
+            self.total_blocked = 0.0
+            self.max_lag = 0.0
+
+    async def _heartbeat(self):
+        while not self._stopping.is_set():
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+
+            lag = now - before - self.interval
+            if lag >= self.threshold:
+                self._record_stall(lag)
+            else:
+                with self._lock:
+                    self._current_sample = None
+
+    def _watch(self):
+        while not self._stopping.wait(self.interval):
+            if time.monotonic() - self._last_beat < self.threshold:
+                continue
+            with self._lock:
+                if self._current_sample is not None:
+                    continue
+            # Sample once per stall, while the loop thread is still stuck in the blocking call
+            sample = self._sample_loop_thread()
+            with self._lock:
+                if self._current_sample is None:
+                    self._current_sample = sample
+
+    def _sample_loop_thread(self) -> dict:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return {"route": NO_REQUEST, "stack": []}
+        stack = traceback.format_stack(frame)
+        return {"route": self._route_for_frame(frame), "stack": [line.rstrip() for line in stack[-15:]]}
+
+    @staticmethod
+    def _route_for_frame(frame) -> str:
+        """Find the innermost ASGI frame on the stack and describe its route"""
+        while frame is not None:
+            scope = frame.f_locals.get("scope")
+            if isinstance(scope, dict) and scope.get("type") == "http":
+                route = scope.get("route")
+                path = getattr(route, "path", None) or scope.get("path", "")
+                return f"{scope.get('method', '')} {path}".strip()
+            frame = frame.f_back
+        return NO_REQUEST
+
+    def _record_stall(self, lag: float):
+        with self._lock:
+            sample = self._current_sample or {"route": NO_REQUEST, "stack": []}
+            self._current_sample = None
+
+            route = sample["route"]
+            stats = self.routes.setdefault(route, {
+                "stalls": 0,
+                "blocked_ms": 0.0,
+                "max_blocked_ms": 0.0,
+                "last_stack": [],
+            })
+            lag_ms = lag * 1000
+            stats["stalls"] += 1
+            stats["blocked_ms"] += lag_ms
+            stats["max_blocked_ms"] = max(stats["max_blocked_ms"], lag_ms)
+            if sample["stack"]:
+                stats["last_stack"] = sample["stack"]
+
+            self.total_blocked += lag
+            self.max_lag = max(self.max_lag, lag)
+            self.recent_stalls.append({
+                "at": datetime.utcnow().isoformat(),
+                "route": route,
+                "blocked_ms": round(lag_ms, 1),
+                "stack": sample["stack"],
+            })
+
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms in {route}")
+
+    def get_report(self) -> dict:
+        """Per-route time spent blocking the loop, worst offenders first"""
+        with self._lock:
+            routes = [
+                {
+                    "route": route,
+                    "stalls": stats["stalls"],
+                    "blocked_ms": round(stats["blocked_ms"], 1),
+                    "max_blocked_ms": round(stats["max_blocked_ms"], 1),
+                    "last_stack": stats["last_stack"],
+                }
+                for route, stats in self.routes.items()
+            ]
+            recent = list(self.recent_stalls)
+
+        routes.sort(key=lambda r: r["blocked_ms"], reverse=True)
+        return {
+            "enabled": True,
+            "running": self.running,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "threshold_ms": self.threshold * 1000,
+            "total_blocked_ms": round(self.total_blocked * 1000, 1),
+            "max_blocked_ms": round(self.max_lag * 1000, 1),
+            "routes": routes,
+            "recent_stalls": recent,
+        }
+
+
+# Global monitor instance
+loop_monitor = None
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    """Get the global loop monitor, None when monitoring is disabled"""
+    global loop_monitor
+    if loop_monitor is None and LOOP_MONITOR_ENABLED:
+        loop_monitor = LoopMonitor()
+    return loop_monitor
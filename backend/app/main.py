@@ -1,10 +1,17 @@
+import asyncio
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routers import auth, games, players, stats, admin, ladder, stats_scraper, fixtures
-from .middlewares import ManagerAuthMiddleware
+from fastapi.responses import ORJSONResponse
+from .routers import auth, games, players, stats, admin, ladder, stats_scraper, fixtures, diagnostics
+from .middlewares import ManagerAuthMiddleware, RequestTimingMiddleware, ResponseCacheMiddleware
 from .scheduler import get_scheduler
+from .loop_monitor import get_loop_monitor
+from .request_metrics import SERVER_TIMING_ENABLED
+from .schema_check import SCHEMA_CHECK_ENABLED, verify_schema_at_head
+from .conditional import NotModified, not_modified_handler
+from .response_cache import CachedResponse, cached_response_handler
+from .auth.tokens import token_table
 
 # Configure logging
 logging.basicConfig(
@@ -12,16 +19,46 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-Base.metadata.create_all(bind=engine)
+# Routes without their own serializer (see app.serialization) are encoded with orjson
+app = FastAPI(
+    title="Skywalkers Basketball Tracker",
+    version="1.0.0",
+    redirect_slashes=False,
+    default_response_class=ORJSONResponse,
+)
 
-app = FastAPI(title="Skywalkers Basketball Tracker", version="1.0.0", redirect_slashes=False)
+# Raised by app.conditional when the client's copy is current
+app.add_exception_handler(NotModified, not_modified_handler)
+# Raised by app.response_cache when the encoded body is cached
+app.add_exception_handler(CachedResponse, cached_response_handler)
 
 # Initialize scheduler on startup
 @app.on_event("startup")
 async def startup_event():
-    # Initialize the scheduler
-    scheduler = get_scheduler()
-    print("Scheduler initialized with scheduled tasks")
+    # The schema is owned by `alembic upgrade head`, only check that it ran
+    if SCHEMA_CHECK_ENABLED:
+        await verify_schema_at_head()
+
+    # Token versions and revocations, kept fresh from data_versions
+    await token_table.start()
+
+    # Started in a thread once the worker is up, importing apscheduler does not delay serving
+    asyncio.get_running_loop().run_in_executor(None, get_scheduler)
+
+    # Opt-in event loop stall detection
+    monitor = get_loop_monitor()
+    if monitor:
+        monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    token_table.stop()
+    monitor = get_loop_monitor()
+    if monitor:
+        monitor.stop()
+
+# Innermost, stores the bodies of the responses app.response_cache missed
+app.add_middleware(ResponseCacheMiddleware)
 
 # Add manager auth middleware
 app.add_middleware(ManagerAuthMiddleware)
@@ -32,8 +69,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID", "X-Next-Cursor", "Link", "ETag", "Last-Modified"],
 )
 
+# Outermost, so the total covers the other middlewares
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(RequestTimingMiddleware)
+
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(games.router)
@@ -42,6 +84,7 @@ app.include_router(stats.router)
 app.include_router(stats_scraper.router)
 app.include_router(ladder.router)
 app.include_router(fixtures.router)
+app.include_router(diagnostics.router)
 
 @app.get("/")
 async def root():
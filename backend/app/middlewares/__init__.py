@@ -1,3 +1,5 @@
 from .manager_auth import ManagerAuthMiddleware
+from .request_timing import RequestTimingMiddleware
+from .response_cache import ResponseCacheMiddleware
 
-__all__ = ["ManagerAuthMiddleware"]
\ No newline at end of file
+__all__ = ["ManagerAuthMiddleware", "RequestTimingMiddleware", "ResponseCacheMiddleware"]
\ No newline at end of file
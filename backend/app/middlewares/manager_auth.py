@@ -1,9 +1,6 @@
 from fastapi import Request, HTTPException, status
 from fastapi.security.utils import get_authorization_scheme_param
-from sqlalchemy.orm import Session
-from ..database import SessionLocal
-from ..models import User
-from ..auth.auth import verify_token
+from ..auth.principals import STATE_KEY, resolve_principal
 
 class ManagerAuthMiddleware:
     def __init__(self, app):
@@ -36,24 +33,13 @@ class ManagerAuthMiddleware:
                         headers={"WWW-Authenticate": "Bearer"},
                     )
 
-                # Verify token and get user
-                email = verify_token(token)
-                db = SessionLocal()
-                try:
-                    user = db.query(User).filter(User.email == email).first()
-                    if not user:
-                        raise HTTPException(
-                            status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="User not found"
-                        )
-                    
-                    # All users are now managers, so just verify they exist
-                    
-                    # Add user to request state
-                    scope["state"] = {"current_manager": user}
-                    
-                finally:
-                    db.close()
+                # Verify token and get user, usually from the principal cache
+                principal = await resolve_principal(token)
+                
+                # All users are now managers, so just verify they exist
+                
+                # Add user to request state, get_current_user reuses it
+                scope.setdefault("state", {})[STATE_KEY] = principal
                     
             except HTTPException:
                 # If authentication fails, return error response
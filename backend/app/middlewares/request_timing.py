@@ -0,0 +1,42 @@
+import re
+import time
+
+from ..request_metrics import start_request_metrics
+
+# Accept a caller supplied request ID only when it is safe to echo back
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+class RequestTimingMiddleware:
+    """
+    Adds a Server-Timing header (db, auth, serialization, total) and an
+    X-Request-ID header to every HTTP response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+
+        metrics = start_request_metrics(request_id)
+        scope.setdefault("state", {})["request_id"] = metrics.request_id
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", metrics.server_timing(time.perf_counter()).encode("latin-1")))
+                headers.append((b"x-request-id", metrics.request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
\ No newline at end of file
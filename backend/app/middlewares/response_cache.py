@@ -0,0 +1,44 @@
+from ..response_cache import STATE_KEY, EncodedResponse, response_cache
+
+class ResponseCacheMiddleware:
+    """
+    Stores the 200 responses of requests that app.response_cache marked as
+    misses, so the next request for the same URL and version is sent from
+    the cached bytes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        # The route's request.state writes into this dict
+        state = scope.setdefault("state", {})
+        start = None
+        chunks = []
+
+        async def send_and_capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body" and state.get(STATE_KEY) is not None:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    _store(state[STATE_KEY], start, b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
+
+
+def _store(key, start, body):
+    if start is None or start["status"] != 200:
+        return
+    headers = start.get("headers", [])
+    names = {name.lower() for name, _ in headers}
+    # Already encoded, or meant for this client only
+    if b"content-encoding" in names or b"set-cookie" in names:
+        return
+    response_cache.set(key, EncodedResponse(key[-1], headers, body))
@@ -2,6 +2,9 @@ from .user import User
 from .game import Game
 from .player import Player
 from .player_game_stats import PlayerGameStats
-from .ladder import LadderEntry
+from .player_season_totals import PlayerSeasonTotals
+from .ladder import LadderEntry, LadderSnapshot, LadderCurrentSnapshot
+from .data_version import DataVersion
+from .revoked_token import RevokedToken
 
-__all__ = ["User", "Game", "Player", "PlayerGameStats", "LadderEntry"]
\ No newline at end of file
+__all__ = ["User", "Game", "Player", "PlayerGameStats", "PlayerSeasonTotals", "LadderEntry", "LadderSnapshot", "LadderCurrentSnapshot", "DataVersion", "RevokedToken"]
\ No newline at end of file
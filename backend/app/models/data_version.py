@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from datetime import datetime
+from ..database import Base
+
+class DataVersion(Base):
+    """
+    Write counter of a resource, see app.versions
+
+    Bumped in the same transaction as every write to the resource, so a
+    reader that sees a version also sees the rows it stands for.
+    """
+    __tablename__ = "data_versions"
+
+    resource = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        Index("ix_games_datetime", "datetime"),
+        Index(
+            "ix_games_upcoming", "datetime",
+            postgresql_where=text("final_score_skywalkers IS NULL AND final_score_opponent IS NULL")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     opponent_name = Column(String, nullable=False)
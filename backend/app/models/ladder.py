@@ -1,11 +1,49 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Index, text
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
 
+class LadderSnapshot(Base):
+    """
+    One scrape of a division's ladder, a new one is only stored when the standings changed
+
+    The current snapshot of a division holds every team. Once a newer one
+    arrives, rows that did not change are dropped from it and ``is_full``
+    is cleared, see LadderService.get_ladder_as_of for reading it back.
+    """
+    __tablename__ = "ladder_snapshots"
+    __table_args__ = (
+        Index("ix_ladder_snapshots_division_fetched_at", "division", text("fetched_at DESC")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    season = Column(String, nullable=True)
+    division = Column(String, nullable=True)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    content_hash = Column(String(64), nullable=False)  # sha256 of the standings, see ladder_content_hash
+    is_full = Column(Boolean, nullable=False, default=True, server_default=text("true"))
+
+    entries = relationship("LadderEntry", back_populates="snapshot", order_by="LadderEntry.position")
+
+class LadderCurrentSnapshot(Base):
+    """Pointer to the current snapshot of each division"""
+    __tablename__ = "ladder_current_snapshots"
+
+    division = Column(String, primary_key=True)  # '' when the scrape found no division
+    snapshot_id = Column(Integer, ForeignKey("ladder_snapshots.id"), nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    snapshot = relationship("LadderSnapshot")
+
 class LadderEntry(Base):
     __tablename__ = "ladder_entries"
+    __table_args__ = (
+        Index("ix_ladder_entries_last_updated_position", text("last_updated DESC"), "position"),
+        Index("ix_ladder_entries_snapshot_position", "snapshot_id", "position"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    snapshot_id = Column(Integer, ForeignKey("ladder_snapshots.id"), nullable=True)
     team_name = Column(String, nullable=False)
     position = Column(Integer, nullable=False)
     wins = Column(Integer, default=0)
@@ -20,4 +58,6 @@ class LadderEntry(Base):
     season = Column(String, nullable=True)
     division = Column(String, nullable=True)
     last_updated = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    snapshot = relationship("LadderSnapshot", back_populates="entries")
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, String, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
 
 class PlayerGameStats(Base):
     __tablename__ = "player_game_stats"
+    __table_args__ = (
+        UniqueConstraint("player_id", "game_id", name="uq_player_game_stats_player_game"),
+        Index("ix_player_game_stats_game_id", "game_id"),
+        Index(
+            "ix_player_game_stats_unverified_scraped", "id",
+            postgresql_where=text("is_scraped AND NOT is_verified")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     player_id = Column(Integer, ForeignKey("players.id"), nullable=False)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+class PlayerSeasonTotals(Base):
+    """
+    Per player, per season sums of player_game_stats
+
+    Kept up to date by every stats write through
+    app.services.season_totals.refresh_season_totals, rebuilt from scratch
+    with the ``rebuild-season-totals`` command.
+    """
+    __tablename__ = "player_season_totals"
+    __table_args__ = (
+        Index("ix_player_season_totals_season_points", "season", text("total_points DESC")),
+    )
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    season = Column(String, primary_key=True)  # e.g. "2025 Winter", see season_totals.season_of
+    games_played = Column(Integer, nullable=False, default=0)
+    total_points = Column(Integer, nullable=False, default=0)
+    total_fouls = Column(Integer, nullable=False, default=0)
+    high_points = Column(Integer, nullable=False, default=0)
+    high_fouls = Column(Integer, nullable=False, default=0)
+    last_played_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    player = relationship("Player")
+
+    @property
+    def average_points(self) -> float:
+        return self.total_points / self.games_played if self.games_played else 0.0
+
+    @property
+    def average_fouls(self) -> float:
+        return self.total_fouls / self.games_played if self.games_played else 0.0
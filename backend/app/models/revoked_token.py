@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from datetime import datetime
+from ..database import Base
+
+class RevokedToken(Base):
+    """
+    A token logged out before it expired, see app.auth.tokens
+
+    Only needed until ``expires_at``, after that the token is rejected anyway.
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    jti = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
\ No newline at end of file
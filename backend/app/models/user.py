@@ -7,4 +7,6 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
-    name = Column(String, nullable=False)
\ No newline at end of file
+    name = Column(String, nullable=False)
+    # Carried by every token issued to the user, bumping it revokes them all
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
\ No newline at end of file
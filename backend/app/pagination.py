@@ -0,0 +1,118 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Request, Response, status
+from sqlalchemy import DateTime, Select, tuple_
+
+from .models import Game, Player, PlayerGameStats, User
+
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Keyset:
+    """
+    Sort key of a paginated list.
+
+    Every column is sorted in the same direction so the page boundary is a
+    single row comparison that the index on the leading column can serve.
+    The last column must be unique, usually the primary key.
+    """
+
+    def __init__(self, *columns, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    def order_by(self) -> list:
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def after(self, values: Sequence[Any]):
+        """Condition selecting the rows that sort after ``values``"""
+        row = tuple_(*self.columns)
+        boundary = tuple_(*values)
+        return row < boundary if self.descending else row > boundary
+
+    def cursor_for(self, item) -> str:
+        """Cursor of a row, either an ORM object or a dict of its fields"""
+        if isinstance(item, dict):
+            return self.encode([item[column.key] for column in self.columns])
+        return self.encode([getattr(item, column.key) for column in self.columns])
+
+    def encode(self, values: Sequence[Any]) -> str:
+        payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(payload, list) or len(payload) != len(self.columns):
+                raise ValueError("cursor does not match the sort key")
+            values = []
+            for column, value in zip(self.columns, payload):
+                if isinstance(column.type, DateTime):
+                    value = datetime.fromisoformat(value)
+                elif not isinstance(value, column.type.python_type):
+                    raise ValueError(f"bad value for {column.key}")
+                values.append(value)
+            return tuple(values)
+        except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class PageParams:
+    """
+    ``limit`` and ``cursor`` query parameters of a list endpoint.
+
+    The response body stays a plain list. The cursor of the next page is
+    sent in the X-Next-Cursor header and as a ``Link: rel="next"`` URL, both
+    are missing on the last page.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    ):
+        self.request = request
+        self.response = response
+        self.limit = limit
+        self.cursor = cursor
+
+    @property
+    def cache_key(self) -> tuple:
+        """Identifies the page, for caching the rows ``apply`` fetched"""
+        return (self.limit, self.cursor)
+
+    def apply(self, stmt: Select, keyset: Keyset) -> Select:
+        """Order, seek past the cursor and fetch one extra row to detect a next page"""
+        if self.cursor:
+            stmt = stmt.filter(keyset.after(keyset.decode(self.cursor)))
+        return stmt.order_by(*keyset.order_by()).limit(self.limit + 1)
+
+    def page(self, items: Sequence, keyset: Keyset) -> List:
+        """Trim the extra row off the result of ``apply`` and set the next-page headers"""
+        items = list(items)
+        if len(items) > self.limit:
+            items = items[:self.limit]
+            next_cursor = keyset.cursor_for(items[-1])
+            next_url = self.request.url.include_query_params(cursor=next_cursor, limit=self.limit)
+            self.response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            self.response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return items
+
+
+# Sort keys of the paginated lists
+GAMES_KEYSET = Keyset(Game.datetime, Game.id, descending=True)  # Newest first
+UPCOMING_GAMES_KEYSET = Keyset(Game.datetime, Game.id)  # Soonest first
+PLAYERS_KEYSET = Keyset(Player.jersey_number, Player.id)
+STATS_KEYSET = Keyset(PlayerGameStats.id)
+USERS_KEYSET = Keyset(User.id)
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Counters for connection checkouts and invalidations of one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.invalidated = 0
+        self.soft_invalidated = 0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidate(self, soft: bool = False):
+        with self._lock:
+            if soft:
+                self.soft_invalidated += 1
+            else:
+                self.invalidated += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_checkout_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3),
+                "checkout_timeouts": self.timeouts,
+                "connections_invalidated": self.invalidated,
+                "connections_soft_invalidated": self.soft_invalidated,
+            }
+
+
+class _MeteredPoolMixin:
+    """Times every checkout, including the wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        event.listen(self, "invalidate", lambda *args: self.metrics.record_invalidate())
+        event.listen(self, "soft_invalidate", lambda *args: self.metrics.record_invalidate(soft=True))
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_status(pool, settings: dict) -> dict:
+    """Live occupancy of a QueuePool plus its checkout metrics"""
+    status = {
+        "pool_class": type(pool).__name__,
+        "pool_size": pool.size(),
+        "max_overflow": settings["max_overflow"],
+        "timeout_s": settings["pool_timeout"],
+        "recycle_s": settings["pool_recycle"],
+        "pre_ping": settings["pool_pre_ping"],
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -pool_size, it is only positive once the pool is exhausted
+        "overflow_in_use": max(pool.overflow(), 0),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction. A server that is not in recovery is
+# treated as fully caught up.
+REPLICATION_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Decides whether a read-only request can be served by the replica.
+
+    Replication lag is checked at most once per check interval and cached.
+    Reads fall back to the primary while the replica is unreachable or
+    further behind than max_lag, and for a short window after this process
+    committed a write, so a client reloading right after a change sees it.
+    """
+
+    def __init__(self, engine, max_lag: float, check_interval: float, read_after_write: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.read_after_write = read_after_write
+
+        self.available = False
+        self.lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._last_write = 0.0
+        self._check_lock = asyncio.Lock()
+        self._counter_lock = threading.Lock()
+
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def record_write(self):
+        """Called after every committed write on the primary"""
+        self._last_write = time.monotonic()
+
+    def mark_unavailable(self, reason: str):
+        """Stop routing reads to the replica until the next successful check"""
+        if self.available:
+            logger.warning(f"Read replica marked unavailable: {reason}")
+        self.available = False
+        self.last_error = reason
+        self._checked_at = time.monotonic()
+
+    async def use_replica(self) -> bool:
+        """Whether the current read should go to the replica"""
+        use = await self._should_use_replica()
+        with self._counter_lock:
+            if use:
+                self.replica_reads += 1
+            else:
+                self.primary_reads += 1
+        return use
+
+    async def _should_use_replica(self) -> bool:
+        if time.monotonic() - self._last_write < self.read_after_write:
+            return False
+        if self._check_due():
+            async with self._check_lock:
+                # Another request may have refreshed the lag while we waited
+                if self._check_due():
+                    await self._check()
+        return self.available
+
+    def _check_due(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    async def _check(self):
+        try:
+            async with asyncio.timeout(2):
+                async with self.engine.connect() as conn:
+                    lag = float(await conn.scalar(REPLICATION_LAG_SQL))
+        except Exception as e:
+            self.lag = None
+            self.mark_unavailable(f"{type(e).__name__}: {e}")
+            return
+
+        self._checked_at = time.monotonic()
+        self.lag = lag
+        if lag > self.max_lag:
+            if self.available:
+                logger.warning(f"Read replica is {lag:.1f}s behind, reading from the primary")
+            self.available = False
+            self.last_error = f"Replication lag {lag:.1f}s exceeds {self.max_lag:.1f}s"
+        else:
+            if not self.available:
+                logger.info(f"Read replica available (lag {lag:.1f}s)")
+            self.available = True
+            self.last_error = None
+
+    def get_status(self) -> dict:
+        with self._counter_lock:
+            replica_reads, primary_reads = self.replica_reads, self.primary_reads
+        return {
+            "configured": True,
+            "available": self.available,
+            "lag_s": round(self.lag, 3) if self.lag is not None else None,
+            "max_lag_s": self.max_lag,
+            "check_interval_s": self.check_interval,
+            "read_after_write_s": self.read_after_write,
+            "last_error": self.last_error,
+            "replica_reads": replica_reads,
+            "primary_reads": primary_reads,
+        }
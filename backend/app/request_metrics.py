@@ -0,0 +1,201 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class RequestMetrics:
+    """Statement count and time breakdown of a single request"""
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.distinct_statements = set()
+        self.db_time = 0.0
+        self.auth_time = 0.0
+        self.serialization_time = 0.0
+        self.endpoint_done: Optional[float] = None
+
+    @property
+    def repeated_statements(self) -> int:
+        """Statements that ran more than once with the same SQL, usually an N+1"""
+        return self.statements - len(self.distinct_statements)
+
+    def server_timing(self, now: float) -> str:
+        """Value of the Server-Timing header, durations in milliseconds"""
+        entries = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} queries, {self.repeated_statements} repeated"',
+        ]
+        if self.auth_time:
+            entries.append(f"auth;dur={self.auth_time * 1000:.1f}")
+        if self.endpoint_done is not None:
+            # Routes encoding their own response do it before they return
+            serialization = self.serialization_time + now - self.endpoint_done
+            entries.append(f"serialization;dur={serialization * 1000:.1f}")
+        entries.append(f"total;dur={(now - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def start_request_metrics(request_id: Optional[str] = None) -> RequestMetrics:
+    metrics = RequestMetrics(request_id)
+    _current_metrics.set(metrics)
+    return metrics
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """Metrics of the request being handled, None outside a request"""
+    return _current_metrics.get()
+
+
+@contextmanager
+def timed_auth():
+    """Add the time spent in the block to the auth entry of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.auth_time += time.perf_counter() - start
+
+
+@contextmanager
+def timed_serialization():
+    """Add the time spent in the block to the serialization entry of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.serialization_time += time.perf_counter() - start
+
+
+def _mark_endpoint_done():
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.endpoint_done = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """
+    Route that records when the endpoint returns, everything after that until
+    the response starts is response model validation and JSON encoding.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        endpoint = self.dependant.call
+
+        # The request handler already decided between awaiting the endpoint and
+        # running it in the threadpool, the wrapper has to keep that shape
+        if asyncio.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def timed_endpoint(*args, **kwargs):
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    _mark_endpoint_done()
+        else:
+            @functools.wraps(endpoint)
+            def timed_endpoint(*args, **kwargs):
+                try:
+                    return endpoint(*args, **kwargs)
+                finally:
+                    _mark_endpoint_done()
+
+        self.dependant.call = timed_endpoint
+
+
+class QueryCounter:
+    """Statements executed on any engine while the counter is active"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_active_counters: List[QueryCounter] = []
+_counters_lock = threading.Lock()
+
+
+@contextmanager
+def count_queries():
+    """
+    Count every statement executed in the block, in any thread.
+
+    Usage:
+        with count_queries() as counter:
+            client.get("/games")
+        print(counter.count)
+    """
+    counter = QueryCounter()
+    with _counters_lock:
+        _active_counters.append(counter)
+    try:
+        yield counter
+    finally:
+        with _counters_lock:
+            _active_counters.remove(counter)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Fail with the executed statements when the block runs more than ``limit`` queries.
+
+    Usage:
+        with assert_max_queries(2):
+            response = client.get("/stats/game/1")
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        statements = "\n".join(f"  {i + 1}. {statement}" for i, statement in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {limit} queries, {counter.count} were executed:\n{statements}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.statements += 1
+        metrics.distinct_statements.add(statement)
+        metrics.db_time += elapsed
+
+    if _active_counters:
+        with _counters_lock:
+            for counter in _active_counters:
+                counter.statements.append(statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
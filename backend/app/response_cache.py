@@ -0,0 +1,176 @@
+"""
+Cache of encoded response bodies for the conditional GET routes.
+
+Entries are keyed by path, query string and the route's ETag (see
+app.conditional), so a write that bumps a resource version makes every
+entry of the older version unreachable; they age out of the LRU. Each
+entry holds the JSON body as sent plus gzip and, when the ``brotli``
+package is installed, brotli variants, compressed once when stored.
+
+On a hit the conditional dependency raises CachedResponse and the bytes
+go out as they are: no query, no validation, no JSON encoding.
+ResponseCacheMiddleware fills the cache from the responses of misses,
+only those whose route read its data in the snapshot its ETag came from
+(see app.conditional). Any other body could be stored under a tag that
+does not match it and then be served until the next write.
+"""
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional, entries then only have a gzip variant
+    brotli = None
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Total size of the cached bodies and their variants, per worker
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Bodies smaller than this are not worth compressing
+RESPONSE_CACHE_MIN_COMPRESS = int(os.getenv("RESPONSE_CACHE_MIN_COMPRESS", "512"))
+
+# Set on request.state by a miss, tells the middleware to store the response
+STATE_KEY = "response_cache_key"
+
+# Response headers that belong to one request, or that the cache sets itself
+_SKIPPED_HEADERS = {b"content-length", b"content-encoding", b"vary", b"server-timing", b"x-request-id"}
+
+
+class EncodedResponse:
+    """A 200 response body with its compressed variants, and the headers to send with any of them"""
+
+    def __init__(self, etag: str, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.etag = etag
+        self.headers = [(name, value) for name, value in headers if name.lower() not in _SKIPPED_HEADERS]
+        self.variants: Dict[str, bytes] = {"identity": body}
+        if len(body) >= RESPONSE_CACHE_MIN_COMPRESS:
+            self.variants["gzip"] = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=5)
+        self.size = sum(len(variant) for variant in self.variants.values())
+
+    def choose(self, accept_encoding: str) -> str:
+        """Best variant the client accepts, brotli over gzip over none"""
+        accepted = {
+            coding.split(";")[0].strip().lower()
+            for coding in accept_encoding.split(",")
+            if not coding.replace(" ", "").endswith(";q=0")
+        }
+        for coding in ("br", "gzip"):
+            if coding in self.variants and coding in accepted:
+                return coding
+        return "identity"
+
+    def to_response(self, accept_encoding: str) -> Response:
+        coding = self.choose(accept_encoding)
+        response = Response(content=self.variants[coding])
+        response.raw_headers.extend(self.headers)
+        response.raw_headers.append((b"vary", b"Accept-Encoding"))
+        if coding != "identity":
+            response.raw_headers.append((b"content-encoding", coding.encode()))
+            # Strong ETags differ between encodings of the same body
+            response.headers["etag"] = variant_etag(self.etag, coding)
+        return response
+
+
+def variant_etag(etag: str, coding: str) -> str:
+    return etag if coding == "identity" else f'{etag[:-1]}-{coding}"'
+
+
+class ResponseCache:
+    """LRU of EncodedResponse bounded by the bytes it holds"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.enabled = RESPONSE_CACHE_ENABLED
+        self._entries: "OrderedDict[tuple, EncodedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[EncodedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: tuple, entry: EncodedResponse):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "brotli": brotli is not None,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+
+
+class CachedResponse(Exception):
+    """Raised with the response to send when the encoded body is cached"""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+async def cached_response_handler(request: Request, exc: CachedResponse) -> Response:
+    return exc.response
+
+
+def serve_cached(request: Request, etag: str, store: bool = True):
+    """
+    Raise CachedResponse when the current body of this URL is cached,
+    otherwise mark the request so its response gets stored
+
+    ``store`` is False when the route's body is not known to be the data
+    at ``etag``.
+    """
+    if not response_cache.enabled:
+        return
+    key = (request.url.path, request.url.query, etag)
+    entry = response_cache.get(key)
+    if entry is not None:
+        raise CachedResponse(entry.to_response(request.headers.get("accept-encoding", "")))
+    if store:
+        setattr(request.state, STATE_KEY, key)
@@ -1,29 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from .. import cache
 from ..database import get_db
-from ..models import User, Player, PlayerGameStats
+from ..models import User, Player
 from ..schemas import UserResponse, UserCreate, PlayerResponse, PlayerCreate, PlayerUpdate, PlayerMerge
 from ..auth.auth import get_password_hash
+from ..request_metrics import TimedRoute
+from ..services import player_merge
+from ..pagination import PLAYERS_KEYSET, USERS_KEYSET, PageParams
+from ..versions import AUTH, PLAYERS, bump_statement
+from ..auth.tokens import token_table
+from ..serialization import PLAYER_LIST, USER_LIST, json_response
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TimedRoute)
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
     request: Request,
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db)
 ):
     # Manager auth is handled by middleware
-    users = db.query(User).all()
-    return users
+    users = (await db.scalars(page.apply(select(User), USERS_KEYSET))).all()
+    return json_response(USER_LIST, page.page(users, USERS_KEYSET), page.response)
 
 @router.post("/create-user", response_model=UserResponse)
 async def create_user(
     user_data: UserCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_user = db.query(User).filter(User.email == user_data.email).first()
+    db_user = await db.scalar(select(User).filter(User.email == user_data.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -39,8 +48,11 @@ async def create_user(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.execute(bump_statement(AUTH))
+    await db.commit()
+    # Accept the new user's tokens in this worker right away
+    await token_table.refresh()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -48,7 +60,7 @@ async def create_user(
 async def delete_user(
     user_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Get current manager from middleware
     current_manager = request.state.current_manager
@@ -60,7 +72,7 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -69,8 +81,11 @@ async def delete_user(
     
     # No need to delete associated player record - jersey_number is now part of User
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.execute(bump_statement(AUTH))
+    await db.commit()
+    # Its tokens stop working in this worker now, in others within AUTH_REFRESH_INTERVAL
+    await token_table.refresh()
     
     return {"message": "User deleted successfully"}
 
@@ -78,28 +93,31 @@ async def delete_user(
 @router.get("/players", response_model=List[PlayerResponse])
 async def get_all_players_admin(
     request: Request,
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all players including inactive ones for admin management"""
-    players = db.query(Player).order_by(Player.jersey_number).all()
-    return players
+    players = (await db.scalars(page.apply(select(Player), PLAYERS_KEYSET))).all()
+    return json_response(PLAYER_LIST, page.page(players, PLAYERS_KEYSET), page.response)
 
 @router.post("/players", response_model=PlayerResponse)
 async def create_player_admin(
     player: PlayerCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new player (admin only)"""
     # Check if jersey number already exists
-    existing_player = db.query(Player).filter(Player.jersey_number == player.jersey_number).first()
+    existing_player = await db.scalar(select(Player).filter(Player.jersey_number == player.jersey_number))
     if existing_player:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Jersey number already taken")
     
     db_player = Player(**player.dict())
     db.add(db_player)
-    db.commit()
-    db.refresh(db_player)
+    await db.execute(bump_statement(PLAYERS))
+    await db.commit()
+    cache.invalidate(cache.ROSTER)
+    await db.refresh(db_player)
     return db_player
 
 @router.put("/players/{player_id}", response_model=PlayerResponse)
@@ -107,19 +125,19 @@ async def update_player_admin(
     player_id: int,
     player_update: PlayerUpdate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update player details (admin only)"""
-    db_player = db.query(Player).filter(Player.id == player_id).first()
+    db_player = await db.get(Player, player_id)
     if not db_player:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Player not found")
     
     # Check if jersey number already exists for another player
     if player_update.jersey_number is not None:
-        existing_player = db.query(Player).filter(
+        existing_player = await db.scalar(select(Player).filter(
             Player.jersey_number == player_update.jersey_number,
             Player.id != player_id
-        ).first()
+        ))
         if existing_player:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Jersey number already taken")
     
@@ -128,79 +146,61 @@ async def update_player_admin(
     for field, value in update_data.items():
         setattr(db_player, field, value)
     
-    db.commit()
-    db.refresh(db_player)
+    await db.execute(bump_statement(PLAYERS))
+    await db.commit()
+    cache.invalidate(cache.ROSTER)
+    await db.refresh(db_player)
     return db_player
 
 @router.delete("/players/{player_id}")
 async def deactivate_player_admin(
     player_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Deactivate a player (admin only)"""
-    db_player = db.query(Player).filter(Player.id == player_id).first()
+    db_player = await db.get(Player, player_id)
     if not db_player:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Player not found")
     
     db_player.is_active = 0
-    db.commit()
+    await db.execute(bump_statement(PLAYERS))
+    await db.commit()
+    cache.invalidate(cache.ROSTER)
     return {"message": "Player deactivated successfully"}
 
 @router.post("/players/{player_id}/activate")
 async def activate_player_admin(
     player_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Reactivate a player (admin only)"""
-    db_player = db.query(Player).filter(Player.id == player_id).first()
+    db_player = await db.get(Player, player_id)
     if not db_player:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Player not found")
     
     db_player.is_active = 1
-    db.commit()
+    await db.execute(bump_statement(PLAYERS))
+    await db.commit()
+    cache.invalidate(cache.ROSTER)
     return {"message": "Player activated successfully"}
 
 @router.post("/players/merge")
 async def merge_players_admin(
     merge_data: PlayerMerge,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Merge source player into target player and transfer all stats (admin only)"""
-    source_player = db.query(Player).filter(Player.id == merge_data.source_player_id).first()
-    target_player = db.query(Player).filter(Player.id == merge_data.target_player_id).first()
-    
-    if not source_player:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Source player not found")
-    if not target_player:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Target player not found")
-    if source_player.id == target_player.id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot merge player with itself")
-    
-    # Transfer all game stats from source to target player
-    source_stats = db.query(PlayerGameStats).filter(PlayerGameStats.player_id == merge_data.source_player_id).all()
-    for stat in source_stats:
-        # Check if target player already has stats for this game
-        existing_stat = db.query(PlayerGameStats).filter(
-            PlayerGameStats.player_id == merge_data.target_player_id,
-            PlayerGameStats.game_id == stat.game_id
-        ).first()
-        
-        if existing_stat:
-            # Merge the stats by adding points and fouls
-            existing_stat.points += stat.points
-            existing_stat.fouls += stat.fouls
-            # Delete the source stat
-            db.delete(stat)
-        else:
-            # Transfer the stat to target player
-            stat.player_id = merge_data.target_player_id
-    
-    # Deactivate the source player
-    source_player.is_active = 0
-    
-    db.commit()
+    try:
+        source_player, target_player = await db.run_sync(
+            player_merge.merge_players, merge_data.source_player_id, merge_data.target_player_id
+        )
+    except player_merge.PlayerNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
     return {"message": f"Successfully merged {source_player.name} into {target_player.name}"}
 
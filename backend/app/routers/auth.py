@@ -1,26 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
 from ..database import get_db
-from ..models import User
-from ..schemas import UserLogin, LoginResponse
-from ..auth.auth import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..models import RevokedToken, User
+from ..schemas import UserLogin, LoginResponse, PasswordChange
+from ..auth.auth import verify_password, get_password_hash, create_access_token, user_claims, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..auth.tokens import token_table
+from ..dependencies import Principal, get_current_user
+from ..request_metrics import TimedRoute
+from ..versions import AUTH, bump_statement
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TimedRoute)
 
-@router.post("/login", response_model=LoginResponse)
-async def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+def _login_response(db_user: User) -> dict:
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": db_user.email}, expires_delta=access_token_expires
+        data=user_claims(db_user), expires_delta=access_token_expires
     )
     
     user_data = {
@@ -35,3 +31,51 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
         "user": user_data
     }
 
+@router.post("/login", response_model=LoginResponse)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
+    db_user = await db.scalar(select(User).filter(User.email == user.email))
+    if not db_user or not verify_password(user.password, db_user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return _login_response(db_user)
+
+@router.post("/logout")
+async def logout(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Revoke the token of this request, the user's other tokens stay valid"""
+    # Revocations are only needed until their token expires
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    db.add(RevokedToken(
+        jti=current_user.token_id,
+        user_id=current_user.id,
+        expires_at=datetime.utcfromtimestamp(current_user.expires_at)
+    ))
+    await db.execute(bump_statement(AUTH))
+    await db.commit()
+    await token_table.refresh()
+    return {"message": "Logged out"}
+
+@router.post("/change-password", response_model=LoginResponse)
+async def change_password(
+    passwords: PasswordChange,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Set a new password and revoke every token of the user, returns a new token for this client"""
+    db_user = await db.get(User, current_user.id)
+    if not db_user or not verify_password(passwords.current_password, db_user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current password is incorrect"
+        )
+    
+    db_user.password_hash = get_password_hash(passwords.new_password)
+    db_user.token_version += 1
+    await db.execute(bump_statement(AUTH))
+    await db.commit()
+    await token_table.refresh()
+    await db.refresh(db_user)
+    return _login_response(db_user)
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends
+
+from ..dependencies import Principal, get_current_manager
+from ..loop_monitor import get_loop_monitor
+from ..cache import get_cache_report, reset_cache_stats
+from ..response_cache import response_cache
+from ..auth.tokens import token_table
+from ..database import engine, async_engine, replica_engine, replica_router, pool_settings
+from ..pool_metrics import get_pool_status
+from ..request_metrics import TimedRoute
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"], route_class=TimedRoute)
+
+@router.get("/loop")
+async def get_loop_report(
+    current_user: Principal = Depends(get_current_manager)
+):
+    """Per-route time spent blocking the event loop (manager only)"""
+    monitor = get_loop_monitor()
+    if monitor is None:
+        return {
+            "enabled": False,
+            "message": "Set LOOP_MONITOR_ENABLED=true to collect event loop stalls"
+        }
+    return monitor.get_report()
+
+@router.post("/loop/reset")
+async def reset_loop_report(
+    current_user: Principal = Depends(get_current_manager)
+):
+    """Clear collected event loop statistics (manager only)"""
+    monitor = get_loop_monitor()
+    if monitor is not None:
+        monitor.reset()
+    return {"message": "Event loop statistics reset"}
+
+@router.get("/pool")
+async def get_pool_report(
+    current_user: Principal = Depends(get_current_manager)
+):
+    """Live connection pool occupancy and checkout metrics (manager only)"""
+    return {
+        "async": get_pool_status(async_engine.sync_engine.pool, pool_settings["async"]),
+        "sync": get_pool_status(engine.pool, pool_settings["sync"]),
+        "replica": get_pool_status(replica_engine.sync_engine.pool, pool_settings["replica"]) if replica_engine else None,
+    }
+
+@router.get("/replica")
+async def get_replica_report(
+    current_user: Principal = Depends(get_current_manager)
+):
+    """Read replica health and how reads were routed (manager only)"""
+    if replica_router is None:
+        return {
+            "configured": False,
+            "message": "Set DATABASE_REPLICA_URL to serve read-only routes from a replica"
+        }
+    return replica_router.get_status()
+
+@router.get("/auth")
+async def get_auth_report(
+    current_user: Principal = Depends(get_current_manager)
+):
+    """Size and freshness of the token revocation table (manager only)"""
+    return token_table.stats()
+
+@router.get("/cache")
+async def get_cache_stats(
+    current_user: Principal = Depends(get_current_manager)
+):
+    """Size and hit rate of the in-process caches (manager only)"""
+    return {**get_cache_report(), "responses": response_cache.stats()}
+
+@router.post("/cache/reset")
+async def reset_cache_counters(
+    current_user: Principal = Depends(get_current_manager)
+):
+    """Clear cache hit and miss counters, the cached entries stay (manager only)"""
+    reset_cache_stats()
+    response_cache.reset_stats()
+    return {"message": "Cache statistics reset"}
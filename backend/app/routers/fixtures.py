@@ -1,27 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 
-from ..database import get_db
-from ..models import User
-from ..dependencies import get_current_manager
-from ..services.fixtures_service import FixturesService
+from ..database import get_read_db, SessionLocal
+from ..dependencies import Principal, get_current_manager
+from ..services.registry import get_fixtures_service
+from ..request_metrics import TimedRoute
+from ..pagination import UPCOMING_GAMES_KEYSET, PageParams
+from ..versions import GAMES
+from ..conditional import conditional, request_versions
 
-router = APIRouter(prefix="/fixtures", tags=["fixtures"])
+router = APIRouter(prefix="/fixtures", tags=["fixtures"], route_class=TimedRoute)
 
-@router.get("")
-async def get_upcoming_fixtures(
-    limit: int = 10,
-    db: Session = Depends(get_db)
-):
+@router.get("", dependencies=[conditional(GAMES, daily=True)])
+async def get_upcoming_fixtures(page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
     """Get upcoming fixtures from database"""
-    service = FixturesService()
-    fixtures = service.get_all_upcoming_fixtures(db)
-    
-    # Apply limit
-    if limit > 0:
-        fixtures = fixtures[:limit]
+    service = get_fixtures_service()
+    after = UPCOMING_GAMES_KEYSET.decode(page.cursor) if page.cursor else None
+    (version,) = request_versions(page.request)
+    # One extra row tells whether there is a next page
+    fixtures = await db.run_sync(service.get_all_upcoming_fixtures, page.limit + 1, after, version)
+    fixtures = page.page(fixtures, UPCOMING_GAMES_KEYSET)
     
     return {
         "fixtures": fixtures,
@@ -32,14 +32,13 @@ async def get_upcoming_fixtures(
 async def update_fixtures(
     background_tasks: BackgroundTasks,
     url: str = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    current_user: Principal = Depends(get_current_manager)
 ):
     """Manually trigger fixtures update (manager only)"""
     
     def update_fixtures_task():
-        service = FixturesService()
-        db_session = Session(bind=db.get_bind())
+        service = get_fixtures_service()
+        db_session = SessionLocal()
         try:
             result = service.update_fixtures_from_web(db_session, url)
             return result
@@ -54,37 +53,35 @@ async def update_fixtures(
         "timestamp": datetime.utcnow().isoformat()
     }
 
-@router.get("/status")
+@router.get("/status", dependencies=[conditional(GAMES, daily=True)])
 async def get_fixtures_status(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get fixtures status information (no auth required)"""
-    service = FixturesService()
+    service = get_fixtures_service()
     
     # Get upcoming fixtures count
-    upcoming_games = service.get_upcoming_games_from_db(db, limit=50)  # Get more for stats
+    upcoming_games = await db.run_sync(service.get_upcoming_games_from_db, 50)  # Get more for stats
     
-    today_games = [game for game in upcoming_games if game.date == datetime.now().date()]
-    this_week_games = [game for game in upcoming_games if (game.date - datetime.now().date()).days <= 7]
+    today_games = [game for game in upcoming_games if game.datetime.date() == datetime.now().date()]
+    this_week_games = [game for game in upcoming_games if (game.datetime.date() - datetime.now().date()).days <= 7]
     
     return {
         "upcoming_count": len(upcoming_games),
         "today_count": len(today_games),
-        "this_week_count": len(this_week_games),
-        "last_checked": datetime.utcnow().isoformat()
+        "this_week_count": len(this_week_games)
     }
 
 @router.post("/sync-with-games")
 async def sync_fixtures_with_games(
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    current_user: Principal = Depends(get_current_manager)
 ):
     """Sync existing upcoming games with latest fixture data (manager only)"""
     
     def sync_task():
-        service = FixturesService()
-        db_session = Session(bind=db.get_bind())
+        service = get_fixtures_service()
+        db_session = SessionLocal()
         try:
             # This would be a more comprehensive sync that checks existing games
             # against current fixture data and updates as needed
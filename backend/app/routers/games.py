@@ -1,21 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import Game, User
-from ..schemas import GameCreate, GameResponse
-from ..dependencies import get_current_manager
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from .. import cache
+from ..database import get_db, get_read_db
+from ..models import Game
+from ..schemas import GameCreate, GameResponse, GameSummaryResponse
+from ..dependencies import Principal, get_current_manager
+from ..pagination import GAMES_KEYSET, PageParams
+from ..request_metrics import TimedRoute
+from ..services.season_totals import game_season_keys, refresh_season_totals, season_of
+from ..services import game_summary
+from ..versions import GAMES, bump_statement, get_versions
+from ..conditional import conditional, request_versions
+from ..serialization import GAME_LIST, json_response
 
-router = APIRouter(prefix="/games", tags=["games"])
+router = APIRouter(prefix="/games", tags=["games"], route_class=TimedRoute)
 
-@router.get("", response_model=List[GameResponse])
-async def get_games(db: Session = Depends(get_db)):
-    games = db.query(Game).order_by(Game.datetime.desc()).all()
-    return games
+# Pages of the game list, keyed by the games version
+games_cache = cache.named_cache(cache.GAMES)
 
-@router.get("/{game_id}", response_model=GameResponse)
-async def get_game(game_id: int, db: Session = Depends(get_db)):
-    game = db.query(Game).filter(Game.id == game_id).first()
+@router.get("", response_model=List[GameResponse], dependencies=[conditional(GAMES)])
+async def get_games(page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    async def load():
+        games = (await db.scalars(page.apply(select(Game), GAMES_KEYSET))).all()
+        return GAME_LIST.validate_python(games, from_attributes=True)
+    
+    key = (page.cache_key, request_versions(page.request))
+    games = page.page(await games_cache.aget_or_load(key, load), GAMES_KEYSET)
+    return json_response(GAME_LIST, games, page.response)
+
+@router.get("/summary", response_model=GameSummaryResponse, dependencies=[conditional(GAMES)])
+async def get_games_summary(season: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
+    """Record, current streak, margins and venue splits of the played games, all seasons by default"""
+    # Read the version before the summary, see app.versions
+    key = (season, await get_versions(db, GAMES))
+    summary = game_summary.summary_cache.get(key)
+    if summary is None:
+        summary = await db.run_sync(game_summary.get_game_summary, season)
+        game_summary.summary_cache.set(key, summary)
+    return summary
+
+@router.get("/{game_id}", response_model=GameResponse, dependencies=[conditional(GAMES)])
+async def get_game(game_id: int, db: AsyncSession = Depends(get_read_db)):
+    game = await db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
     return game
@@ -23,43 +51,56 @@ async def get_game(game_id: int, db: Session = Depends(get_db)):
 @router.post("", response_model=GameResponse)
 async def create_game(
     game: GameCreate, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db), 
+    current_user: Principal = Depends(get_current_manager)
 ):
     db_game = Game(**game.model_dump())
     db.add(db_game)
-    db.commit()
-    db.refresh(db_game)
+    await db.execute(bump_statement(GAMES))
+    await db.commit()
+    cache.invalidate(cache.GAMES, cache.FIXTURES)
+    await db.refresh(db_game)
     return db_game
 
 @router.put("/{game_id}", response_model=GameResponse)
 async def update_game(
     game_id: int,
     game: GameCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_manager)
 ):
-    db_game = db.query(Game).filter(Game.id == game_id).first()
+    db_game = await db.get(Game, game_id)
     if not db_game:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
     
+    # A new date changes last_played_at and can move the game's stats to another season
+    moved = db_game.datetime != game.datetime
+    seasons = {season_of(db_game.datetime), season_of(game.datetime)}
+    
     for field, value in game.model_dump().items():
         setattr(db_game, field, value)
     
-    db.commit()
-    db.refresh(db_game)
+    await db.flush()
+    if moved:
+        await db.run_sync(lambda session: refresh_season_totals(session, game_season_keys(session, game_id, seasons)))
+    await db.execute(bump_statement(GAMES))
+    await db.commit()
+    cache.invalidate(cache.GAMES, cache.FIXTURES)
+    await db.refresh(db_game)
     return db_game
 
 @router.delete("/{game_id}")
 async def delete_game(
     game_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_manager)
 ):
-    db_game = db.query(Game).filter(Game.id == game_id).first()
+    db_game = await db.get(Game, game_id)
     if not db_game:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
     
-    db.delete(db_game)
-    db.commit()
+    await db.delete(db_game)
+    await db.execute(bump_statement(GAMES))
+    await db.commit()
+    cache.invalidate(cache.GAMES, cache.FIXTURES)
     return {"message": "Game deleted successfully"}
\ No newline at end of file
@@ -1,40 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime
 
-from ..database import get_db
-from ..models import User, LadderEntry
-from ..schemas import LadderEntryResponse
-from ..dependencies import get_current_manager
-from ..services.ladder_service import LadderService
+from ..database import get_read_db, SessionLocal
+from ..models import LadderEntry
+from ..schemas import LadderEntryResponse, LadderAsOfResponse, TeamHistoryResponse
+from ..dependencies import Principal, get_current_manager
+from ..services.registry import get_ladder_service
 from ..scheduler import get_scheduler
+from ..request_metrics import TimedRoute
+from ..versions import LADDER
+from ..conditional import conditional, request_versions
+from ..serialization import LADDER_LIST, json_response
+from ..pagination import MAX_PAGE_SIZE
 
-router = APIRouter(prefix="/ladder", tags=["ladder"])
+router = APIRouter(prefix="/ladder", tags=["ladder"], route_class=TimedRoute)
 
-@router.get("", response_model=List[LadderEntryResponse])
+@router.get("", response_model=List[LadderEntryResponse], dependencies=[conditional(LADDER)])
 async def get_ladder(
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    division: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get the latest ladder standings"""
-    service = LadderService()
-    ladder_entries = service.get_latest_ladder(db, limit)
+    service = get_ladder_service()
+    (version,) = request_versions(request)
+    ladder = await db.run_sync(service.get_latest_ladder, limit, division, version)
+    return json_response(LADDER_LIST, ladder, response)
+
+@router.get("/history", response_model=LadderAsOfResponse, dependencies=[conditional(LADDER)])
+async def get_ladder_as_of(
+    at: datetime,
+    division: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the ladder standings as they stood at a point in time"""
+    service = get_ladder_service()
+    ladder = await db.run_sync(service.get_ladder_as_of, at, division)
+    
+    if not ladder:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No ladder recorded on or before {at.isoformat()}"
+        )
+    
+    snapshot = ladder['snapshot']
+    # Rows are shared with later snapshots, report them as of this one
+    entries = [
+        {
+            **{field: getattr(entry, field) for field in LadderEntryResponse.model_fields},
+            "last_updated": snapshot.fetched_at.isoformat()
+        }
+        for entry in ladder['entries']
+    ]
+    return {
+        "at": at,
+        "snapshot_id": snapshot.id,
+        "fetched_at": snapshot.fetched_at,
+        "season": snapshot.season,
+        "division": snapshot.division,
+        "entries": entries
+    }
+
+@router.get("/team/{team_name}/history", response_model=TeamHistoryResponse, dependencies=[conditional(LADDER)])
+async def get_team_history(
+    team_name: str,
+    season: Optional[str] = None,
+    division: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a team's position and win percentage at every ladder update of a season"""
+    service = get_ladder_service()
+    history = await db.run_sync(service.get_team_history, team_name, season, division)
     
-    # Convert datetime to string for response
-    for entry in ladder_entries:
-        entry.last_updated = entry.last_updated.isoformat()
+    if not history:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Team '{team_name}' not found in ladder history"
+        )
     
-    return ladder_entries
+    return history
 
-@router.get("/team/{team_name}", response_model=LadderEntryResponse)
+@router.get("/team/{team_name}", response_model=LadderEntryResponse, dependencies=[conditional(LADDER)])
 async def get_team_position(
+    request: Request,
     team_name: str,
-    db: Session = Depends(get_db)
+    division: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get position for a specific team"""
-    service = LadderService()
-    team_entry = service.get_team_position(db, team_name)
+    service = get_ladder_service()
+    (version,) = request_versions(request)
+    team_entry = await db.run_sync(service.get_team_position, team_name, division, version)
     
     if not team_entry:
         raise HTTPException(
@@ -42,23 +102,19 @@ async def get_team_position(
             detail=f"Team '{team_name}' not found in ladder"
         )
     
-    # Convert datetime to string for response
-    team_entry.last_updated = team_entry.last_updated.isoformat()
-    
     return team_entry
 
 @router.post("/update")
 async def update_ladder(
     background_tasks: BackgroundTasks,
     url: str = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    current_user: Principal = Depends(get_current_manager)
 ):
     """Manually trigger ladder update (manager only)"""
     
     def update_ladder_task():
-        service = LadderService()
-        db_session = Session(bind=db.get_bind())
+        service = get_ladder_service()
+        db_session = SessionLocal()
         try:
             success = service.update_ladder_from_web(db_session, url)
             return success
@@ -75,7 +131,7 @@ async def update_ladder(
 
 @router.get("/schedule/status")
 async def get_schedule_status(
-    current_user: User = Depends(get_current_manager)
+    current_user: Principal = Depends(get_current_manager)
 ):
     """Get scheduled jobs status (manager only)"""
     scheduler = get_scheduler()
@@ -89,7 +145,7 @@ async def get_schedule_status(
 @router.post("/schedule/trigger")
 async def trigger_scheduled_update(
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_manager)
+    current_user: Principal = Depends(get_current_manager)
 ):
     """Manually trigger the scheduled ladder update (manager only)"""
     
@@ -1,83 +1,240 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import PlayerGameStats, User
-from ..schemas import PlayerGameStatsCreate, PlayerGameStatsResponse
-from ..dependencies import get_current_manager
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Literal, Optional
+from ..database import get_db, get_read_db
+from ..models import Game, PlayerGameStats, PlayerSeasonTotals
+from ..schemas import (
+    PlayerGameStatsCreate, PlayerGameStatsResponse, BulkStatsCreate, BulkStatsResponse, StatsLeadersResponse,
+    PlayerAnalyticsResponse
+)
+from ..dependencies import Principal, get_current_manager
+from ..request_metrics import TimedRoute
+from ..pagination import MAX_PAGE_SIZE, STATS_KEYSET, PageParams
+from ..services.season_totals import LEADER_STATS, latest_season, refresh_season_totals, stats_season_keys
+from ..services import stats_analytics
+from ..versions import GAMES, STATS, get_versions
+from ..serialization import STATS_LIST, json_response
 
-router = APIRouter(prefix="/stats", tags=["stats"])
+router = APIRouter(prefix="/stats", tags=["stats"], route_class=TimedRoute)
+
+def _stats_query():
+    # The response nests the player, which cannot be lazy loaded on an AsyncSession.
+    # Many-to-one, so joining keeps every stats list to a single query
+    return select(PlayerGameStats).options(joinedload(PlayerGameStats.player))
+
+def _duplicate_stats_error():
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Stats already exist for this player and game"
+    )
+
+def _is_duplicate_stats(error: IntegrityError) -> bool:
+    return "uq_player_game_stats_player_game" in str(error.orig)
+
+async def _refresh_season_totals(db: AsyncSession, stats):
+    """Recompute the season totals that the (player_id, game_id) rows count towards"""
+    stats = list(stats)
+    await db.run_sync(lambda session: refresh_season_totals(session, stats_season_keys(session, stats)))
+
+async def _get_stats_by_id(db: AsyncSession, stats_id: int):
+    return await db.scalar(
+        _stats_query()
+        .filter(PlayerGameStats.id == stats_id)
+        .execution_options(populate_existing=True)
+    )
 
 @router.get("/game/{game_id}", response_model=List[PlayerGameStatsResponse])
-async def get_game_stats(game_id: int, db: Session = Depends(get_db)):
-    stats = db.query(PlayerGameStats).filter(PlayerGameStats.game_id == game_id).all()
-    return stats
+async def get_game_stats(game_id: int, response: Response, db: AsyncSession = Depends(get_read_db)):
+    stats = (await db.scalars(_stats_query().filter(PlayerGameStats.game_id == game_id))).all()
+    return json_response(STATS_LIST, stats, response)
 
 @router.get("/player/{player_id}", response_model=List[PlayerGameStatsResponse])
-async def get_player_stats(player_id: int, db: Session = Depends(get_db)):
-    stats = db.query(PlayerGameStats).filter(PlayerGameStats.player_id == player_id).all()
-    return stats
+async def get_player_stats(player_id: int, page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db)):
+    stats = (await db.scalars(
+        page.apply(_stats_query().filter(PlayerGameStats.player_id == player_id), STATS_KEYSET)
+    )).all()
+    return json_response(STATS_LIST, page.page(stats, STATS_KEYSET), page.response)
+
+@router.get("/player/{player_id}/analytics", response_model=PlayerAnalyticsResponse)
+async def get_player_analytics(
+    player_id: int,
+    window: int = Query(5, ge=1, le=50),
+    streak_min_points: int = Query(10, ge=1),
+    season: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Game log with rolling averages, scoring streaks and season ranks of a player"""
+    # Keyed by the versions, so any stats or game write makes every entry stale.
+    # Read them before the analytics, see app.versions
+    key = (player_id, window, streak_min_points, season, await get_versions(db, STATS, GAMES))
+    analytics = stats_analytics.analytics_cache.get(key)
+    if analytics is None:
+        analytics = await db.run_sync(stats_analytics.get_player_analytics, player_id, window, streak_min_points, season)
+        if analytics is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Player not found")
+        stats_analytics.analytics_cache.set(key, analytics)
+    return analytics
+
+@router.get("/leaders", response_model=StatsLeadersResponse)
+async def get_stats_leaders(
+    season: Optional[str] = None,
+    stat: Literal["points", "average_points", "fouls", "high_points", "games_played"] = "points",
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    min_games: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Season leaders, read from player_season_totals only, defaults to the latest season played"""
+    season_filter = PlayerSeasonTotals.season == (season if season is not None else latest_season())
+    leaders = (await db.scalars(
+        select(PlayerSeasonTotals)
+        .options(joinedload(PlayerSeasonTotals.player))
+        .filter(season_filter, PlayerSeasonTotals.games_played >= min_games)
+        .order_by(LEADER_STATS[stat].desc(), PlayerSeasonTotals.player_id)
+        .limit(limit)
+    )).all()
+    return {
+        "season": leaders[0].season if leaders else season,
+        "stat": stat,
+        "leaders": leaders
+    }
 
 @router.post("", response_model=PlayerGameStatsResponse)
 async def create_stats(
     stats: PlayerGameStatsCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_manager)
+):
+    # The unique (player_id, game_id) constraint rejects duplicates, no need to look first
+    db_stats = PlayerGameStats(**stats.model_dump())
+    db.add(db_stats)
+    try:
+        await db.flush()
+        await _refresh_season_totals(db, [(db_stats.player_id, db_stats.game_id)])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_duplicate_stats(e):
+            raise _duplicate_stats_error()
+        raise
+    return await _get_stats_by_id(db, db_stats.id)
+
+@router.post("/game/{game_id}/bulk", response_model=BulkStatsResponse)
+async def bulk_upsert_game_stats(
+    game_id: int,
+    box_score: BulkStatsCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_manager)
 ):
-    existing_stats = db.query(PlayerGameStats).filter(
-        PlayerGameStats.player_id == stats.player_id,
-        PlayerGameStats.game_id == stats.game_id
-    ).first()
+    """Enter or correct the stats of every player in a game in one transaction"""
+    player_ids = [entry.player_id for entry in box_score.stats]
+    if len(set(player_ids)) != len(player_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Each player can only appear once")
     
-    if existing_stats:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Stats already exist for this player and game"
+    if not await db.get(Game, game_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    
+    # Rows whose numbers did not change are left alone and not returned,
+    # xmax = 0 only on freshly inserted rows
+    stmt = pg_insert(PlayerGameStats).values([
+        {"player_id": entry.player_id, "game_id": game_id, "points": entry.points, "fouls": entry.fouls}
+        for entry in box_score.stats
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_player_game_stats_player_game",
+        set_={"points": stmt.excluded.points, "fouls": stmt.excluded.fouls},
+        where=tuple_(PlayerGameStats.points, PlayerGameStats.fouls).is_distinct_from(
+            tuple_(stmt.excluded.points, stmt.excluded.fouls)
         )
+    ).returning(PlayerGameStats.id, PlayerGameStats.player_id, literal_column("xmax = 0").label("inserted"))
     
-    db_stats = PlayerGameStats(**stats.model_dump())
-    db.add(db_stats)
-    db.commit()
-    db.refresh(db_stats)
-    return db_stats
+    try:
+        written = {row.player_id: row for row in await db.execute(stmt)}
+    except IntegrityError as e:
+        await db.rollback()
+        if "player_id" in str(e.orig):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown player in box score")
+        raise
+    
+    if written:
+        await _refresh_season_totals(db, [(player_id, game_id) for player_id in written])
+    
+    unchanged = {}
+    if len(written) < len(player_ids):
+        unchanged = dict((await db.execute(
+            select(PlayerGameStats.player_id, PlayerGameStats.id).filter(
+                PlayerGameStats.game_id == game_id,
+                PlayerGameStats.player_id.in_([pid for pid in player_ids if pid not in written])
+            )
+        )).all())
+    await db.commit()
+    
+    results = []
+    for player_id in player_ids:
+        if player_id in written:
+            row = written[player_id]
+            results.append({"player_id": player_id, "stats_id": row.id, "status": "created" if row.inserted else "updated"})
+        else:
+            results.append({"player_id": player_id, "stats_id": unchanged[player_id], "status": "unchanged"})
+    
+    return {
+        "game_id": game_id,
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "updated": sum(1 for result in results if result["status"] == "updated"),
+        "unchanged": len(unchanged),
+        "results": results
+    }
 
 @router.put("/{stats_id}", response_model=PlayerGameStatsResponse)
 async def update_stats(
     stats_id: int,
     stats: PlayerGameStatsCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_manager)
 ):
-    db_stats = db.query(PlayerGameStats).filter(PlayerGameStats.id == stats_id).first()
+    db_stats = await db.get(PlayerGameStats, stats_id)
     if not db_stats:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stats not found")
     
+    # The row can move to another player or game, both sides need new totals
+    previous = (db_stats.player_id, db_stats.game_id)
     for field, value in stats.model_dump().items():
         setattr(db_stats, field, value)
     
-    db.commit()
-    db.refresh(db_stats)
-    return db_stats
+    try:
+        await db.flush()
+        await _refresh_season_totals(db, [previous, (db_stats.player_id, db_stats.game_id)])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_duplicate_stats(e):
+            raise _duplicate_stats_error()
+        raise
+    return await _get_stats_by_id(db, stats_id)
 
 @router.get("/unverified", response_model=List[PlayerGameStatsResponse])
-async def get_unverified_stats(db: Session = Depends(get_db)):
+async def get_unverified_stats(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
     """Get all unverified player stats that need manual verification"""
-    stats = db.query(PlayerGameStats).filter(
+    # Stays on the primary, the review queue is reloaded right after each verify/reject
+    stats = (await db.scalars(page.apply(_stats_query().filter(
         PlayerGameStats.is_scraped == True,
         PlayerGameStats.is_verified == False
-    ).all()
-    return stats
+    ), STATS_KEYSET))).all()
+    return json_response(STATS_LIST, page.page(stats, STATS_KEYSET), page.response)
 
 @router.post("/{stats_id}/verify")
 async def verify_stats(
     stats_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_manager)
 ):
     """Manually verify scraped player stats"""
     from datetime import datetime
     
-    db_stats = db.query(PlayerGameStats).filter(PlayerGameStats.id == stats_id).first()
+    db_stats = await db.get(PlayerGameStats, stats_id)
     if not db_stats:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stats not found")
     
@@ -85,8 +242,8 @@ async def verify_stats(
     db_stats.verified_at = datetime.utcnow()
     db_stats.verified_by = current_user.id
     
-    db.commit()
-    db.refresh(db_stats)
+    await db.commit()
+    await db.refresh(db_stats)
     
     return {
         "message": "Stats verified successfully",
@@ -96,16 +253,19 @@ async def verify_stats(
 @router.post("/{stats_id}/reject")
 async def reject_stats(
     stats_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_manager)
 ):
     """Reject and delete scraped player stats"""
-    db_stats = db.query(PlayerGameStats).filter(PlayerGameStats.id == stats_id).first()
+    db_stats = await db.get(PlayerGameStats, stats_id)
     if not db_stats:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stats not found")
     
-    db.delete(db_stats)
-    db.commit()
+    stats_key = (db_stats.player_id, db_stats.game_id)
+    await db.delete(db_stats)
+    await db.flush()
+    await _refresh_season_totals(db, [stats_key])
+    await db.commit()
     
     return {
         "message": "Stats rejected and deleted successfully"
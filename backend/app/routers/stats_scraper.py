@@ -1,18 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 from ..database import get_db
-from ..dependencies import get_current_manager
-from ..models import User
-from ..services.stats_scraper_service import stats_scraper_service
+from ..dependencies import Principal, get_current_manager
+from ..services.registry import get_stats_scraper_service
+from ..request_metrics import TimedRoute
 
-router = APIRouter(prefix="/stats", tags=["stats-scraper"])
+router = APIRouter(prefix="/stats", tags=["stats-scraper"], route_class=TimedRoute)
 
 @router.post("/fetch-game-stats")
 async def fetch_game_stats(
     url_data: dict,
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_manager)
+    db: AsyncSession = Depends(get_db), 
+    current_user: Principal = Depends(get_current_manager)
 ):
     """
     Fetch game stats from external URL and optionally save to database
@@ -36,12 +37,18 @@ async def fetch_game_stats(
                 detail="game_id is required when save_to_db is true"
             )
 
+        stats_scraper_service = get_stats_scraper_service()
+
+        # The scrape is a blocking HTTP call, keep it off the event loop
+        stats_data = await run_in_threadpool(stats_scraper_service.fetch_stats_from_url, url, cookie_value)
+
         # Use the appropriate method based on whether we need to save to DB
         if save_to_db and game_id:
-            stats_data = stats_scraper_service.fetch_and_save_stats(url, game_id, cookie_value, db)
+            stats_data = await db.run_sync(
+                lambda session: stats_scraper_service.save_fetched_stats(stats_data, game_id, session)
+            )
             message = "Stats fetched and saved to database successfully"
         else:
-            stats_data = stats_scraper_service.fetch_stats_from_url(url, cookie_value)
             message = "Stats fetched successfully"
 
         return {
@@ -1,10 +1,8 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 import logging
 import atexit
+import threading
 
-from .services.ladder_service import scheduled_ladder_update
-from .services.fixtures_service import scheduled_fixtures_update
+from .services.registry import get_service
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +10,9 @@ class TaskScheduler:
     """Background task scheduler for recurring jobs"""
     
     def __init__(self):
+        # Imported here so importing the app does not load apscheduler
+        from apscheduler.schedulers.background import BackgroundScheduler
+
         self.scheduler = BackgroundScheduler()
         self.scheduler.start()
         
@@ -22,10 +23,14 @@ class TaskScheduler:
     
     def setup_scheduled_tasks(self):
         """Setup all scheduled tasks"""
-        
+        from apscheduler.triggers.cron import CronTrigger
+
+        # Jobs are textual references, the service modules are imported
+        # when a job first runs
+
         # Schedule ladder update every Thursday at 6:00 AM
         self.scheduler.add_job(
-            func=scheduled_ladder_update,
+            func='app.services.ladder_service:scheduled_ladder_update',
             trigger=CronTrigger(
                 day_of_week='thu',  # Thursday
                 hour=6,            # 6 AM
@@ -40,7 +45,7 @@ class TaskScheduler:
         
         # Schedule fixtures update every Thursday at 6:05 AM (5 minutes after ladder)
         self.scheduler.add_job(
-            func=scheduled_fixtures_update,
+            func='app.services.fixtures_service:scheduled_fixtures_update',
             trigger=CronTrigger(
                 day_of_week='thu',  # Thursday
                 hour=6,            # 6 AM
@@ -61,7 +66,7 @@ class TaskScheduler:
         """Manually trigger ladder update (for testing/admin)"""
         try:
             logger.info("Manually triggering ladder update")
-            result = scheduled_ladder_update()
+            result = get_service("scheduled_ladder_update")()
             return result
         except Exception as e:
             logger.error(f"Error in manual ladder update: {e}")
@@ -71,7 +76,7 @@ class TaskScheduler:
         """Manually trigger fixtures update (for testing/admin)"""
         try:
             logger.info("Manually triggering fixtures update")
-            result = scheduled_fixtures_update()
+            result = get_service("scheduled_fixtures_update")()
             return result
         except Exception as e:
             logger.error(f"Error in manual fixtures update: {e}")
@@ -97,11 +102,14 @@ class TaskScheduler:
 
 # Global scheduler instance
 task_scheduler = None
+# Startup creates it in a thread while a request may already ask for it
+_scheduler_lock = threading.Lock()
 
 def get_scheduler() -> TaskScheduler:
     """Get the global scheduler instance"""
     global task_scheduler
-    if task_scheduler is None:
-        task_scheduler = TaskScheduler()
-        task_scheduler.setup_scheduled_tasks()
+    with _scheduler_lock:
+        if task_scheduler is None:
+            task_scheduler = TaskScheduler()
+            task_scheduler.setup_scheduled_tasks()
     return task_scheduler
\ No newline at end of file
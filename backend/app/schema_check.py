@@ -0,0 +1,67 @@
+import ast
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Set
+
+from sqlalchemy import exc, text
+
+from .database import async_engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CHECK_ENABLED = os.getenv("SCHEMA_CHECK_ENABLED", "true").lower() in ("1", "true", "yes")
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+_REVISION_PATTERN = re.compile(r"^(revision|down_revision)\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+
+
+class SchemaNotAtHeadError(RuntimeError):
+    pass
+
+
+def get_migration_heads(migrations_dir: Path = MIGRATIONS_DIR) -> Set[str]:
+    """
+    Head revisions of the migration scripts shipped with this build.
+
+    Reads the revision identifiers straight from the files instead of going
+    through alembic, whose import alone costs more than the whole check.
+    """
+    revisions = set()
+    parents = set()
+    for path in migrations_dir.glob("*.py"):
+        for name, value in _REVISION_PATTERN.findall(path.read_text()):
+            value = ast.literal_eval(value.strip())
+            if name == "revision":
+                revisions.add(value)
+            elif isinstance(value, str):
+                parents.add(value)
+            elif value:
+                parents.update(value)
+    return revisions - parents
+
+
+async def verify_schema_at_head():
+    """
+    Fail fast unless the database is at the head migration.
+
+    One SELECT against alembic_version, the schema itself is only ever
+    changed by ``alembic upgrade head`` in the release step.
+    """
+    expected = get_migration_heads()
+    async with async_engine.connect() as conn:
+        try:
+            current = set((await conn.scalars(text("SELECT version_num FROM alembic_version"))).all())
+        except exc.ProgrammingError as e:
+            raise SchemaNotAtHeadError(
+                "Could not read alembic_version, run `alembic upgrade head` first"
+            ) from e
+
+    if current != expected:
+        raise SchemaNotAtHeadError(
+            f"Database is at revision {', '.join(sorted(current)) or '(none)'} but this build expects "
+            f"{', '.join(sorted(expected))}, run `alembic upgrade head`"
+        )
+    logger.info(f"Database schema is at head revision {', '.join(sorted(expected))}")
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Literal, Optional
 from datetime import date, datetime
 
 class UserCreate(BaseModel):
@@ -11,6 +11,10 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str = Field(min_length=8)
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -49,6 +53,30 @@ class GameResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class GameRecord(BaseModel):
+    games: int
+    wins: int
+    losses: int
+    draws: int
+    win_percentage: float
+    points_for: int
+    points_against: int
+    average_points_for: float
+    average_points_against: float
+    average_margin: float
+
+class GameStreak(BaseModel):
+    result: Literal["W", "L", "D"]
+    length: int
+
+class VenueRecord(GameRecord):
+    venue: Optional[str]
+
+class GameSummaryResponse(GameRecord):
+    season: Optional[str]
+    streak: Optional[GameStreak]
+    venues: List[VenueRecord]
+
 class PlayerCreate(BaseModel):
     name: str
     jersey_number: int
@@ -78,6 +106,26 @@ class PlayerGameStatsCreate(BaseModel):
     points: int = 0
     fouls: int = 0
 
+class BulkStatsEntry(BaseModel):
+    player_id: int
+    points: int = 0
+    fouls: int = 0
+
+class BulkStatsCreate(BaseModel):
+    stats: List[BulkStatsEntry] = Field(min_length=1)
+
+class BulkStatsRowResult(BaseModel):
+    player_id: int
+    stats_id: int
+    status: Literal["created", "updated", "unchanged"]
+
+class BulkStatsResponse(BaseModel):
+    game_id: int
+    created: int
+    updated: int
+    unchanged: int
+    results: List[BulkStatsRowResult]
+
 class PlayerGameStatsResponse(BaseModel):
     id: int
     player_id: int
@@ -94,6 +142,74 @@ class PlayerGameStatsResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PlayerSeasonTotalsResponse(BaseModel):
+    player_id: int
+    season: str
+    games_played: int
+    total_points: int
+    total_fouls: int
+    average_points: float
+    average_fouls: float
+    high_points: int
+    high_fouls: int
+    last_played_at: datetime
+    player: PlayerResponse
+    
+    class Config:
+        from_attributes = True
+
+class StatsLeadersResponse(BaseModel):
+    season: Optional[str]
+    stat: str
+    leaders: List[PlayerSeasonTotalsResponse]
+
+class GameLogEntry(BaseModel):
+    stats_id: int
+    game_id: int
+    datetime: datetime
+    opponent_name: str
+    venue: Optional[str]
+    season: str
+    points: int
+    fouls: int
+    season_game: int
+    season_points: int
+    rolling_games: int
+    rolling_points: float
+    rolling_fouls: float
+    team_rank: int
+
+class ScoringStreak(BaseModel):
+    length: int
+    started_at: datetime
+    ended_at: datetime
+
+class ScoringStreaks(BaseModel):
+    min_points: int
+    current: Optional[ScoringStreak]
+    longest: Optional[ScoringStreak]
+
+class SeasonRank(BaseModel):
+    season: str
+    games_played: int
+    total_points: int
+    high_points: int
+    average_points: float
+    players: int
+    points_rank: int
+    average_rank: int
+    high_rank: int
+    points_percentile: float
+    average_percentile: float
+
+class PlayerAnalyticsResponse(BaseModel):
+    player_id: int
+    season: Optional[str]
+    window: int
+    game_log: List[GameLogEntry]
+    streaks: ScoringStreaks
+    seasons: List[SeasonRank]
+
 class LadderEntryResponse(BaseModel):
     id: int
     team_name: str
@@ -110,4 +226,28 @@ class LadderEntryResponse(BaseModel):
     last_updated: str
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class LadderAsOfResponse(BaseModel):
+    at: datetime
+    snapshot_id: int
+    fetched_at: datetime
+    season: Optional[str]
+    division: Optional[str]
+    entries: List[LadderEntryResponse]
+
+class TeamHistoryPoint(BaseModel):
+    snapshot_id: int
+    fetched_at: datetime
+    position: int
+    win_percentage: float
+    wins: int
+    draws: int
+    losses: int
+    games_played: int
+
+class TeamHistoryResponse(BaseModel):
+    team_name: str
+    season: Optional[str]
+    division: Optional[str]
+    history: List[TeamHistoryPoint]
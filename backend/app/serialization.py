@@ -0,0 +1,54 @@
+"""
+JSON encoding of responses.
+
+Routes returning models go through FastAPI's response_model path: the
+return value is validated, dumped to Python objects, then encoded by the
+app's default response class, ORJSONResponse.
+
+The large lists skip that path. A TypeAdapter of each list type is built
+once at import, below, and ``json_response`` validates the ORM rows
+with it and dumps them straight to JSON bytes in pydantic-core. The route
+keeps its response_model, which still documents the schema.
+"""
+
+from functools import lru_cache
+from typing import Any, List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from .request_metrics import timed_serialization
+from .schemas import GameResponse, LadderEntryResponse, PlayerGameStatsResponse, PlayerResponse, UserResponse
+
+
+@lru_cache(maxsize=None)
+def adapter(response_type: Any) -> TypeAdapter:
+    """TypeAdapter of ``response_type``, such as List[GameResponse]"""
+    return TypeAdapter(response_type)
+
+
+def dump_json(type_adapter: TypeAdapter, content: Any) -> bytes:
+    """``content`` (ORM objects, dicts or models) validated by ``type_adapter`` and encoded"""
+    return type_adapter.dump_json(type_adapter.validate_python(content, from_attributes=True))
+
+
+def json_response(type_adapter: TypeAdapter, content: Any, response: Response) -> Response:
+    """
+    Response with ``content`` encoded by ``type_adapter``
+
+    ``response`` is the route's injected Response. FastAPI does not copy
+    its headers (pagination, ETag) onto a returned Response, so this does.
+    """
+    with timed_serialization():
+        body = dump_json(type_adapter, content)
+    encoded = Response(content=body, media_type="application/json")
+    encoded.raw_headers.extend(response.headers.raw)
+    return encoded
+
+
+# Response types of the list routes
+GAME_LIST = adapter(List[GameResponse])
+PLAYER_LIST = adapter(List[PlayerResponse])
+STATS_LIST = adapter(List[PlayerGameStatsResponse])
+LADDER_LIST = adapter(List[LadderEntryResponse])
+USER_LIST = adapter(List[UserResponse])
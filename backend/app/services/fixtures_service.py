@@ -1,20 +1,42 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from collections import defaultdict
 from datetime import datetime, timedelta, date
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import logging
 import re
 
+from .. import cache
 from ..models.game import Game
 from ..database import SessionLocal
-from .fixtures_scraper import FixturesScraper
+from ..pagination import UPCOMING_GAMES_KEYSET
+from ..versions import GAMES, bump_versions
+
+if TYPE_CHECKING:
+    from .fixtures_scraper import FixturesScraper
 
 logger = logging.getLogger(__name__)
 
+# Upcoming fixture lists, keyed by the games version and the day
+fixtures_cache = cache.named_cache(cache.FIXTURES)
+
+def normalize_opponent(name: Optional[str]) -> str:
+    """Match key of an opponent name: lowercase words, punctuation and extra spaces dropped"""
+    return ' '.join(re.findall(r'[a-z0-9]+', (name or '').lower()))
+
 class FixturesService:
     """Service for managing fixtures data"""
     
     def __init__(self):
-        self.scraper = FixturesScraper()
+        self._scraper = None
+    
+    @property
+    def scraper(self) -> "FixturesScraper":
+        """The web scraper, created on the first fetch so reads do not import bs4 and requests"""
+        if self._scraper is None:
+            from .fixtures_scraper import FixturesScraper
+            self._scraper = FixturesScraper()
+        return self._scraper
     
     def _parse_datetime_from_fixture(self, fixture_data: dict) -> Optional[datetime]:
         """Parse date and time from fixture data into a single datetime object"""
@@ -75,9 +97,29 @@ class FixturesService:
             updated_count = 0
             skipped_count = 0
             
+            # Parse everything first, the date range decides what to prefetch
+            parsed = []
             for fixture_data in fixtures_data:
+                game_datetime = self._parse_datetime_from_fixture(fixture_data)
+                opponent_name = fixture_data.get('opponent_name')
+                if not game_datetime:
+                    logger.warning(f"Could not parse datetime for fixture: {fixture_data}")
+                    skipped_count += 1
+                elif not opponent_name:
+                    logger.warning(f"No opponent name found for fixture: {fixture_data}")
+                    skipped_count += 1
+                else:
+                    parsed.append((fixture_data, game_datetime, opponent_name))
+            
+            games_by_day = self._load_games_by_day(db, [game_datetime for _, game_datetime, _ in parsed])
+            updates = {}
+            new_games = []
+            
+            for fixture_data, game_datetime, opponent_name in parsed:
                 try:
-                    result = self._process_fixture(db, fixture_data)
+                    result = self._reconcile_fixture(
+                        fixture_data, game_datetime, opponent_name, games_by_day, updates, new_games
+                    )
                     if result == 'created':
                         created_count += 1
                     elif result == 'updated':
@@ -90,7 +132,17 @@ class FixturesService:
                     skipped_count += 1
                     continue
             
+            # One batched INSERT and one batched UPDATE
+            if new_games:
+                db.add_all(new_games)
+            if updates:
+                db.execute(update(Game), list(updates.values()))
+            if new_games or updates:
+                bump_versions(db, GAMES)
+            
             db.commit()
+            if new_games or updates:
+                cache.invalidate(cache.FIXTURES, cache.GAMES)
             
             logger.info(f"Fixtures update completed - Created: {created_count}, Updated: {updated_count}, Skipped: {skipped_count}")
             
@@ -114,92 +166,133 @@ class FixturesService:
                 'skipped': 0
             }
     
-    def _process_fixture(self, db: Session, fixture_data: dict) -> str:
+    def _load_games_by_day(self, db: Session, datetimes: List[datetime]) -> Dict[date, List[Game]]:
+        """
+        Every game in the date range of the scraped fixtures, in one query
+        
+        Returns:
+            Games grouped by the day they are played on
+        """
+        games_by_day = defaultdict(list)
+        if not datetimes:
+            return games_by_day
+        
+        first_day = min(datetimes).date()
+        last_day = max(datetimes).date()
+        games = db.query(Game).filter(
+            Game.datetime >= datetime.combine(first_day, datetime.min.time()),
+            Game.datetime < datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+        ).all()
+        for game in games:
+            games_by_day[game.datetime.date()].append(game)
+        return games_by_day
+    
+    def _reconcile_fixture(
+        self,
+        fixture_data: dict,
+        game_datetime: datetime,
+        opponent_name: str,
+        games_by_day: Dict[date, List[Game]],
+        updates: Dict[int, dict],
+        new_games: List[Game]
+    ) -> str:
         """
-        Process a single fixture and create/update game record
+        Match a single fixture against the prefetched games and record the
+        create/update it needs, nothing is written here
+        
+        A game matches when it is on the same day and the fixture's
+        normalized opponent name is part of the game's.
         
         Args:
-            db: Database session
             fixture_data: Dictionary containing fixture information
+            game_datetime: Parsed date and time of the fixture
+            opponent_name: Opponent name of the fixture
+            games_by_day: Result of _load_games_by_day, new games are added to it
+            updates: Pending column values by game ID
+            new_games: Pending new games
             
         Returns:
             str: 'created', 'updated', or 'skipped'
         """
-        try:
-            # Parse datetime from fixture data
-            game_datetime = self._parse_datetime_from_fixture(fixture_data)
-            opponent_name = fixture_data.get('opponent_name')
-            
-            if not game_datetime:
-                logger.warning(f"Could not parse datetime for fixture: {fixture_data}")
-                return 'skipped'
-                
-            if not opponent_name:
-                logger.warning(f"No opponent name found for fixture: {fixture_data}")
-                return 'skipped'
-            
-            # Check if a game already exists for this date and opponent
-            game_date = game_datetime.date()
-            existing_game = db.query(Game).filter(
-                Game.datetime >= datetime.combine(game_date, datetime.min.time()),
-                Game.datetime < datetime.combine(game_date + timedelta(days=1), datetime.min.time()),
-                Game.opponent_name.ilike(f"%{opponent_name}%")
-            ).first()
-            
-            if existing_game:
-                # Update existing game if needed
-                updated = False
-                
-                # Only update if the existing game doesn't have scores (is upcoming)
-                if existing_game.final_score_skywalkers is None and existing_game.final_score_opponent is None:
-                    # Update opponent name if it's more complete
-                    if len(opponent_name) > len(existing_game.opponent_name or ''):
-                        existing_game.opponent_name = opponent_name
-                        updated = True
-                    
-                    # Update datetime if the new one has more precise time
-                    if (existing_game.datetime.time() == datetime.min.time().replace(hour=12) and 
-                        game_datetime.time() != datetime.min.time().replace(hour=12)):
-                        existing_game.datetime = game_datetime
-                        updated = True
-                    
-                    # Update venue if we have it and existing game doesn't
-                    if fixture_data.get('venue') and not existing_game.venue:
-                        existing_game.venue = fixture_data.get('venue')
-                        updated = True
-                
-                if updated:
-                    logger.info(f"Updated existing game: {existing_game.opponent_name} on {existing_game.datetime}")
-                    return 'updated'
-                else:
-                    logger.info(f"Skipped existing game: {existing_game.opponent_name} on {existing_game.datetime}")
-                    return 'skipped'
-            else:
-                # Create new game
-                new_game = Game(
-                    opponent_name=opponent_name,
-                    datetime=game_datetime,                   # Combined date and time
-                    venue=fixture_data.get('venue'),          # Add venue from fixtures
-                    final_score_skywalkers=None,              # Will be filled in later
-                    final_score_opponent=None,                # Will be filled in later
-                    video_url=None                            # Will be filled in later if available
-                )
-                
-                db.add(new_game)
-                logger.info(f"Created new game: {opponent_name} on {game_datetime}")
-                return 'created'
-                
-        except Exception as e:
-            logger.error(f"Error processing fixture {fixture_data}: {e}")
-            raise
+        day_games = games_by_day[game_datetime.date()]
+        opponent_key = normalize_opponent(opponent_name)
+        existing_game = next(
+            (game for game in day_games if opponent_key in normalize_opponent(game.opponent_name)),
+            None
+        )
+        
+        if existing_game is None:
+            # Create new game
+            new_game = Game(
+                opponent_name=opponent_name,
+                datetime=game_datetime,                   # Combined date and time
+                venue=fixture_data.get('venue'),          # Add venue from fixtures
+                final_score_skywalkers=None,              # Will be filled in later
+                final_score_opponent=None,                # Will be filled in later
+                video_url=None                            # Will be filled in later if available
+            )
+            new_games.append(new_game)
+            day_games.append(new_game)
+            logger.info(f"Created new game: {opponent_name} on {game_datetime}")
+            return 'created'
+        
+        # Only update if the existing game doesn't have scores (is upcoming)
+        if existing_game.final_score_skywalkers is not None or existing_game.final_score_opponent is not None:
+            logger.info(f"Skipped existing game: {existing_game.opponent_name} on {existing_game.datetime}")
+            return 'skipped'
+        
+        # A game created earlier in this run has no ID yet and is updated in place
+        if existing_game.id is None:
+            current = {
+                'opponent_name': existing_game.opponent_name,
+                'datetime': existing_game.datetime,
+                'venue': existing_game.venue
+            }
+        else:
+            current = updates.get(existing_game.id) or {
+                'id': existing_game.id,
+                'opponent_name': existing_game.opponent_name,
+                'datetime': existing_game.datetime,
+                'venue': existing_game.venue
+            }
+        changed = False
+        
+        # Update opponent name if it's more complete
+        if len(opponent_name) > len(current['opponent_name'] or ''):
+            current['opponent_name'] = opponent_name
+            changed = True
+        
+        # Update datetime if the new one has more precise time
+        if (current['datetime'].time() == datetime.min.time().replace(hour=12) and 
+            game_datetime.time() != datetime.min.time().replace(hour=12)):
+            current['datetime'] = game_datetime
+            changed = True
+        
+        # Update venue if we have it and existing game doesn't
+        if fixture_data.get('venue') and not current['venue']:
+            current['venue'] = fixture_data.get('venue')
+            changed = True
+        
+        if not changed:
+            logger.info(f"Skipped existing game: {existing_game.opponent_name} on {existing_game.datetime}")
+            return 'skipped'
+        
+        if existing_game.id is None:
+            for field, value in current.items():
+                setattr(existing_game, field, value)
+        else:
+            updates[existing_game.id] = current
+        logger.info(f"Updated existing game: {current['opponent_name']} on {current['datetime']}")
+        return 'updated'
     
-    def get_upcoming_games_from_db(self, db: Session, limit: int = 10) -> List[Game]:
+    def get_upcoming_games_from_db(self, db: Session, limit: int = 10, after: Optional[tuple] = None) -> List[Game]:
         """
         Get upcoming games from database
         
         Args:
             db: Database session
             limit: Maximum number of games to return
+            after: (datetime, id) of the last game of the previous page
             
         Returns:
             List of upcoming Game objects
@@ -207,25 +300,42 @@ class FixturesService:
         today = datetime.now().date()
         today_start = datetime.combine(today, datetime.min.time())
         
-        upcoming_games = db.query(Game).filter(
+        query = db.query(Game).filter(
             Game.datetime >= today_start,
             Game.final_score_skywalkers.is_(None),
             Game.final_score_opponent.is_(None)
-        ).order_by(Game.datetime.asc()).limit(limit).all()
+        )
+        if after:
+            query = query.filter(UPCOMING_GAMES_KEYSET.after(after))
+        upcoming_games = query.order_by(*UPCOMING_GAMES_KEYSET.order_by()).limit(limit).all()
         
         return upcoming_games
     
-    def get_all_upcoming_fixtures(self, db: Session) -> List[dict]:
+    def get_all_upcoming_fixtures(
+        self, db: Session, limit: int = 10, after: Optional[tuple] = None, version: Optional[int] = None
+    ) -> List[dict]:
         """
-        Get all upcoming fixtures with additional metadata
+        Get all upcoming fixtures with additional metadata, cached per
+        games version and day
         
         Args:
             db: Database session
+            limit: Maximum number of fixtures to return
+            after: (datetime, id) of the last fixture of the previous page
+            version: Games version read before this call (see app.versions), not cached without one
             
         Returns:
             List of dictionaries containing fixture information
         """
-        upcoming_games = self.get_upcoming_games_from_db(db)
+        today = date.today()
+        if version is None:
+            return self._load_upcoming_fixtures(db, limit, after, today)
+        return fixtures_cache.get_or_load(
+            (limit, after, today, version), lambda: self._load_upcoming_fixtures(db, limit, after, today)
+        )
+    
+    def _load_upcoming_fixtures(self, db: Session, limit: int, after: Optional[tuple], today: date) -> List[dict]:
+        upcoming_games = self.get_upcoming_games_from_db(db, limit, after)
         
         fixtures = []
         for game in upcoming_games:
@@ -236,8 +346,8 @@ class FixturesService:
                 'date': game_date.isoformat(),
                 'datetime': game.datetime.isoformat(),
                 'venue': game.venue,
-                'is_today': game_date == date.today(),
-                'days_until': (game_date - date.today()).days,
+                'is_today': game_date == today,
+                'days_until': (game_date - today).days,
                 'has_scores': game.final_score_skywalkers is not None and game.final_score_opponent is not None
             }
             fixtures.append(fixture)
@@ -0,0 +1,94 @@
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+import logging
+import os
+
+from ..cache import named_cache
+from ..models import Game
+from .season_totals import season_expression
+
+logger = logging.getLogger(__name__)
+
+# Results of get_game_summary keyed by season and games version, there are
+# only a handful of seasons
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "32"))
+summary_cache = named_cache("game_summary", SUMMARY_CACHE_SIZE, ttl=None)
+
+RESULTS = {1: 'W', -1: 'L', 0: 'D'}
+
+
+def _record(row) -> Dict:
+    return {
+        'games': row.games,
+        'wins': row.wins,
+        'losses': row.losses,
+        'draws': row.draws,
+        'win_percentage': row.wins / row.games if row.games else 0.0,
+        'points_for': row.points_for or 0,
+        'points_against': row.points_against or 0,
+        'average_points_for': row.average_points_for or 0.0,
+        'average_points_against': row.average_points_against or 0.0,
+        'average_margin': row.average_margin or 0.0,
+    }
+
+
+def get_game_summary(db: Session, season: Optional[str] = None) -> Dict:
+    """
+    Record, current streak, margins and per venue splits of every played game
+
+    One statement: ROLLUP(venue) returns a row per venue plus the total.
+    The current streak is the run of games, newest first, whose position
+    among games with the same result equals their position among all
+    games; only the latest result's leading run has that property.
+    """
+    margin = Game.final_score_skywalkers - Game.final_score_opponent
+    newest_first = (Game.datetime.desc(), Game.id.desc())
+    played = (
+        select(
+            Game.venue,
+            Game.final_score_skywalkers.label('points_for'),
+            Game.final_score_opponent.label('points_against'),
+            margin.label('margin'),
+            func.sign(margin).label('result'),
+            func.row_number().over(order_by=newest_first).label('recency'),
+            func.row_number().over(partition_by=func.sign(margin), order_by=newest_first).label('recency_in_result'),
+        )
+        .where(Game.final_score_skywalkers.isnot(None), Game.final_score_opponent.isnot(None))
+    )
+    if season:
+        played = played.where(season_expression(Game.datetime) == season)
+    played = played.subquery()
+
+    rows = db.execute(
+        select(
+            played.c.venue,
+            func.grouping(played.c.venue).label('is_total'),
+            func.count().label('games'),
+            func.count().filter(played.c.margin > 0).label('wins'),
+            func.count().filter(played.c.margin < 0).label('losses'),
+            func.count().filter(played.c.margin == 0).label('draws'),
+            func.sum(played.c.points_for).label('points_for'),
+            func.sum(played.c.points_against).label('points_against'),
+            cast(func.avg(played.c.points_for), Float).label('average_points_for'),
+            cast(func.avg(played.c.points_against), Float).label('average_points_against'),
+            cast(func.avg(played.c.margin), Float).label('average_margin'),
+            func.max(played.c.result).filter(played.c.recency == 1).label('streak_result'),
+            func.count().filter(played.c.recency == played.c.recency_in_result).label('streak_length'),
+        )
+        .group_by(func.rollup(played.c.venue))
+    ).all()
+
+    # The grand total row is there even without any played games
+    total = next(row for row in rows if row.is_total)
+    venues = sorted((row for row in rows if not row.is_total), key=lambda row: (-row.games, row.venue or ''))
+    return {
+        'season': season,
+        **_record(total),
+        'streak': (
+            {'result': RESULTS[total.streak_result], 'length': total.streak_length}
+            if total.streak_result is not None else None
+        ),
+        'venues': [{'venue': row.venue, **_record(row)} for row in venues],
+    }
+
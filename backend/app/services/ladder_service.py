@@ -1,19 +1,65 @@
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import List, Optional
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+import hashlib
+import json
 import logging
 
-from ..models.ladder import LadderEntry
+from .. import versions
+from ..cache import LADDER, invalidate, named_cache
+from ..models.ladder import LadderEntry, LadderSnapshot, LadderCurrentSnapshot
 from ..database import SessionLocal
-from .ladder_scraper import LadderScraper
+from .season_totals import season_of
+
+if TYPE_CHECKING:
+    from .ladder_scraper import LadderScraper
 
 logger = logging.getLogger(__name__)
 
+# Columns that make up the standings, the position is the order of the rows
+HASHED_COLUMNS = (
+    'team_name', 'wins', 'draws', 'losses', 'points_for', 'points_against', 'win_percentage', 'games_played'
+)
+
+# A row is unchanged between snapshots when all of these are equal
+COMPARED_COLUMNS = HASHED_COLUMNS + ('position', 'season', 'division')
+
+# Fields of a ladder entry as served by the API
+ENTRY_FIELDS = (
+    'id', 'team_name', 'position', 'wins', 'draws', 'losses', 'points_for', 'points_against',
+    'win_percentage', 'games_played', 'season', 'division'
+)
+
+# Current standings, keyed by the ladder version
+ladder_cache = named_cache(LADDER)
+
+def ladder_entry_dict(entry: LadderEntry) -> Dict:
+    """Plain copy of an entry, safe to cache and share between requests"""
+    return {
+        **{field: getattr(entry, field) for field in ENTRY_FIELDS},
+        'last_updated': entry.last_updated.isoformat()
+    }
+
+def ladder_content_hash(ladder_data: List[Dict]) -> str:
+    """sha256 of the standings in ladder order, equal scrapes hash the same"""
+    standings = [[team_data.get(column, 0) for column in HASHED_COLUMNS] for team_data in ladder_data]
+    return hashlib.sha256(json.dumps(standings, separators=(',', ':')).encode()).hexdigest()
+
 class LadderService:
     """Service for managing ladder data"""
     
     def __init__(self):
-        self.scraper = LadderScraper()
+        self._scraper = None
+    
+    @property
+    def scraper(self) -> "LadderScraper":
+        """The web scraper, created on the first fetch so reads do not import bs4 and requests"""
+        if self._scraper is None:
+            from .ladder_scraper import LadderScraper
+            self._scraper = LadderScraper()
+        return self._scraper
     
     def update_ladder_from_web(self, db: Session, url: str = None) -> bool:
         """
@@ -39,36 +85,7 @@ class LadderService:
                 logger.warning("No ladder data received from scraper")
                 return False
             
-            # Clear existing data for today
-            today = datetime.utcnow().date()
-            db.query(LadderEntry).filter(
-                LadderEntry.last_updated >= today,
-                LadderEntry.last_updated < today + timedelta(days=1)
-            ).delete()
-            
-            # Insert new data
-            current_time = datetime.utcnow()
-            
-            for position, team_data in enumerate(ladder_data, 1):
-                ladder_entry = LadderEntry(
-                    team_name=team_data['team_name'],
-                    position=position,
-                    wins=team_data['wins'],
-                    draws=team_data['draws'],
-                    losses=team_data['losses'],
-                    points_for=team_data.get('points_for', 0),
-                    points_against=team_data.get('points_against', 0),
-                    win_percentage=team_data['win_percentage'],
-                    games_played=team_data['games_played'],
-                    season=self._get_current_season(),
-                    division=team_data.get('division'),
-                    last_updated=current_time,
-                    created_at=current_time
-                )
-                db.add(ladder_entry)
-            
-            db.commit()
-            logger.info(f"Successfully updated ladder with {len(ladder_data)} teams")
+            self.save_ladder_snapshot(db, ladder_data)
             return True
             
         except Exception as e:
@@ -76,64 +93,330 @@ class LadderService:
             db.rollback()
             return False
     
-    def get_latest_ladder(self, db: Session, limit: int = 10) -> List[LadderEntry]:
+    def save_ladder_snapshot(
+        self,
+        db: Session,
+        ladder_data: List[Dict],
+        fetched_at: Optional[datetime] = None,
+        season: Optional[str] = None
+    ) -> LadderSnapshot:
         """
-        Get the latest ladder entries
+        Store scraped standings as the division's current snapshot and commit
+        
+        The previous current snapshot keeps only its rows that differ from
+        the new one, as long as both have the same season and teams.
         
         Args:
             db: Database session
-            limit: Maximum number of entries to return
+            ladder_data: Teams in ladder order, as returned by the scraper
+            fetched_at: When the standings were scraped, defaults to now
+            season: Defaults to the current season
             
         Returns:
-            List of LadderEntry objects
+            The new snapshot, or the current one when the standings did not change
         """
-        try:
-            # Get the most recent update time
-            latest_update = db.query(LadderEntry.last_updated).order_by(
-                LadderEntry.last_updated.desc()
-            ).first()
+        current_time = fetched_at or datetime.utcnow()
+        season = season or self._get_current_season()
+        division = ladder_data[0].get('division')
+        content_hash = ladder_content_hash(ladder_data)
+        
+        # Unchanged standings keep the current snapshot
+        current = db.get(LadderCurrentSnapshot, division or '')
+        if current and current.snapshot.content_hash == content_hash and current.snapshot.season == season:
+            logger.info(f"Ladder unchanged since {current.snapshot.fetched_at}, keeping snapshot {current.snapshot_id}")
+            return current.snapshot
+        
+        snapshot = LadderSnapshot(
+            season=season,
+            division=division,
+            fetched_at=current_time,
+            content_hash=content_hash
+        )
+        db.add(snapshot)
+        db.flush()
+        
+        # Insert new data in one batch
+        db.execute(insert(LadderEntry), [
+            {
+                'snapshot_id': snapshot.id,
+                'team_name': team_data['team_name'],
+                'position': position,
+                'wins': team_data['wins'],
+                'draws': team_data['draws'],
+                'losses': team_data['losses'],
+                'points_for': team_data.get('points_for', 0),
+                'points_against': team_data.get('points_against', 0),
+                'win_percentage': team_data['win_percentage'],
+                'games_played': team_data['games_played'],
+                'season': season,
+                'division': team_data.get('division'),
+                'last_updated': current_time,
+                'created_at': current_time
+            }
+            for position, team_data in enumerate(ladder_data, 1)
+        ])
+        
+        if current:
+            self._compact_snapshot(db, current.snapshot, snapshot, {team_data['team_name'] for team_data in ladder_data})
+        
+        # Move the division's pointer to the new snapshot
+        stmt = pg_insert(LadderCurrentSnapshot).values(
+            division=division or '',
+            snapshot_id=snapshot.id,
+            updated_at=current_time
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[LadderCurrentSnapshot.division],
+            set_={'snapshot_id': stmt.excluded.snapshot_id, 'updated_at': stmt.excluded.updated_at}
+        ))
+        
+        versions.bump_versions(db, versions.LADDER)
+        db.commit()
+        invalidate(LADDER)
+        logger.info(f"Successfully updated ladder with {len(ladder_data)} teams (snapshot {snapshot.id})")
+        return snapshot
+    
+    def _compact_snapshot(self, db: Session, previous: LadderSnapshot, snapshot: LadderSnapshot, team_names: set):
+        """
+        Drop the rows of ``previous`` that are repeated unchanged in ``snapshot``
+        
+        Only when both hold the same season and teams, otherwise a team
+        missing from one of them could not be told apart from an unchanged one
+        and ``previous`` stays full.
+        """
+        if previous.season != snapshot.season:
+            return
+        previous_teams = set(db.scalars(select(LadderEntry.team_name).where(LadderEntry.snapshot_id == previous.id)))
+        if previous_teams != team_names:
+            return
+        
+        newer = aliased(LadderEntry)
+        db.execute(
+            delete(LadderEntry).where(
+                LadderEntry.snapshot_id == previous.id,
+                exists().where(
+                    newer.snapshot_id == snapshot.id,
+                    *[getattr(newer, column).is_not_distinct_from(getattr(LadderEntry, column)) for column in COMPARED_COLUMNS]
+                )
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        previous.is_full = False
+    
+    def _snapshot_filter(self, division: Optional[str]):
+        """Snapshots of a division, '' selects the snapshots scraped without one"""
+        return LadderSnapshot.division.is_(None) if division == '' else LadderSnapshot.division == division
+    
+    def _resolve_division(self, db: Session, division: Optional[str]) -> Optional[str]:
+        """The given division, or the most recently updated one"""
+        if division is not None:
+            return division
+        return db.scalar(
+            select(LadderCurrentSnapshot.division).order_by(LadderCurrentSnapshot.updated_at.desc()).limit(1)
+        )
+    
+    def get_ladder_as_of(self, db: Session, at: datetime, division: Optional[str] = None) -> Optional[Dict]:
+        """
+        Rebuild the ladder as it stood at a point in time
+        
+        A team's row at snapshot S is its row in the first snapshot from S
+        onwards that stored it. The walk stops at the first full snapshot,
+        which at the latest is the current one, so it is one query over a
+        bounded range of (snapshot_id, position) rows.
+        
+        Args:
+            db: Database session
+            at: Point in time to read the ladder at
+            division: Division to read, defaults to the most recently updated one
             
-            if not latest_update:
-                return []
+        Returns:
+            The snapshot and its entries in ladder order, None when the
+            division had no ladder yet at that time
+        """
+        division = self._resolve_division(db, division)
+        if division is None:
+            return None
+        in_division = self._snapshot_filter(division)
+        
+        snapshot = db.scalar(
+            select(LadderSnapshot)
+            .where(in_division, LadderSnapshot.fetched_at <= at)
+            .order_by(LadderSnapshot.fetched_at.desc())
+            .limit(1)
+        )
+        if snapshot is None:
+            return None
+        
+        full_from = select(func.min(LadderSnapshot.fetched_at)).where(
+            in_division, LadderSnapshot.is_full, LadderSnapshot.fetched_at >= snapshot.fetched_at
+        ).scalar_subquery()
+        rows = db.execute(
+            select(LadderEntry)
+            .join(LadderSnapshot, LadderEntry.snapshot_id == LadderSnapshot.id)
+            .where(in_division, LadderSnapshot.fetched_at.between(snapshot.fetched_at, full_from))
+            .distinct(LadderEntry.team_name)
+            .order_by(LadderEntry.team_name, LadderSnapshot.fetched_at.asc())
+        ).scalars().all()
+        
+        return {
+            'snapshot': snapshot,
+            'entries': sorted(rows, key=lambda entry: entry.position)
+        }
+    
+    def get_team_history(
+        self,
+        db: Session,
+        team_name: str,
+        season: Optional[str] = None,
+        division: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Position and win percentage of a team at every snapshot of a season
+        
+        Args:
+            db: Database session
+            team_name: Name of the team, matched like get_team_position
+            season: Defaults to the season of the division's current snapshot
+            division: Division to read, defaults to the most recently updated one
             
-            # Get all entries from the latest update
-            ladder_entries = db.query(LadderEntry).filter(
-                LadderEntry.last_updated == latest_update[0]
-            ).order_by(LadderEntry.position).limit(limit).all()
+        Returns:
+            The matched team name, the season and one point per snapshot,
+            None when the team or season is not found
+        """
+        division = self._resolve_division(db, division)
+        if division is None:
+            return None
+        in_division = self._snapshot_filter(division)
+        
+        if season is None:
+            season = db.scalar(
+                select(LadderSnapshot.season)
+                .join(LadderCurrentSnapshot, LadderCurrentSnapshot.snapshot_id == LadderSnapshot.id)
+                .where(LadderCurrentSnapshot.division == division)
+            )
+        
+        snapshots = db.execute(
+            select(LadderSnapshot.id, LadderSnapshot.fetched_at, LadderSnapshot.is_full)
+            .where(in_division, LadderSnapshot.season == season)
+            .order_by(LadderSnapshot.fetched_at)
+        ).all()
+        if not snapshots:
+            return None
+        
+        # Every row the team has stored in the season, newest team name wins
+        rows = db.execute(
+            select(LadderEntry)
+            .join(LadderSnapshot, LadderEntry.snapshot_id == LadderSnapshot.id)
+            .where(in_division, LadderSnapshot.season == season, LadderEntry.team_name.ilike(f"%{team_name}%"))
+            .order_by(LadderSnapshot.fetched_at.desc())
+        ).scalars().all()
+        if not rows:
+            return None
+        matched_name = rows[0].team_name
+        stored = {row.snapshot_id: row for row in rows if row.team_name == matched_name}
+        
+        # Walk back from the newest snapshot, a snapshot without the row
+        # repeats the next one unless it is full
+        points = []
+        carried = None
+        for snapshot_id, fetched_at, is_full in reversed(snapshots):
+            if snapshot_id in stored:
+                carried = stored[snapshot_id]
+            elif is_full:
+                carried = None
+            if carried is not None:
+                points.append({
+                    'snapshot_id': snapshot_id,
+                    'fetched_at': fetched_at,
+                    'position': carried.position,
+                    'win_percentage': carried.win_percentage,
+                    'wins': carried.wins,
+                    'draws': carried.draws,
+                    'losses': carried.losses,
+                    'games_played': carried.games_played
+                })
+        points.reverse()
+        
+        return {
+            'team_name': matched_name,
+            'season': season,
+            'division': division or None,
+            'history': points
+        }
+    
+    def _current_snapshot_id(self, division: Optional[str] = None):
+        """
+        Scalar subquery selecting the current snapshot of a division, or the
+        most recently updated division when none is given
+        """
+        query = select(LadderCurrentSnapshot.snapshot_id)
+        if division is not None:
+            query = query.where(LadderCurrentSnapshot.division == division)
+        else:
+            query = query.order_by(LadderCurrentSnapshot.updated_at.desc()).limit(1)
+        return query.scalar_subquery()
+    
+    def get_latest_ladder(
+        self, db: Session, limit: int = 10, division: Optional[str] = None, version: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Get the latest ladder entries, cached per ladder version
+        
+        Args:
+            db: Database session
+            limit: Maximum number of entries to return
+            division: Division to read, defaults to the most recently updated one
+            version: Ladder version read before this call (see app.versions), not cached without one
             
-            return ladder_entries
+        Returns:
+            List of entry dicts, see ladder_entry_dict
+        """
+        def load():
+            # One query, the pointer lookup is a subquery on a primary key
+            return [
+                ladder_entry_dict(entry)
+                for entry in db.query(LadderEntry).filter(
+                    LadderEntry.snapshot_id == self._current_snapshot_id(division)
+                ).order_by(LadderEntry.position).limit(limit)
+            ]
+        
+        try:
+            if version is None:
+                return load()
+            return ladder_cache.get_or_load(('latest', limit, division, version), load)
             
         except Exception as e:
             logger.error(f"Error fetching latest ladder: {e}")
             return []
     
-    def get_team_position(self, db: Session, team_name: str) -> Optional[LadderEntry]:
+    def get_team_position(
+        self, db: Session, team_name: str, division: Optional[str] = None, version: Optional[int] = None
+    ) -> Optional[Dict]:
         """
-        Get position for a specific team
+        Get position for a specific team, cached per ladder version
         
         Args:
             db: Database session
             team_name: Name of the team to find
+            division: Division to read, defaults to the most recently updated one
+            version: Ladder version read before this call (see app.versions), not cached without one
             
         Returns:
-            LadderEntry object if found, None otherwise
+            Entry dict if found (see ladder_entry_dict), None otherwise
         """
-        try:
-            # Get the most recent update time
-            latest_update = db.query(LadderEntry.last_updated).order_by(
-                LadderEntry.last_updated.desc()
-            ).first()
-            
-            if not latest_update:
-                return None
-            
+        def load():
             # Find the team in the latest ladder
-            team_entry = db.query(LadderEntry).filter(
-                LadderEntry.last_updated == latest_update[0],
+            entry = db.query(LadderEntry).filter(
+                LadderEntry.snapshot_id == self._current_snapshot_id(division),
                 LadderEntry.team_name.ilike(f"%{team_name}%")
-            ).first()
-            
-            return team_entry
+            ).order_by(LadderEntry.position).first()
+            return ladder_entry_dict(entry) if entry else None
+        
+        try:
+            if version is None:
+                return load()
+            # ilike is case-insensitive, so is the key
+            return ladder_cache.get_or_load(('team', team_name.lower(), division, version), load)
             
         except Exception as e:
             logger.error(f"Error fetching team position for {team_name}: {e}")
@@ -141,12 +424,7 @@ class LadderService:
     
     def _get_current_season(self) -> str:
         """Get current season string based on month"""
-        now = datetime.utcnow()
-        # Season determination: before July = Winter, July onwards = Spring
-        if now.month < 7:  # January to June = Winter
-            return f"{now.year} Winter"
-        else:  # July to December = Spring
-            return f"{now.year} Spring"
+        return season_of(datetime.utcnow())
     
 def scheduled_ladder_update():
     """Function to be called by scheduler"""
@@ -0,0 +1,108 @@
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import Session, aliased
+from typing import Tuple
+import logging
+
+from ..cache import ROSTER, invalidate
+from ..versions import PLAYERS, bump_versions
+from ..models import Player, PlayerGameStats
+from .season_totals import player_season_keys, refresh_season_totals
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerNotFoundError(LookupError):
+    pass
+
+
+def merge_players(db: Session, source_player_id: int, target_player_id: int) -> Tuple[Player, Player]:
+    """
+    Merge source player into target player and transfer all stats
+
+    Runs the same handful of statements however many games the source
+    played, all in the caller's transaction, which is committed here:
+      - games both played: points and fouls are added to the target's row
+        and the source's row is deleted
+      - every other source row is re-pointed to the target
+      - both players' season totals are recomputed
+      - the source player is deactivated
+
+    Raises:
+        PlayerNotFoundError: If either player does not exist
+        ValueError: If both IDs are the same player
+    """
+    if source_player_id == target_player_id:
+        raise ValueError("Cannot merge player with itself")
+
+    # Lock both players in ID order, so two merges cannot interleave
+    players = {
+        player.id: player
+        for player in db.scalars(
+            select(Player)
+            .filter(Player.id.in_([source_player_id, target_player_id]))
+            .order_by(Player.id)
+            .with_for_update()
+        )
+    }
+    if source_player_id not in players:
+        raise PlayerNotFoundError("Source player not found")
+    if target_player_id not in players:
+        raise PlayerNotFoundError("Target player not found")
+    source_player, target_player = players[source_player_id], players[target_player_id]
+
+    source_stat = aliased(PlayerGameStats)
+    target_stat = aliased(PlayerGameStats)
+    same_game_as_source = (
+        (source_stat.player_id == source_player_id)
+        & (source_stat.game_id == PlayerGameStats.game_id)
+    )
+    no_sync = {"synchronize_session": False}
+
+    # Every season of either player, the target ends up with all of them
+    seasons = player_season_keys(db, [source_player_id, target_player_id])
+    seasons |= {(target_player_id, season) for _, season in seasons}
+
+    try:
+        # Add the source's numbers to the target's row in games both played
+        db.execute(
+            update(PlayerGameStats)
+            .where(PlayerGameStats.player_id == target_player_id, same_game_as_source)
+            .values(
+                points=PlayerGameStats.points + source_stat.points,
+                fouls=PlayerGameStats.fouls + source_stat.fouls
+            ),
+            execution_options=no_sync
+        )
+        # Those source rows are now counted in the target's
+        db.execute(
+            delete(PlayerGameStats)
+            .where(
+                PlayerGameStats.player_id == source_player_id,
+                exists().where(
+                    target_stat.player_id == target_player_id,
+                    target_stat.game_id == PlayerGameStats.game_id
+                )
+            ),
+            execution_options=no_sync
+        )
+        # Everything left moves over as it is
+        db.execute(
+            update(PlayerGameStats)
+            .where(PlayerGameStats.player_id == source_player_id)
+            .values(player_id=target_player_id),
+            execution_options=no_sync
+        )
+
+        refresh_season_totals(db, seasons)
+
+        # Deactivate the source player
+        source_player.is_active = 0
+        bump_versions(db, PLAYERS)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate(ROSTER)
+
+    logger.info(f"Merged player {source_player.name} (ID: {source_player_id}) into {target_player.name} (ID: {target_player_id})")
+    return source_player, target_player
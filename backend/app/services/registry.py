@@ -0,0 +1,62 @@
+import importlib
+import inspect
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+if TYPE_CHECKING:
+    from .email import EmailService
+    from .fixtures_service import FixturesService
+    from .ladder_service import LadderService
+    from .stats_scraper_service import StatsScraperService
+
+# Service name -> (module in app.services, attribute). The modules pull in
+# bs4, requests or emails, so they are only imported on first use and web
+# workers that only serve JSON never load them.
+SERVICES: Dict[str, Tuple[str, str]] = {
+    "stats_scraper": ("stats_scraper_service", "stats_scraper_service"),
+    "fixtures": ("fixtures_service", "FixturesService"),
+    "ladder": ("ladder_service", "LadderService"),
+    "email": ("email", "email_service"),
+    "scheduled_ladder_update": ("ladder_service", "scheduled_ladder_update"),
+    "scheduled_fixtures_update": ("fixtures_service", "scheduled_fixtures_update"),
+}
+
+_instances: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_service(name: str) -> Any:
+    """
+    Import a registered service on first use and return it.
+
+    Classes are instantiated once and shared, the services keep no per-call
+    state. Module-level instances and functions are returned as they are.
+    """
+    try:
+        return _instances[name]
+    except KeyError:
+        pass
+
+    module_name, attribute = SERVICES[name]
+    with _lock:
+        if name not in _instances:
+            module = importlib.import_module(f".{module_name}", __package__)
+            service = getattr(module, attribute)
+            _instances[name] = service() if inspect.isclass(service) else service
+    return _instances[name]
+
+
+def get_stats_scraper_service() -> "StatsScraperService":
+    return get_service("stats_scraper")
+
+
+def get_fixtures_service() -> "FixturesService":
+    return get_service("fixtures")
+
+
+def get_ladder_service() -> "LadderService":
+    return get_service("ladder")
+
+
+def get_email_service() -> "EmailService":
+    return get_service("email")
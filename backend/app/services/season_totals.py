@@ -0,0 +1,166 @@
+from sqlalchemy import String, case, delete, extract, func, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Iterable, Set, Tuple
+import logging
+
+from ..models import Game, PlayerGameStats, PlayerSeasonTotals
+from ..versions import STATS, bump_versions
+
+logger = logging.getLogger(__name__)
+
+SeasonKey = Tuple[int, str]  # (player_id, season)
+
+
+def season_of(moment: datetime) -> str:
+    """Season a date belongs to: before July = Winter, July onwards = Spring"""
+    return f"{moment.year} {'Winter' if moment.month < 7 else 'Spring'}"
+
+
+def season_expression(column):
+    """SQL version of season_of"""
+    return func.to_char(column, 'YYYY', type_=String).concat(
+        case((extract('month', column) < 7, literal(' Winter')), else_=literal(' Spring'))
+    )
+
+
+# What GET /stats/leaders can rank by
+LEADER_STATS = {
+    'points': PlayerSeasonTotals.total_points,
+    'average_points': PlayerSeasonTotals.total_points * 1.0 / PlayerSeasonTotals.games_played,
+    'fouls': PlayerSeasonTotals.total_fouls,
+    'high_points': PlayerSeasonTotals.high_points,
+    'games_played': PlayerSeasonTotals.games_played,
+}
+
+
+def latest_season():
+    """Scalar subquery of the season of the most recently played game with stats"""
+    return (
+        select(PlayerSeasonTotals.season)
+        .order_by(PlayerSeasonTotals.last_played_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def stats_season_keys(db: Session, stats: Iterable[Tuple[int, int]]) -> Set[SeasonKey]:
+    """
+    (player_id, season) of each (player_id, game_id) stats row
+
+    Take them before a change as well as after it when the change can move
+    a row to another player or season.
+    """
+    stats = set(stats)
+    if not stats:
+        return set()
+    game_dates = dict(db.execute(
+        select(Game.id, Game.datetime).where(Game.id.in_([game_id for _, game_id in stats]))
+    ).all())
+    return {
+        (player_id, season_of(game_dates[game_id]))
+        for player_id, game_id in stats
+        if game_id in game_dates
+    }
+
+
+def player_season_keys(db: Session, player_ids: Iterable[int]) -> Set[SeasonKey]:
+    """(player_id, season) of every stats row of the given players"""
+    return {
+        tuple(row) for row in db.execute(
+            select(PlayerGameStats.player_id, season_expression(Game.datetime))
+            .join(Game, PlayerGameStats.game_id == Game.id)
+            .where(PlayerGameStats.player_id.in_(list(player_ids)))
+            .distinct()
+        )
+    }
+
+
+def game_season_keys(db: Session, game_id: int, seasons: Iterable[str]) -> Set[SeasonKey]:
+    """(player_id, season) of everyone with stats in a game, for each of the seasons"""
+    player_ids = db.scalars(select(PlayerGameStats.player_id).where(PlayerGameStats.game_id == game_id)).all()
+    return {(player_id, season) for player_id in player_ids for season in seasons}
+
+
+def _totals_select():
+    season = season_expression(Game.datetime)
+    return (
+        select(
+            PlayerGameStats.player_id,
+            season.label('season'),
+            func.count(PlayerGameStats.id),
+            func.coalesce(func.sum(PlayerGameStats.points), 0),
+            func.coalesce(func.sum(PlayerGameStats.fouls), 0),
+            func.coalesce(func.max(PlayerGameStats.points), 0),
+            func.coalesce(func.max(PlayerGameStats.fouls), 0),
+            func.max(Game.datetime),
+            func.now(),
+        )
+        .join(Game, PlayerGameStats.game_id == Game.id)
+        .group_by(PlayerGameStats.player_id, season)
+    ), season
+
+
+_TOTALS_COLUMNS = [
+    'player_id', 'season', 'games_played', 'total_points', 'total_fouls',
+    'high_points', 'high_fouls', 'last_played_at', 'updated_at',
+]
+
+
+def refresh_season_totals(db: Session, keys: Iterable[SeasonKey]):
+    """
+    Recompute the totals of the given (player_id, season) pairs
+
+    Only reads the stats rows of those players in those seasons, so a write
+    path pays for one player's season, not the whole table. Runs in the
+    caller's transaction and does not commit. Pairs without stats left lose
+    their row.
+
+    Every stats write passes through here, so this also bumps the stats
+    version that cached analytics are keyed by.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+
+    bump_versions(db, STATS)
+
+    db.execute(
+        delete(PlayerSeasonTotals)
+        .where(tuple_(PlayerSeasonTotals.player_id, PlayerSeasonTotals.season).in_(list(keys)))
+        .execution_options(synchronize_session=False)
+    )
+    totals, season = _totals_select()
+    db.execute(
+        insert(PlayerSeasonTotals).from_select(
+            _TOTALS_COLUMNS,
+            totals.where(tuple_(PlayerGameStats.player_id, season).in_(list(keys)))
+        )
+    )
+
+
+def rebuild_season_totals(db: Session) -> int:
+    """Recompute the whole table from player_game_stats and commit, for backfills"""
+    db.execute(delete(PlayerSeasonTotals))
+    totals, _ = _totals_select()
+    db.execute(insert(PlayerSeasonTotals).from_select(_TOTALS_COLUMNS, totals))
+    bump_versions(db, STATS)
+    db.commit()
+    return db.scalar(select(func.count()).select_from(PlayerSeasonTotals))
+
+
+def rebuild_command():
+    """Entry point of `rebuild-season-totals`"""
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_season_totals(db)
+        print(f"Rebuilt player season totals: {rows} rows")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding player season totals: {e}")
+        return 1
+    finally:
+        db.close()
@@ -0,0 +1,182 @@
+from sqlalchemy import Float, cast, func, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+import logging
+import os
+
+from ..cache import named_cache
+from ..models import Game, Player, PlayerGameStats, PlayerSeasonTotals
+from .season_totals import season_expression
+
+logger = logging.getLogger(__name__)
+
+# Results of get_player_analytics, keyed by the arguments and the stats and
+# games versions they were computed at
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "256"))
+analytics_cache = named_cache("stats_analytics", ANALYTICS_CACHE_SIZE, ttl=None)
+
+
+def get_game_log(db: Session, player_id: int, window: int, season: Optional[str] = None) -> List[Dict]:
+    """
+    Every game of a player with running numbers, oldest first
+
+    Rolling averages cover the last ``window`` games of the same season,
+    fewer at the start of a season (``rolling_games`` says how many).
+    ``team_rank`` is the player's scoring rank among the team in that game.
+    """
+    season_column = season_expression(Game.datetime)
+    in_season = {'partition_by': season_column, 'order_by': (Game.datetime, Game.id)}
+    rolling = {**in_season, 'rows': (-(window - 1), 0)}
+
+    # Ranks need every row of the player's games, not only the player's own
+    team_ranks = (
+        select(
+            PlayerGameStats.id,
+            func.rank().over(partition_by=PlayerGameStats.game_id, order_by=PlayerGameStats.points.desc()).label('team_rank')
+        )
+        .where(PlayerGameStats.game_id.in_(
+            select(PlayerGameStats.game_id).where(PlayerGameStats.player_id == player_id)
+        ))
+        .subquery()
+    )
+
+    stmt = (
+        select(
+            PlayerGameStats.id.label('stats_id'),
+            Game.id.label('game_id'),
+            Game.datetime,
+            Game.opponent_name,
+            Game.venue,
+            season_column.label('season'),
+            PlayerGameStats.points,
+            PlayerGameStats.fouls,
+            func.row_number().over(**in_season).label('season_game'),
+            func.sum(PlayerGameStats.points).over(**in_season).label('season_points'),
+            func.count().over(**rolling).label('rolling_games'),
+            cast(func.avg(PlayerGameStats.points).over(**rolling), Float).label('rolling_points'),
+            cast(func.avg(PlayerGameStats.fouls).over(**rolling), Float).label('rolling_fouls'),
+            team_ranks.c.team_rank,
+        )
+        .join(Game, PlayerGameStats.game_id == Game.id)
+        .join(team_ranks, team_ranks.c.id == PlayerGameStats.id)
+        .where(PlayerGameStats.player_id == player_id)
+        .order_by(Game.datetime, Game.id)
+    )
+    # Windows are per season anyway, so filtering first changes nothing
+    if season:
+        stmt = stmt.where(season_column == season)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def get_scoring_streaks(db: Session, player_id: int, min_points: int, season: Optional[str] = None) -> Dict:
+    """
+    Longest and current run of consecutive games with at least ``min_points``
+
+    Gaps and islands: within a run, the game number and the number among
+    the scoring games go up together, so their difference labels the run.
+    """
+    order = (Game.datetime, Game.id)
+    scored = PlayerGameStats.points >= min_points
+    games = (
+        select(
+            Game.datetime,
+            scored.label('scored'),
+            func.row_number().over(order_by=order).label('game_number'),
+            (
+                func.row_number().over(order_by=order)
+                - func.row_number().over(partition_by=scored, order_by=order)
+            ).label('run'),
+            func.count().over().label('games'),
+        )
+        .join(Game, PlayerGameStats.game_id == Game.id)
+        .where(PlayerGameStats.player_id == player_id)
+    )
+    if season:
+        games = games.where(season_expression(Game.datetime) == season)
+    games = games.subquery()
+
+    runs = (
+        select(
+            func.count().label('length'),
+            func.min(games.c.datetime).label('started_at'),
+            func.max(games.c.datetime).label('ended_at'),
+            (func.max(games.c.game_number) == func.max(games.c.games)).label('is_current'),
+        )
+        .where(games.c.scored)
+        .group_by(games.c.run)
+        .subquery()
+    )
+    ranked = select(
+        runs,
+        func.row_number().over(order_by=(runs.c.length.desc(), runs.c.ended_at.desc())).label('longest_rank')
+    ).subquery()
+
+    longest = current = None
+    for row in db.execute(select(ranked).where(or_(ranked.c.is_current, ranked.c.longest_rank == 1))).mappings():
+        streak = {'length': row['length'], 'started_at': row['started_at'], 'ended_at': row['ended_at']}
+        if row['longest_rank'] == 1:
+            longest = streak
+        if row['is_current']:
+            current = streak
+    return {'min_points': min_points, 'current': current, 'longest': longest}
+
+
+def get_season_ranks(db: Session, player_id: int, season: Optional[str] = None) -> List[Dict]:
+    """
+    The player's rank and percentile among all players of each season played, latest first
+
+    Ranked over player_season_totals, which holds the per season sums of
+    player_game_stats. Percentiles are the share of players ranked below,
+    0 for the lowest and 100 for the highest.
+    """
+    average_points = PlayerSeasonTotals.total_points * 1.0 / PlayerSeasonTotals.games_played
+    in_season = {'partition_by': PlayerSeasonTotals.season}
+    seasons = select(PlayerSeasonTotals.season).where(PlayerSeasonTotals.player_id == player_id)
+    if season:
+        seasons = seasons.where(PlayerSeasonTotals.season == season)
+
+    ranked = (
+        select(
+            PlayerSeasonTotals.player_id,
+            PlayerSeasonTotals.season,
+            PlayerSeasonTotals.games_played,
+            PlayerSeasonTotals.total_points,
+            PlayerSeasonTotals.high_points,
+            PlayerSeasonTotals.last_played_at,
+            cast(average_points, Float).label('average_points'),
+            func.count().over(**in_season).label('players'),
+            func.rank().over(**in_season, order_by=PlayerSeasonTotals.total_points.desc()).label('points_rank'),
+            func.rank().over(**in_season, order_by=average_points.desc()).label('average_rank'),
+            func.rank().over(**in_season, order_by=PlayerSeasonTotals.high_points.desc()).label('high_rank'),
+            cast(
+                func.percent_rank().over(**in_season, order_by=PlayerSeasonTotals.total_points) * 100, Float
+            ).label('points_percentile'),
+            cast(func.percent_rank().over(**in_season, order_by=average_points) * 100, Float).label('average_percentile'),
+        )
+        .where(PlayerSeasonTotals.season.in_(seasons))
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked).where(ranked.c.player_id == player_id).order_by(ranked.c.last_played_at.desc())
+    ).mappings()
+    return [{key: value for key, value in row.items() if key not in ('player_id', 'last_played_at')} for row in rows]
+
+
+def get_player_analytics(
+    db: Session,
+    player_id: int,
+    window: int = 5,
+    streak_min_points: int = 10,
+    season: Optional[str] = None
+) -> Optional[Dict]:
+    """Game log, scoring streaks and season ranks of a player, None if the player does not exist"""
+    if not db.get(Player, player_id):
+        return None
+    return {
+        'player_id': player_id,
+        'season': season,
+        'window': window,
+        'game_log': get_game_log(db, player_id, window, season),
+        'streaks': get_scoring_streaks(db, player_id, streak_min_points, season),
+        'seasons': get_season_ranks(db, player_id, season),
+    }
@@ -2,12 +2,20 @@ import requests
 from bs4 import BeautifulSoup
 from typing import Dict, Any, Optional, List
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload
+from ..cache import ROSTER, invalidate
+from ..versions import PLAYERS, bump_versions
 from ..models import Player, Game, PlayerGameStats
 from ..database import get_db
+from .season_totals import refresh_season_totals, stats_season_keys
 
 logger = logging.getLogger(__name__)
 
+# pg_advisory_xact_lock key held while scraped players get jersey numbers
+PLAYER_CREATION_LOCK = 0x736b7977  # "skyw"
+
 class StatsScraperService:
     """Service for scraping game stats from external websites"""
     
@@ -219,6 +227,11 @@ class StatsScraperService:
         """
         Save scraped player stats to the database
         
+        Runs as a fixed number of statements whatever the size of the box
+        score: one lookup of every name, one insert of the missing players,
+        one upsert of every stats row and the refresh of the players'
+        season totals.
+        
         Args:
             player_stats: Dictionary with player names as keys and stats as values
             game_id: ID of the game these stats belong to
@@ -227,83 +240,67 @@ class StatsScraperService:
         Returns:
             List of created PlayerGameStats objects
         """
-        saved_stats = []
+        if not player_stats:
+            return []
         
         try:
+            names = list(player_stats)
+            player_ids = self._resolve_player_ids(db, names)
+            
+            missing = [name for name in names if name not in player_ids]
+            if missing:
+                player_ids.update(self._create_players(db, missing))
+                bump_versions(db, PLAYERS)
+            
+            # Prepare stats values
+            rows = []
             for player_name, stats in player_stats.items():
-                # Find or create player (idempotent by name)
-                player = db.query(Player).filter(Player.name == player_name).first()
-                
-                if not player:
-                    # Create new player if doesn't exist
-                    # Generate jersey number (simple approach: max + 1)
-                    max_jersey = db.query(Player).order_by(Player.jersey_number.desc()).first()
-                    new_jersey = (max_jersey.jersey_number + 1) if max_jersey else 1
-                    
-                    player = Player(
-                        name=player_name,
-                        jersey_number=new_jersey,
-                        position="Unknown",
-                        is_active=1
-                    )
-                    db.add(player)
-                    db.commit()
-                    db.refresh(player)
-                    logger.info(f"Created new player: {player_name} with jersey #{new_jersey}")
-                else:
-                    logger.debug(f"Found existing player: {player_name} (ID: {player.id}, Jersey: #{player.jersey_number})")
-                
-                # Check if stats already exist for this player and game
-                existing_stats = db.query(PlayerGameStats).filter(
-                    PlayerGameStats.player_id == player.id,
-                    PlayerGameStats.game_id == game_id
-                ).first()
-                
-                # Prepare stats values
-                new_points = stats.get('points', 0) if stats.get('points', -1) >= 0 else 0
-                new_fouls = stats.get('fouls', 0) if stats.get('fouls', -1) >= 0 else 0
-                
-                if existing_stats:
-                    # Update existing stats (idempotent operation)
-                    old_points = existing_stats.points
-                    old_fouls = existing_stats.fouls
-                    
-                    existing_stats.points = new_points
-                    existing_stats.fouls = new_fouls
-                    existing_stats.is_scraped = True
-                    existing_stats.is_verified = False  # Reset verification when updated
-                    existing_stats.verified_at = None
-                    existing_stats.verified_by = None
-                    if source_url:
-                        existing_stats.scrape_source = source_url
-                    
-                    saved_stats.append(existing_stats)
-                    
-                    # Log idempotent update
-                    if old_points == new_points and old_fouls == new_fouls:
-                        logger.info(f"Idempotent update for {player_name}: Stats unchanged (Points={new_points}, Fouls={new_fouls})")
-                    else:
-                        logger.info(f"Updated stats for {player_name}: Points {old_points}→{new_points}, Fouls {old_fouls}→{new_fouls}")
-                else:
-                    # Create new stats record
-                    player_game_stats = PlayerGameStats(
-                        player_id=player.id,
-                        game_id=game_id,
-                        points=new_points,
-                        fouls=new_fouls,
-                        is_scraped=True,
-                        is_verified=False,
-                        scrape_source=source_url
-                    )
-                    db.add(player_game_stats)
-                    saved_stats.append(player_game_stats)
-                    logger.info(f"Created new stats for {player_name}: Points={new_points}, Fouls={new_fouls}")
+                rows.append({
+                    'player_id': player_ids[player_name],
+                    'game_id': game_id,
+                    'points': stats.get('points', 0) if stats.get('points', -1) >= 0 else 0,
+                    'fouls': stats.get('fouls', 0) if stats.get('fouls', -1) >= 0 else 0,
+                    'is_scraped': True,
+                    'is_verified': False,
+                    'scrape_source': source_url,
+                })
             
+            # Insert or overwrite every row at once (idempotent operation).
+            # Updated rows go back to the review queue, xmax = 0 only on
+            # freshly inserted rows
+            stmt = pg_insert(PlayerGameStats).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                constraint='uq_player_game_stats_player_game',
+                set_={
+                    'points': stmt.excluded.points,
+                    'fouls': stmt.excluded.fouls,
+                    'is_scraped': True,
+                    'is_verified': False,  # Reset verification when updated
+                    'verified_at': None,
+                    'verified_by': None,
+                    'scrape_source': func.coalesce(stmt.excluded.scrape_source, PlayerGameStats.scrape_source),
+                }
+            ).returning(PlayerGameStats.id, PlayerGameStats.player_id, literal_column('xmax = 0').label('inserted'))
+            saved = {row.player_id: row for row in db.execute(stmt)}
+            refresh_season_totals(db, stats_season_keys(db, [(player_id, game_id) for player_id in saved]))
             db.commit()
+            if missing:
+                invalidate(ROSTER)
+            
+            created = sum(1 for row in saved.values() if row.inserted)
+            logger.info(f"Saved stats for game {game_id}: {created} created, {len(saved) - created} updated")
             
-            # Refresh all objects to get updated data
-            for stats_obj in saved_stats:
-                db.refresh(stats_obj)
+            # Reload everything with its player in one query, the response
+            # builder reads stat.player.name for every row
+            saved_ids = [saved[player_ids[name]].id for name in names]
+            reloaded = {
+                stats_obj.id: stats_obj
+                for stats_obj in db.query(PlayerGameStats)
+                .options(joinedload(PlayerGameStats.player))
+                .filter(PlayerGameStats.id.in_(saved_ids))
+                .populate_existing()
+            }
+            saved_stats = [reloaded[stats_id] for stats_id in saved_ids]
             
             logger.info(f"Successfully processed stats for {len(saved_stats)} players to database (idempotent operation)")
             return saved_stats
@@ -313,6 +310,45 @@ class StatsScraperService:
             logger.error(f"Error saving player stats to database: {str(e)}")
             raise
 
+    def _resolve_player_ids(self, db: Session, names: List[str]) -> Dict[str, int]:
+        """Player ID of every name that exists, the oldest player wins on duplicate names"""
+        player_ids = {}
+        for player_id, name in db.execute(
+            select(Player.id, Player.name).where(Player.name.in_(names)).order_by(Player.id)
+        ):
+            player_ids.setdefault(name, player_id)
+        return player_ids
+
+    def _create_players(self, db: Session, names: List[str]) -> Dict[str, int]:
+        """
+        Create players for the given names with the next free jersey numbers
+        
+        Concurrent scrapes are serialized on a transaction-level advisory
+        lock, so two of them cannot hand out the same jersey number or
+        create the same player twice. The lock is released by the commit.
+        """
+        db.execute(select(func.pg_advisory_xact_lock(PLAYER_CREATION_LOCK)))
+        
+        # Another scrape may have created some of them while we waited
+        player_ids = self._resolve_player_ids(db, names)
+        names = [name for name in names if name not in player_ids]
+        if not names:
+            return player_ids
+        
+        # Generate jersey numbers (simple approach: max + 1)
+        max_jersey = db.scalar(select(func.max(Player.jersey_number))) or 0
+        created = db.execute(
+            insert(Player).returning(Player.id, Player.name, Player.jersey_number),
+            [
+                {'name': name, 'jersey_number': max_jersey + i, 'is_active': 1}
+                for i, name in enumerate(names, 1)
+            ]
+        )
+        for player_id, name, jersey_number in created:
+            player_ids[name] = player_id
+            logger.info(f"Created new player: {name} with jersey #{jersey_number}")
+        return player_ids
+
     def fetch_and_save_stats(self, url: str, game_id: int, cookie_value: Optional[str] = None, db: Session = None) -> Dict[str, Any]:
         """
         Fetch stats from URL and save to database
@@ -328,7 +364,20 @@ class StatsScraperService:
         """
         # First fetch the stats
         stats_data = self.fetch_stats_from_url(url, cookie_value)
-        
+        return self.save_fetched_stats(stats_data, game_id, db)
+
+    def save_fetched_stats(self, stats_data: Dict[str, Any], game_id: int, db: Session = None) -> Dict[str, Any]:
+        """
+        Save already fetched stats to the database
+
+        Args:
+            stats_data: Result of fetch_stats_from_url
+            game_id: ID of the game to associate stats with
+            db: Database session
+
+        Returns:
+            Dictionary containing scraped stats data and saved records info
+        """
         if db and stats_data.get('player_stats'):
             try:
                 # Save to database
@@ -336,7 +385,7 @@ class StatsScraperService:
                     stats_data['player_stats'], 
                     game_id, 
                     db,
-                    url
+                    stats_data.get('url')
                 )
                 
                 # Add database info to response
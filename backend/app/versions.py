@@ -0,0 +1,67 @@
+"""
+Version stamps of the data behind cached reads.
+
+Each resource has a counter in ``data_versions`` that its writers bump in
+the same transaction as the write. A cache keyed by the current version
+never serves rows older than the last commit, without having to know
+which entries a write touched. Read the version before the data it keys:
+a write that commits in between then only makes the cached value newer
+than its key, never older.
+"""
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .models import DataVersion
+
+# player_game_stats, and the player_season_totals derived from it
+STATS = "stats"
+GAMES = "games"
+PLAYERS = "players"
+# Ladder snapshots and the current snapshot pointers
+LADDER = "ladder"
+# Users, their token versions and revoked_tokens, see app.auth.tokens
+AUTH = "auth"
+
+
+def bump_statement(*resources: str):
+    """Upsert adding one to each resource's version, in a fixed order so concurrent bumps cannot deadlock"""
+    now = datetime.utcnow()
+    stmt = pg_insert(DataVersion).values([
+        {"resource": resource, "version": 1, "updated_at": now}
+        for resource in sorted(set(resources))
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[DataVersion.resource],
+        set_={"version": DataVersion.version + 1, "updated_at": stmt.excluded.updated_at}
+    )
+
+
+def bump_versions(db: Session, *resources: str):
+    """Bump the versions in the caller's transaction, which commits them with the write"""
+    db.execute(bump_statement(*resources))
+
+
+async def get_versions(db: AsyncSession, *resources: str) -> Tuple[int, ...]:
+    """Current version of each resource, 0 for one never written"""
+    versions = dict((await db.execute(
+        select(DataVersion.resource, DataVersion.version).where(DataVersion.resource.in_(resources))
+    )).all())
+    return tuple(versions.get(resource, 0) for resource in resources)
+
+
+async def get_version_stamps(db: AsyncSession, *resources: str) -> List[Tuple[int, Optional[datetime]]]:
+    """(version, time of the last write) of each resource, (0, None) for one never written"""
+    stamps = {
+        row.resource: (row.version, row.updated_at)
+        for row in await db.execute(
+            select(DataVersion.resource, DataVersion.version, DataVersion.updated_at)
+            .where(DataVersion.resource.in_(resources))
+        )
+    }
+    return [stamps.get(resource, (0, None)) for resource in resources]
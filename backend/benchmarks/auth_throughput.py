@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for authenticated endpoints.
+
+Logs in, then fires a fixed number of concurrent clients carrying the
+token at a running API for a fixed duration. Reports requests per second,
+latency percentiles and the SQL statements per request taken from the
+Server-Timing header, which shows whether authorizing touched the
+database. Finally logs the token out and checks that it is rejected.
+
+Usage:
+    uvicorn app.main:app --port 8000 &
+    python benchmarks/auth_throughput.py --email manager@example.com --password ...
+
+Run it once against the old build and once against the new one with the
+same database to compare. The logout check needs the new build.
+"""
+
+import argparse
+import asyncio
+import re
+import statistics
+import time
+
+import httpx
+
+# /diagnostics/loop only checks the token, /admin/users also reads a page of users
+PATHS = ["/diagnostics/loop", "/admin/users?limit=10"]
+
+_QUERIES = re.compile(r'desc="(\d+) queries')
+
+
+async def _worker(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, queries: list, errors: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+            match = _QUERIES.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_path(base_url: str, token: str, path: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    queries = []
+    errors = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        # Warm up connections, the database pool and the auth caches
+        await asyncio.gather(*(client.get(path) for _ in range(concurrency)))
+
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, path, deadline, latencies, queries, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "queries": statistics.mean(queries) if queries else float("nan"),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        response = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+    print(f"{'path':<28}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}")
+    for path in PATHS:
+        result = await run_path(args.base_url, token, path, args.concurrency, args.duration)
+        print(
+            f"{result['path']:<28}{result['requests']:>10}{result['errors']:>8}"
+            f"{result['rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['queries']:>9.2f}"
+        )
+
+    async with httpx.AsyncClient(base_url=args.base_url, headers={"Authorization": f"Bearer {token}"}, timeout=60) as client:
+        response = await client.post("/auth/logout")
+        if response.status_code == 404:
+            print("logout: not available in this build")
+            return
+        response.raise_for_status()
+        status = (await client.get(PATHS[0])).status_code
+        print(f"logout: token {'rejected' if status == 401 else f'still accepted ({status})'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the API.
+
+Measures, in fresh interpreters:
+  - import: time to import app.main
+  - boot:   time from launching uvicorn until /health answers, which
+            includes imports, startup events and the first request
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/cold_start.py --runs 10
+    python benchmarks/cold_start.py --app-dir ../other-checkout/backend
+
+Run it against the same database for every build you compare.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(app_dir: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=app_dir, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_boot(app_dir: str, timeout: float) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode} during startup")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"/health did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(name: str, samples: list) -> str:
+    samples_ms = [s * 1000 for s in samples]
+    return (
+        f"{name:<8} median {statistics.median(samples_ms):7.1f}ms   "
+        f"min {min(samples_ms):7.1f}ms   max {max(samples_ms):7.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="backend directory to start the app from")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for /health")
+    args = parser.parse_args()
+
+    # One unmeasured run so .pyc files are written
+    measure_import(args.app_dir)
+
+    imports = [measure_import(args.app_dir) for _ in range(args.runs)]
+    boots = [measure_boot(args.app_dir, args.timeout) for _ in range(args.runs)]
+
+    print(f"{args.runs} cold starts of {os.path.abspath(args.app_dir)}")
+    print(_summary("import", imports))
+    print(_summary("boot", boots))
+
+
+if __name__ == "__main__":
+    main()
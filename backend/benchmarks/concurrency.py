@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the public read endpoints.
+
+Fires a fixed number of concurrent clients at a running API for a fixed
+duration and reports requests per second and latency percentiles.
+
+Usage:
+    uvicorn app.main:app --port 8000 &
+    python benchmarks/concurrency.py --base-url http://localhost:8000 --game-id 1
+
+Run it once against the old build and once against the new one with the
+same database to compare.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_path(base_url: str, path: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Warm up connections and the database pool
+        await asyncio.gather(*(client.get(path) for _ in range(concurrency)))
+
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, path, deadline, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--game-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+    args = parser.parse_args()
+
+    paths = ["/games", f"/stats/game/{args.game_id}"]
+
+    print(f"{'path':<24}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for path in paths:
+        result = await run_path(args.base_url, path, args.concurrency, args.duration)
+        print(
+            f"{result['path']:<24}{result['requests']:>10}{result['errors']:>8}"
+            f"{result['rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark of ladder time-travel queries.
+
+Stores --seasons seasons of --weeks weekly ladders for a --teams team
+division through LadderService.save_ladder_snapshot, so the history is
+compacted the same way as scraped ladders. Each week a random share of
+the teams plays. Then it times:
+  - as-of:   the ladder at a random point in the history
+  - history: one team's position over a random season
+and reports how many entry rows were stored against one row per team per
+snapshot. The seeded division is removed afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/ladder_history.py --seasons 4 --weeks 26
+
+Run it against a development database, it writes and deletes rows.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select
+
+from app.database import SessionLocal
+from app.models import LadderCurrentSnapshot, LadderEntry, LadderSnapshot
+from app.services.ladder_service import LadderService
+
+
+def seed(db, service: LadderService, division: str, seasons: int, weeks: int, teams: int, play_share: float) -> tuple:
+    rng = random.Random(42)
+    start = datetime(2000, 1, 6)
+    snapshots = 0
+    for season_index in range(seasons):
+        season = f"{2000 + season_index} Benchmark"
+        records = {f"Team {i:02d}": [0, 0, 0, 0] for i in range(teams)}  # wins, losses, for, against
+        for week in range(weeks):
+            for record in records.values():
+                if rng.random() < play_share:
+                    scored, conceded = rng.randint(20, 60), rng.randint(20, 60)
+                    record[0 if scored >= conceded else 1] += 1
+                    record[2] += scored
+                    record[3] += conceded
+            standings = sorted(records.items(), key=lambda item: (-item[1][0], item[1][3] - item[1][2], item[0]))
+            ladder_data = [
+                {
+                    "team_name": name,
+                    "wins": wins,
+                    "draws": 0,
+                    "losses": losses,
+                    "points_for": points_for,
+                    "points_against": points_against,
+                    "win_percentage": wins / (wins + losses) if wins + losses else 0.0,
+                    "games_played": wins + losses,
+                    "division": division,
+                }
+                for name, (wins, losses, points_for, points_against) in standings
+            ]
+            fetched_at = start + timedelta(days=7 * (season_index * weeks + week))
+            service.save_ladder_snapshot(db, ladder_data, fetched_at=fetched_at, season=season)
+            snapshots += 1
+    end = start + timedelta(days=7 * seasons * weeks)
+    return start, end, snapshots
+
+
+def remove_seed(db, division: str):
+    snapshot_ids = select(LadderSnapshot.id).where(LadderSnapshot.division == division)
+    db.execute(delete(LadderCurrentSnapshot).where(LadderCurrentSnapshot.division == division))
+    db.execute(delete(LadderEntry).where(LadderEntry.snapshot_id.in_(snapshot_ids)))
+    db.execute(delete(LadderSnapshot).where(LadderSnapshot.division == division))
+    db.commit()
+
+
+def timed(samples: list, call):
+    started = time.perf_counter()
+    result = call()
+    samples.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def summary(name: str, samples_ms: list) -> str:
+    return (
+        f"{name:<8} median {statistics.median(samples_ms):7.2f}ms   "
+        f"p95 {sorted(samples_ms)[int(len(samples_ms) * 0.95) - 1]:7.2f}ms   max {max(samples_ms):7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=4)
+    parser.add_argument("--weeks", type=int, default=26)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--play-share", type=float, default=0.6, help="share of teams playing each week")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    division = f"Ladder benchmark {uuid.uuid4().hex[:8]}"
+    service = LadderService()
+    db = SessionLocal()
+    try:
+        start, end, snapshots = seed(db, service, division, args.seasons, args.weeks, args.teams, args.play_share)
+        stored = db.scalar(
+            select(func.count(LadderEntry.id))
+            .join(LadderSnapshot, LadderEntry.snapshot_id == LadderSnapshot.id)
+            .where(LadderSnapshot.division == division)
+        )
+        full = snapshots * args.teams
+        print(f"{snapshots} snapshots of {args.teams} teams: {stored} entry rows stored, {full} uncompacted "
+              f"({stored / full:.0%})")
+
+        rng = random.Random(7)
+        as_of_ms, history_ms = [], []
+        span = (end - start).total_seconds()
+        for _ in range(args.queries):
+            at = start + timedelta(seconds=rng.uniform(0, span))
+            ladder = timed(as_of_ms, lambda: service.get_ladder_as_of(db, at, division))
+            assert ladder and len(ladder["entries"]) == args.teams
+            season = f"{2000 + rng.randrange(args.seasons)} Benchmark"
+            team = f"Team {rng.randrange(args.teams):02d}"
+            history = timed(history_ms, lambda: service.get_team_history(db, team, season, division))
+            assert history and len(history["history"]) == args.weeks
+
+        print(summary("as-of", as_of_ms))
+        print(summary("history", history_ms))
+    finally:
+        db.rollback()
+        remove_seed(db, division)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark of merging a player with a long history.
+
+Seeds a source player with stats in --games games and a target player who
+played every --overlap-th of them, merges the source into the target and
+reports the time and statement count. The merged totals are checked and
+the seeded rows are removed afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/player_merge.py --games 500 --runs 5
+
+Run it against a development database, it writes and deletes rows.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import Game, Player, PlayerGameStats, PlayerSeasonTotals
+from app.request_metrics import count_queries
+from app.services.player_merge import merge_players
+
+
+def seed(db, games: int, overlap: int) -> tuple:
+    tag = uuid.uuid4().hex[:8]
+    first_jersey = (db.query(func.max(Player.jersey_number)).scalar() or 0) + 1
+    source = Player(name=f"Merge benchmark {tag} source", jersey_number=first_jersey, is_active=1)
+    target = Player(name=f"Merge benchmark {tag} target", jersey_number=first_jersey + 1, is_active=1)
+    seeded_games = [
+        Game(opponent_name=f"Merge benchmark {tag}", datetime=datetime(2000, 1, 1) + timedelta(days=7 * i))
+        for i in range(games)
+    ]
+    db.add_all([source, target, *seeded_games])
+    db.flush()
+    stats = [PlayerGameStats(player_id=source.id, game_id=game.id, points=10, fouls=2) for game in seeded_games]
+    stats += [
+        PlayerGameStats(player_id=target.id, game_id=game.id, points=5, fouls=1)
+        for game in seeded_games[::overlap]
+    ]
+    db.add_all(stats)
+    db.commit()
+    return source.id, target.id, [game.id for game in seeded_games]
+
+
+def remove_seed(db, player_ids: list, game_ids: list):
+    db.query(PlayerGameStats).filter(PlayerGameStats.game_id.in_(game_ids)).delete(synchronize_session=False)
+    db.query(PlayerSeasonTotals).filter(PlayerSeasonTotals.player_id.in_(player_ids)).delete(synchronize_session=False)
+    db.query(Player).filter(Player.id.in_(player_ids)).delete(synchronize_session=False)
+    db.query(Game).filter(Game.id.in_(game_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def run_once(games: int, overlap: int) -> tuple:
+    db = SessionLocal()
+    source_id, target_id, game_ids = seed(db, games, overlap)
+    try:
+        with count_queries() as counter:
+            started = time.perf_counter()
+            merge_players(db, source_id, target_id)
+            elapsed = time.perf_counter() - started
+
+        rows, points = db.query(func.count(PlayerGameStats.id), func.sum(PlayerGameStats.points)).filter(
+            PlayerGameStats.player_id == target_id
+        ).one()
+        overlapping = len(game_ids[::overlap])
+        assert rows == games, f"target has {rows} rows, expected {games}"
+        assert points == games * 10 + overlapping * 5, f"target has {points} points"
+        return elapsed, counter.count
+    finally:
+        remove_seed(db, [source_id, target_id], game_ids)
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=500, help="games in the source player's history")
+    parser.add_argument("--overlap", type=int, default=4, help="the target played every n-th of those games")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_once(args.games, args.overlap) for _ in range(args.runs)]
+    times_ms = [elapsed * 1000 for elapsed, _ in results]
+
+    print(f"{args.runs} merges of a player with {args.games} games, {len(range(0, args.games, args.overlap))} shared")
+    print(
+        f"merge    median {statistics.median(times_ms):7.1f}ms   min {min(times_ms):7.1f}ms   "
+        f"max {max(times_ms):7.1f}ms   {results[-1][1]} statements"
+    )
+
+
+if __name__ == "__main__":
+    main()
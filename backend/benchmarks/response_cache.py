@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the encoded response cache.
+
+Seeds --games games, then times GET requests to the conditional routes
+through the whole app: first with app.response_cache disabled (the route
+runs, its rows come from the service caches, and the response is
+validated and encoded each time), then enabled, once per Accept-Encoding.
+Reports the median and p95 latency and the bytes sent. The seeded games
+are removed afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/response_cache.py --games 1000
+
+Run it against a development database, it writes and deletes rows.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import Game
+from app.response_cache import brotli, response_cache
+from app.versions import GAMES, bump_versions
+
+ENCODINGS = ["identity", "gzip", "br"] if brotli is not None else ["identity", "gzip"]
+
+
+def seed(db, games: int) -> str:
+    tag = f"Response cache {uuid.uuid4().hex[:8]}"
+    start = datetime(2000, 1, 1)
+    db.add_all([
+        Game(
+            opponent_name=f"{tag} #{i}",
+            datetime=start + timedelta(days=i),
+            venue=f"Court {i % 4}",
+            final_score_skywalkers=40 + i % 30,
+            final_score_opponent=35 + i % 35,
+        )
+        for i in range(games)
+    ])
+    bump_versions(db, GAMES)
+    db.commit()
+    return tag
+
+
+def remove_seed(db, tag: str):
+    db.query(Game).filter(Game.opponent_name.like(f"{tag} #%")).delete(synchronize_session=False)
+    bump_versions(db, GAMES)
+    db.commit()
+
+
+def run(client: TestClient, path: str, encoding: str, requests: int) -> tuple:
+    samples = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        # stream so the client does not decode, and the size is what was sent
+        with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+            body = b"".join(response.iter_raw())
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+        size = len(body)
+    return samples, size
+
+
+def summary(name: str, samples_ms: list, size: int) -> str:
+    return (
+        f"{name:<28} median {statistics.median(samples_ms):7.2f}ms   "
+        f"p95 {sorted(samples_ms)[int(len(samples_ms) * 0.95) - 1]:7.2f}ms   {size:>9,} bytes"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=200, help="page size of GET /games")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = [f"/games?limit={args.limit}", "/games/summary"]
+    db = SessionLocal()
+    tag = seed(db, args.games)
+    try:
+        with TestClient(app) as client:
+            for path in paths:
+                print(path)
+                response_cache.enabled = False
+                client.get(path)
+                samples, size = run(client, path, "identity", args.requests)
+                print("  " + summary("uncached", samples, size))
+
+                response_cache.enabled = True
+                response_cache.clear()
+                client.get(path)
+                for encoding in ENCODINGS:
+                    samples, size = run(client, path, encoding, args.requests)
+                    print("  " + summary(f"cached, {encoding}", samples, size))
+            print(response_cache.stats())
+    finally:
+        db.rollback()
+        remove_seed(db, tag)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
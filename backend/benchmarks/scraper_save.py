@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark of saving a scraped box score.
+
+Times StatsScraperService.save_player_stats_to_db on a 15-player box score
+in the two shapes a scrape takes:
+  - first:   every player is new, players and stats rows are inserted
+  - rescrape the same roster again with new numbers, every row is updated
+
+Each run seeds its own game and removes the seeded rows afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/scraper_save.py --runs 20
+
+Run it against a development database, it writes and deletes rows.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import Game, Player, PlayerGameStats, PlayerSeasonTotals
+from app.request_metrics import count_queries
+from app.services.stats_scraper_service import stats_scraper_service
+
+ROSTER_SIZE = 15
+
+
+def timed_save(db, player_stats: dict, game_id: int) -> tuple:
+    with count_queries() as counter:
+        started = time.perf_counter()
+        saved = stats_scraper_service.save_player_stats_to_db(player_stats, game_id, db, "benchmark")
+        elapsed = time.perf_counter() - started
+    assert len(saved) == len(player_stats)
+    return elapsed, counter.count
+
+
+def run_once(roster_size: int) -> dict:
+    tag = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    game = Game(opponent_name=f"Scraper benchmark {tag}", datetime=datetime(2000, 1, 1))
+    db.add(game)
+    db.commit()
+    game_id = game.id
+    names = [f"Scraper benchmark {tag} #{i}" for i in range(roster_size)]
+    try:
+        first = timed_save(db, {name: {"points": i, "fouls": i % 5} for i, name in enumerate(names)}, game_id)
+        rescrape = timed_save(db, {name: {"points": i + 1, "fouls": 0} for i, name in enumerate(names)}, game_id)
+        return {"first": first, "rescrape": rescrape}
+    finally:
+        db.rollback()
+        db.query(PlayerGameStats).filter(PlayerGameStats.game_id == game_id).delete(synchronize_session=False)
+        db.query(PlayerSeasonTotals).filter(
+            PlayerSeasonTotals.player_id.in_(db.query(Player.id).filter(Player.name.in_(names)))
+        ).delete(synchronize_session=False)
+        db.query(Player).filter(Player.name.in_(names)).delete(synchronize_session=False)
+        db.query(Game).filter(Game.id == game_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--roster", type=int, default=ROSTER_SIZE)
+    args = parser.parse_args()
+
+    # One unmeasured run to warm up the connection pool
+    run_once(args.roster)
+
+    results = [run_once(args.roster) for _ in range(args.runs)]
+
+    print(f"{args.runs} saves of a {args.roster}-player box score")
+    for shape in ("first", "rescrape"):
+        times_ms = [result[shape][0] * 1000 for result in results]
+        statements = results[-1][shape][1]
+        print(
+            f"{shape:<9} median {statistics.median(times_ms):7.1f}ms   "
+            f"min {min(times_ms):7.1f}ms   max {max(times_ms):7.1f}ms   {statements} statements"
+        )
+
+
+if __name__ == "__main__":
+    main()
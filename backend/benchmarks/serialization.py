@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark of encoding the large list responses.
+
+Builds --games Game rows and --stats PlayerGameStats rows (each with its
+player, as the stats routes load them) in memory and times three ways of
+turning them into a response body:
+  - fastapi:  the response_model path with the stdlib JSONResponse, what
+              every route used before app.serialization
+  - orjson:   the same path with ORJSONResponse, the app default now
+  - adapter:  app.serialization.json_response's precompiled TypeAdapter,
+              used by the list routes
+and checks that all three produce the same JSON. No database is needed.
+
+Usage:
+    python benchmarks/serialization.py --games 1000 --stats 10000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.models import Game, Player, PlayerGameStats
+from app.schemas import GameResponse, PlayerGameStatsResponse
+from app.serialization import GAME_LIST, STATS_LIST, dump_json
+
+ROSTER_SIZE = 15
+
+
+def build_games(count: int) -> list:
+    start = datetime(2000, 1, 1, 19, 30)
+    return [
+        Game(
+            id=i,
+            opponent_name=f"Opponent {i % 40}",
+            datetime=start + timedelta(days=i),
+            venue=f"Court {i % 4}",
+            final_score_skywalkers=40 + i % 30,
+            final_score_opponent=35 + i % 35,
+            video_url=None if i % 3 else f"https://example.com/video/{i}",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def build_stats(count: int) -> list:
+    players = [
+        Player(id=i, name=f"Player {i}", jersey_number=i, date_joined=datetime(2000, 1, 1), is_active=1)
+        for i in range(1, ROSTER_SIZE + 1)
+    ]
+    return [
+        PlayerGameStats(
+            id=i,
+            player_id=players[i % ROSTER_SIZE].id,
+            player=players[i % ROSTER_SIZE],
+            game_id=i // ROSTER_SIZE + 1,
+            points=i % 31,
+            fouls=i % 6,
+            is_verified=i % 2 == 0,
+            verified_at=datetime(2000, 1, 2) if i % 2 == 0 else None,
+            verified_by=1 if i % 2 == 0 else None,
+            is_scraped=True,
+            scrape_source="benchmark",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def response_model_path(response_class, response_type):
+    """Encode like FastAPI does for a route declaring ``response_model=response_type``"""
+    field = APIRoute("/benchmark", lambda: None, response_model=response_type).response_field
+    loop = asyncio.new_event_loop()
+
+    def encode(rows) -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=rows, is_coroutine=True))
+        return response_class(content).body
+
+    return encode
+
+
+def timed(encode, rows, runs: int) -> tuple:
+    samples = []
+    for _ in range(runs):
+        # Leftovers of the previous run would be collected in the middle of this one
+        gc.collect()
+        started = time.perf_counter()
+        body = encode(rows)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--stats", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = [
+        (f"{args.games} games", build_games(args.games), List[GameResponse], GAME_LIST),
+        (f"{args.stats} stat rows", build_stats(args.stats), List[PlayerGameStatsResponse], STATS_LIST),
+    ]
+    for name, rows, response_type, type_adapter in cases:
+        print(name)
+        paths = {
+            "fastapi": response_model_path(JSONResponse, response_type),
+            "orjson": response_model_path(ORJSONResponse, response_type),
+            "adapter": lambda rows: dump_json(type_adapter, rows),
+        }
+        expected = None
+        baseline = None
+        for path, encode in paths.items():
+            samples, body = timed(encode, rows, args.runs)
+            decoded = json.loads(body)
+            if expected is None:
+                expected = decoded
+            assert decoded == expected, f"{path} produced different JSON"
+            median = statistics.median(samples)
+            baseline = baseline or median
+            print(f"  {path:<8} median {median:8.2f}ms   min {min(samples):8.2f}ms   "
+                  f"{baseline / median:4.1f}x   {len(body):>10,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ from app.database import SessionLocal, engine
 from app.models.user import User
 from app.database import Base
 from app.auth.auth import get_password_hash
+from app.versions import AUTH, bump_versions
 
 def create_user():
     """Create a user account"""
@@ -47,6 +48,8 @@ def create_user():
         )
         
         db.add(user)
+        # Running API workers pick the new user up from the auth version
+        bump_versions(db, AUTH)
         db.commit()
         
         print(f"User created successfully!")
@@ -0,0 +1,123 @@
+"""
+Shared fixtures of the backend tests.
+
+Tests that need a database run against TEST_DATABASE_URL, a Postgres
+database migrated to head (`alembic upgrade head`), and are skipped when
+it is not set. They add their own rows, tagged with a random suffix, and
+delete them afterwards, so a development database works too.
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# app.database builds its engines on import, nothing connects until a test does
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+else:
+    os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/skywalkers")
+
+ROSTER_SIZE = 15
+SEEDED_GAMES = 5
+
+
+@pytest.fixture(scope="session")
+def database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    # Entered once, the async engine's connections belong to the client's event loop
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def seeded(database):
+    """SEEDED_GAMES games with scraped, unverified stats for a roster of ROSTER_SIZE players"""
+    from sqlalchemy import func
+
+    from app.database import SessionLocal
+    from app.models import Game, Player, PlayerGameStats, PlayerSeasonTotals
+    from app.versions import GAMES, PLAYERS, STATS, bump_versions
+
+    tag = f"Test {uuid.uuid4().hex[:8]}"
+    db = SessionLocal()
+    first_jersey = (db.query(func.max(Player.jersey_number)).scalar() or 0) + 1
+    games = [
+        Game(opponent_name=f"{tag} #{i}", datetime=datetime(2000, 1, 1) + timedelta(days=7 * i))
+        for i in range(SEEDED_GAMES)
+    ]
+    players = [
+        Player(name=f"{tag} #{i}", jersey_number=first_jersey + i, is_active=1)
+        for i in range(ROSTER_SIZE)
+    ]
+    db.add_all(games + players)
+    db.flush()
+    db.add_all([
+        PlayerGameStats(player_id=player.id, game_id=game.id, points=i, fouls=i % 5, is_scraped=True)
+        for game in games
+        for i, player in enumerate(players)
+    ])
+    bump_versions(db, GAMES, PLAYERS, STATS)
+    db.commit()
+
+    game_ids = [game.id for game in games]
+    player_ids = [player.id for player in players]
+    try:
+        yield SimpleNamespace(
+            game_ids=game_ids,
+            player_ids=player_ids,
+            first_jersey=first_jersey,
+            player_names=[player.name for player in players],
+        )
+    finally:
+        db.query(PlayerGameStats).filter(PlayerGameStats.game_id.in_(game_ids)).delete(synchronize_session=False)
+        db.query(PlayerSeasonTotals).filter(PlayerSeasonTotals.player_id.in_(player_ids)).delete(synchronize_session=False)
+        db.query(Player).filter(Player.id.in_(player_ids)).delete(synchronize_session=False)
+        db.query(Game).filter(Game.id.in_(game_ids)).delete(synchronize_session=False)
+        bump_versions(db, GAMES, PLAYERS, STATS)
+        db.commit()
+        db.close()
+
+
+@pytest.fixture
+def user(client):
+    """A user of its own, ``user.login()`` returns a token for it"""
+    from app.auth.auth import get_password_hash
+    from app.database import SessionLocal
+    from app.models import RevokedToken, User
+    from app.versions import AUTH, bump_versions
+
+    email = f"test-{uuid.uuid4().hex[:8]}@example.com"
+    password = "correct horse"
+    db = SessionLocal()
+    db_user = User(email=email, password_hash=get_password_hash(password), name="Test")
+    db.add(db_user)
+    bump_versions(db, AUTH)
+    db.commit()
+
+    def login() -> str:
+        response = client.post("/auth/login", json={"email": email, "password": password})
+        assert response.status_code == 200
+        return response.json()["access_token"]
+
+    try:
+        yield SimpleNamespace(id=db_user.id, email=email, password=password, login=login)
+    finally:
+        db.query(RevokedToken).filter(RevokedToken.user_id == db_user.id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == db_user.id).delete(synchronize_session=False)
+        bump_versions(db, AUTH)
+        db.commit()
+        db.close()
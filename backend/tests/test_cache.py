@@ -0,0 +1,42 @@
+"""
+Bounds of the in-process caches, no database needed.
+"""
+
+from app.cache import LRUCache, approximate_size
+
+
+def test_evicts_least_recently_used_over_max_bytes():
+    value = "x" * 1000
+    size = approximate_size(value)
+    cache = LRUCache(maxsize=100, max_bytes=size * 3)
+    for key in range(3):
+        cache.set(key, value)
+    cache.get(0)
+
+    cache.set(3, value)
+
+    assert cache.get(1) is None
+    assert [cache.get(key) is not None for key in (0, 2, 3)] == [True, True, True]
+    assert cache.stats()["bytes"] == size * 3
+    assert cache.evictions == 1
+
+
+def test_does_not_store_value_over_max_bytes():
+    cache = LRUCache(maxsize=100, max_bytes=100)
+    cache.set("large", "x" * 1000)
+    assert cache.get("large") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_replacing_and_invalidating_keep_size():
+    cache = LRUCache(maxsize=100, max_bytes=10_000)
+    cache.set("key", ["a" * 100])
+    cache.set("key", ["b" * 200])
+    assert cache.stats()["bytes"] == approximate_size(["b" * 200])
+    cache.invalidate()
+    assert cache.stats()["bytes"] == 0
+
+
+def test_approximate_size_counts_shared_objects_once():
+    row = {"name": "x" * 1000}
+    assert approximate_size([row, row]) < 2 * approximate_size(row)
@@ -0,0 +1,120 @@
+"""
+Import time of app.main, which every worker and CLI command pays on start.
+
+app.main and BASELINE, the frameworks it is built on, are imported in
+turns in fresh interpreters under `-X importtime`. The median time of
+app.main must stay within IMPORT_BUDGET_RATIO times the baseline's, which
+holds on fast and slow machines alike, and the dependencies loaded on
+first use (scrapers, scheduler, email) must not be imported with it.
+IMPORT_BUDGET_MS adds an absolute limit for a known machine, such as CI.
+Nothing connects to the database.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_BUDGET_RATIO = float(os.getenv("IMPORT_BUDGET_RATIO", "1.5"))
+# Off unless set, wall-clock time depends on the machine
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "0"))
+IMPORT_BUDGET_RUNS = 5
+
+# What any worker has to import, whatever the app does on top
+BASELINE = "import fastapi, fastapi.responses, pydantic, sqlalchemy.orm, sqlalchemy.ext.asyncio"
+
+# Loaded on first use through app.services.registry and app.scheduler
+LAZY_MODULES = (
+    "bs4",
+    "requests",
+    "apscheduler",
+    "emails",
+    "app.services.stats_scraper_service",
+    "app.services.fixtures_service",
+    "app.services.ladder_service",
+    "app.services.email",
+)
+
+
+def import_profile(statement: str = "import app.main") -> Tuple[float, List[Tuple[str, int, int]]]:
+    """
+    Run ``statement`` in a fresh interpreter and parse the -X importtime report.
+
+    Returns the cumulative time of the top-level imports in milliseconds,
+    interpreter startup included, and every (module, self us,
+    cumulative us) entry.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    assert result.returncode == 0, f"{statement} failed:\n{result.stderr[-2000:]}"
+
+    entries = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+        # Top-level entries are indented by one space, nested ones by more
+        if not name.startswith("  "):
+            total_us += int(cumulative_us)
+    return total_us / 1000, entries
+
+
+def heaviest_packages(entries: List[Tuple[str, int, int]], top: int = 10) -> str:
+    """Self time summed per top-level package, heaviest first"""
+    per_package: Dict[str, int] = {}
+    for name, self_us, _ in entries:
+        package = name.split(".")[0]
+        per_package[package] = per_package.get(package, 0) + self_us
+    heaviest = sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return "\n".join(f"  {package:<28} {self_us / 1000:7.1f}ms" for package, self_us in heaviest)
+
+
+@pytest.fixture(scope="module")
+def profiles():
+    # One unmeasured run of each so .pyc files are written
+    import_profile(BASELINE)
+    import_profile()
+    baseline = []
+    app = []
+    # In turns, so a busy moment of the machine slows both
+    for _ in range(IMPORT_BUDGET_RUNS):
+        baseline.append(import_profile(BASELINE)[0])
+        app.append(import_profile())
+    return statistics.median(baseline), app
+
+
+def test_import_within_budget(profiles):
+    baseline, app = profiles
+    median = statistics.median(total for total, _ in app)
+    assert median <= baseline * IMPORT_BUDGET_RATIO, (
+        f"import app.main took {median:.1f}ms, {median / baseline:.2f} times the baseline's "
+        f"{baseline:.1f}ms (medians of {IMPORT_BUDGET_RUNS}), budget {IMPORT_BUDGET_RATIO:.2f} times. "
+        f"Heaviest packages:\n{heaviest_packages(app[-1][1])}"
+    )
+
+
+@pytest.mark.skipif(not IMPORT_BUDGET_MS, reason="IMPORT_BUDGET_MS is not set")
+def test_import_within_absolute_budget(profiles):
+    _, app = profiles
+    median = statistics.median(total for total, _ in app)
+    assert median <= IMPORT_BUDGET_MS, (
+        f"import app.main took {median:.1f}ms (median of {IMPORT_BUDGET_RUNS}), "
+        f"budget {IMPORT_BUDGET_MS:.0f}ms. Heaviest packages:\n{heaviest_packages(app[-1][1])}"
+    )
+
+
+def test_lazy_modules_not_imported(profiles):
+    _, app = profiles
+    imported = {name for name, _, _ in app[-1][1]}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    assert not eager, f"imported with app.main, should load on first use: {', '.join(eager)}"
@@ -0,0 +1,11 @@
+"""
+Parameters of the ladder routes.
+"""
+
+from app.pagination import MAX_PAGE_SIZE
+
+
+def test_ladder_limit_is_capped(client):
+    assert client.get("/ladder", params={"limit": MAX_PAGE_SIZE}).status_code == 200
+    assert client.get("/ladder", params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
+    assert client.get("/ladder", params={"limit": 0}).status_code == 422
@@ -0,0 +1,95 @@
+"""
+Statement budgets of the endpoints returning lists.
+
+An N+1 grows the count with the number of rows, so these fail before it
+reaches production. Budgets count the cold path, with the service and
+response caches emptied first.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app import cache
+from app.pagination import GAMES_KEYSET, PLAYERS_KEYSET
+from app.request_metrics import assert_max_queries
+from app.response_cache import response_cache
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    cache.invalidate(cache.GAMES, cache.ROSTER)
+    response_cache.clear()
+
+
+def get(client, path: str):
+    response = client.get(path)
+    assert response.status_code == 200, f"{path} returned {response.status_code}"
+    return response.json()
+
+
+# The conditional routes read the version stamp, then one page of rows.
+# The cursors start the page at the seeded rows, whatever else the database holds
+
+def test_games_list(client, seeded):
+    cursor = GAMES_KEYSET.encode([datetime(2000, 12, 31), 0])
+    with assert_max_queries(2):
+        games = get(client, f"/games?cursor={cursor}&limit=200")
+    assert set(seeded.game_ids) <= {game["id"] for game in games}
+
+
+def test_roster_list(client, seeded):
+    cursor = PLAYERS_KEYSET.encode([seeded.first_jersey - 1, 0])
+    with assert_max_queries(2):
+        players = get(client, f"/players?cursor={cursor}")
+    assert [player["id"] for player in players] == seeded.player_ids
+
+
+def test_all_players_list(client, seeded):
+    cursor = PLAYERS_KEYSET.encode([seeded.first_jersey - 1, 0])
+    with assert_max_queries(2):
+        players = get(client, f"/players/all?cursor={cursor}")
+    assert [player["id"] for player in players] == seeded.player_ids
+
+
+def test_game_stats_join_players(client, seeded):
+    with assert_max_queries(1):
+        stats = get(client, f"/stats/game/{seeded.game_ids[0]}")
+    assert len(stats) == len(seeded.player_ids)
+    assert {row["player"]["name"] for row in stats} == set(seeded.player_names)
+
+
+def test_player_stats_join_players(client, seeded):
+    with assert_max_queries(1):
+        stats = get(client, f"/stats/player/{seeded.player_ids[0]}")
+    assert len(stats) == len(seeded.game_ids)
+    assert all(row["player"]["id"] == seeded.player_ids[0] for row in stats)
+
+
+def test_unverified_stats_join_players(client, seeded):
+    rows = len(seeded.player_ids) * len(seeded.game_ids)
+    with assert_max_queries(1):
+        stats = get(client, f"/stats/unverified?limit={rows}")
+    assert len(stats) == rows
+    assert all(row["player"]["name"] for row in stats)
+
+
+def test_rescrape_is_set_based(seeded):
+    from app.database import SessionLocal
+    from app.services.stats_scraper_service import stats_scraper_service
+
+    stats_data = {
+        "url": "query-count-test",
+        "player_stats": {name: {"points": 100, "fouls": 9} for name in seeded.player_names},
+    }
+    db = SessionLocal()
+    try:
+        # One name lookup, one upsert, four statements for the season totals
+        # and the stats version, and one reload, whatever the roster size
+        with assert_max_queries(7):
+            result = stats_scraper_service.save_fetched_stats(stats_data, seeded.game_ids[0], db)
+    finally:
+        db.close()
+    assert result["saved_to_db"], result.get("save_error")
+    assert len(result["saved_records"]) == len(seeded.player_ids)
+    assert all(record["player_name"] for record in result["saved_records"])
@@ -0,0 +1,45 @@
+"""
+player_season_totals after game edits.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+
+def season_totals(player_id: int):
+    from app.database import SessionLocal
+    from app.models import PlayerSeasonTotals
+
+    with SessionLocal() as db:
+        return db.scalars(select(PlayerSeasonTotals).where(PlayerSeasonTotals.player_id == player_id)).all()
+
+
+def move_game(client, token: str, game_id: int, moment: datetime):
+    game = client.get(f"/games/{game_id}").json()
+    game["datetime"] = moment.isoformat()
+    response = client.put(f"/games/{game_id}", json=game, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+def test_moving_game_within_season_updates_last_played(client, seeded, user):
+    from app.database import SessionLocal
+    from app.services.season_totals import game_season_keys, refresh_season_totals, season_of
+
+    token = user.login()
+    game_id = seeded.game_ids[-1]
+    original = datetime.fromisoformat(client.get(f"/games/{game_id}").json()["datetime"])
+    with SessionLocal() as db:
+        refresh_season_totals(db, game_season_keys(db, game_id, [season_of(original)]))
+        db.commit()
+
+    moved = original.replace(month=original.month + 1)
+    assert season_of(moved) == season_of(original)
+    try:
+        move_game(client, token, game_id, moved)
+        (totals,) = season_totals(seeded.player_ids[0])
+        assert totals.last_played_at == moved
+    finally:
+        move_game(client, token, game_id, original)
+    (totals,) = season_totals(seeded.player_ids[0])
+    assert totals.last_played_at == original
@@ -0,0 +1,51 @@
+"""
+Tokens checked by a worker other than the one that issued them.
+
+The second TokenTable stands in for another worker: it is loaded before
+the password change and only learns about it from its own refresh.
+"""
+
+from app.auth import tokens
+from app.auth.auth import verify_token_claims
+from app.auth.tokens import TokenTable
+
+NEW_PASSWORD = "battery staple"
+
+
+def check(client, table: TokenTable, token: str) -> bool:
+    claims = verify_token_claims(token)
+    return client.portal.call(table.check, int(claims["sub"]), claims["ver"], claims["jti"])
+
+
+def test_other_worker_accepts_token_from_password_change(client, user, monkeypatch):
+    # Not rate limited, the table was loaded a moment ago
+    monkeypatch.setattr(tokens, "NEWER_TOKEN_RECHECK", 0)
+    old_token = user.login()
+    other_worker = TokenTable()
+    client.portal.call(other_worker.refresh)
+    assert check(client, other_worker, old_token)
+
+    response = client.post(
+        "/auth/change-password",
+        json={"current_password": user.password, "new_password": NEW_PASSWORD},
+        headers={"Authorization": f"Bearer {old_token}"},
+    )
+    assert response.status_code == 200
+    new_token = response.json()["access_token"]
+
+    reloads = other_worker.reloads
+    assert check(client, other_worker, new_token)
+    assert other_worker.reloads == reloads + 1
+    assert not check(client, other_worker, old_token)
+
+
+def test_newer_token_recheck_is_rate_limited(client, user):
+    token = user.login()
+    claims = verify_token_claims(token)
+    table = TokenTable()
+    client.portal.call(table.refresh)
+    checks = table.checks
+
+    # A version the database does not have yet, such as a forged or far future one
+    assert not client.portal.call(table.check, user.id, claims["ver"] + 1, claims["jti"])
+    assert table.checks == checks
@@ -1,5 +1,5 @@
 import React, { createContext, useContext, useState, useEffect, ReactNode } from 'react';
-import { User } from '../services/api';
+import { User, authAPI } from '../services/api';
 
 interface AuthContextType {
   user: User | null;
@@ -45,6 +45,10 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   };
 
   const logout = () => {
+    if (token) {
+      // Best effort, the token expires on its own if the request fails
+      authAPI.logout(token).catch(() => {});
+    }
     setToken(null);
     setUser(null);
     localStorage.removeItem('token');
@@ -17,6 +17,19 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// List endpoints are paginated, the cursor of the next page comes back in
+// the X-Next-Cursor header. Follows it until the last page.
+const getAllPages = async <T>(url: string, pageSize: number = 200): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get(url, { params: { limit: pageSize, cursor } });
+    items.push(...(response.data as T[]));
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+};
+
 export interface User {
   id: number;
   email: string;
@@ -40,11 +53,27 @@ export interface AuthResponse {
   user: User;
 }
 
+export interface PasswordChangeData {
+  current_password: string;
+  new_password: string;
+}
+
 export const authAPI = {
   login: async (data: LoginData): Promise<AuthResponse> => {
     const response = await api.post('/auth/login', data);
     return response.data;
   },
+
+  // Revokes the token server side, the caller still has to forget it
+  logout: async (token: string): Promise<void> => {
+    await api.post('/auth/logout', null, { headers: { Authorization: `Bearer ${token}` } });
+  },
+
+  // Every other token of the user stops working, store the returned one
+  changePassword: async (data: PasswordChangeData): Promise<AuthResponse> => {
+    const response = await api.post('/auth/change-password', data);
+    return response.data;
+  },
 };
 
 export interface Player {
@@ -73,8 +102,7 @@ export interface PlayerMerge {
 
 export const adminAPI = {
   getAllUsers: async (): Promise<User[]> => {
-    const response = await api.get('/admin/users');
-    return response.data;
+    return getAllPages<User>('/admin/users');
   },
 
   createUser: async (data: UserCreateData): Promise<User> => {
@@ -89,8 +117,7 @@ export const adminAPI = {
 
   // Player management endpoints
   getAllPlayers: async (): Promise<Player[]> => {
-    const response = await api.get('/admin/players');
-    return response.data;
+    return getAllPages<Player>('/admin/players');
   },
 
   createPlayer: async (data: PlayerCreate): Promise<Player> => {
@@ -139,10 +166,33 @@ export interface GameCreate {
   video_url?: string;
 }
 
+export interface GameRecord {
+  games: number;
+  wins: number;
+  losses: number;
+  draws: number;
+  win_percentage: number;
+  points_for: number;
+  points_against: number;
+  average_points_for: number;
+  average_points_against: number;
+  average_margin: number;
+}
+
+export interface GameSummary extends GameRecord {
+  season: string | null;
+  streak: { result: 'W' | 'L' | 'D'; length: number } | null;
+  venues: (GameRecord & { venue: string | null })[];
+}
+
 export const gamesAPI = {
+  getSummary: async (season?: string): Promise<GameSummary> => {
+    const response = await api.get('/games/summary', { params: { season } });
+    return response.data;
+  },
+
   getAll: async (): Promise<Game[]> => {
-    const response = await api.get('/games');
-    const games = (response.data as any[]).map((g) => ({
+    const games = (await getAllPages<any>('/games')).map((g) => ({
       ...g,
       datetime: new Date(g.datetime),
       final_score_skywalkers: g.final_score_skywalkers ?? undefined,
@@ -214,10 +264,95 @@ export interface LadderEntry {
   last_updated: string;
 }
 
+export interface BulkStatsEntry {
+  player_id: number;
+  points: number;
+  fouls: number;
+}
+
+export interface BulkStatsResponse {
+  game_id: number;
+  created: number;
+  updated: number;
+  unchanged: number;
+  results: {
+    player_id: number;
+    stats_id: number;
+    status: 'created' | 'updated' | 'unchanged';
+  }[];
+}
+
+export interface PlayerSeasonTotals {
+  player_id: number;
+  season: string;
+  games_played: number;
+  total_points: number;
+  total_fouls: number;
+  average_points: number;
+  average_fouls: number;
+  high_points: number;
+  high_fouls: number;
+  last_played_at: string;
+  player: Player;
+}
+
+export interface GameLogEntry {
+  stats_id: number;
+  game_id: number;
+  datetime: string;
+  opponent_name: string;
+  venue: string | null;
+  season: string;
+  points: number;
+  fouls: number;
+  season_game: number;
+  season_points: number;
+  rolling_games: number;
+  rolling_points: number;
+  rolling_fouls: number;
+  team_rank: number;
+}
+
+export interface ScoringStreak {
+  length: number;
+  started_at: string;
+  ended_at: string;
+}
+
+export interface SeasonRank {
+  season: string;
+  games_played: number;
+  total_points: number;
+  high_points: number;
+  average_points: number;
+  players: number;
+  points_rank: number;
+  average_rank: number;
+  high_rank: number;
+  points_percentile: number;
+  average_percentile: number;
+}
+
+export interface PlayerAnalytics {
+  player_id: number;
+  season: string | null;
+  window: number;
+  game_log: GameLogEntry[];
+  streaks: { min_points: number; current: ScoringStreak | null; longest: ScoringStreak | null };
+  seasons: SeasonRank[];
+}
+
+export type LeaderStat = 'points' | 'average_points' | 'fouls' | 'high_points' | 'games_played';
+
+export interface StatsLeadersResponse {
+  season: string | null;
+  stat: LeaderStat;
+  leaders: PlayerSeasonTotals[];
+}
+
 export const statsAPI = {
   getPlayerStats: async (userId: number): Promise<PlayerGameStats[]> => {
-    const response = await api.get(`/stats/player/${userId}`);
-    return response.data;
+    return getAllPages<PlayerGameStats>(`/stats/player/${userId}`);
   },
 
   getGameStats: async (gameId: number): Promise<PlayerGameStats[]> => {
@@ -225,6 +360,21 @@ export const statsAPI = {
     return response.data;
   },
 
+  saveGameStats: async (gameId: number, stats: BulkStatsEntry[]): Promise<BulkStatsResponse> => {
+    const response = await api.post(`/stats/game/${gameId}/bulk`, { stats });
+    return response.data;
+  },
+
+  getPlayerAnalytics: async (playerId: number, window = 5, season?: string): Promise<PlayerAnalytics> => {
+    const response = await api.get(`/stats/player/${playerId}/analytics`, { params: { window, season } });
+    return response.data;
+  },
+
+  getLeaders: async (stat: LeaderStat = 'points', season?: string, limit = 10): Promise<StatsLeadersResponse> => {
+    const response = await api.get('/stats/leaders', { params: { stat, season, limit } });
+    return response.data;
+  },
+
   fetchGameStats: async (url: string, cookies?: string, gameId?: number, saveToDB?: boolean): Promise<any> => {
     const response = await api.post('/stats/fetch-game-stats', { 
       url, 
@@ -236,8 +386,7 @@ export const statsAPI = {
   },
 
   getUnverifiedStats: async (): Promise<PlayerGameStats[]> => {
-    const response = await api.get('/stats/unverified');
-    return response.data;
+    return getAllPages<PlayerGameStats>('/stats/unverified');
   },
 
   verifyStats: async (statsId: number): Promise<{ message: string; stats: PlayerGameStats }> => {
@@ -306,7 +455,6 @@ export const fixturesAPI = {
     upcoming_count: number;
     today_count: number;
     this_week_count: number;
-    last_checked: string;
   }> => {
     const response = await api.get('/fixtures/status');
     return response.data;